@@ -16,6 +16,28 @@ from app.models.case import ICE
 from app.models.case import BackgroundDetail
 from app.models.case import InformationDivulged
 from app.models.case import DoctorInfo
+from app.models.score_cache import ScoreCacheEntry
+from app.models.llm_rate_limit import LLMRateLimit
+from app.models.case_pool import PooledCase
+from app.models.llm_call import LLMCall
+from app.models.recording import Recording
+
+# Every model must be imported for autogenerate to see its table
+MODELS = (
+    User,
+    Consultation,
+    PeerComment,
+    Case,
+    ICE,
+    BackgroundDetail,
+    InformationDivulged,
+    DoctorInfo,
+    ScoreCacheEntry,
+    LLMRateLimit,
+    PooledCase,
+    LLMCall,
+    Recording,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
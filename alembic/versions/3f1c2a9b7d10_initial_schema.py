@@ -0,0 +1,139 @@
+"""initial schema
+
+Revision ID: 3f1c2a9b7d10
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9b7d10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('first_name', sa.String(length=128), nullable=False),
+        sa.Column('last_name', sa.String(length=128), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'cases',
+        sa.Column('case_number', sa.String(length=50), nullable=False),
+        sa.Column('patient_name', sa.String(length=255), nullable=True),
+        sa.Column('patient_age', sa.Integer(), nullable=True),
+        sa.Column('patient_gender', sa.Enum('MALE', 'FEMALE', 'OTHER', name='gender'), nullable=True),
+        sa.Column('presenting_complaint', sa.Text(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_cases_case_number'), 'cases', ['case_number'], unique=True)
+    op.create_table(
+        'doctor_info',
+        sa.Column('case_id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('age', sa.Integer(), nullable=True),
+        sa.Column('past_medical_history', sa.Text(), nullable=True),
+        sa.Column('current_medication', sa.Text(), nullable=True),
+        sa.Column('context', sa.Text(), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('case_id'),
+    )
+    op.create_table(
+        'ice',
+        sa.Column('case_id', sa.String(length=36), nullable=False),
+        sa.Column('ice_type', sa.Enum('IDEA', 'CONCERN', 'EXPECTATION', 'MIXED', name='icetype'), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'background_details',
+        sa.Column('case_id', sa.String(length=36), nullable=False),
+        sa.Column('detail', sa.Text(), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'information_divulged',
+        sa.Column('case_id', sa.String(length=36), nullable=False),
+        sa.Column('divulgence_type', sa.Enum('FREELY_DIVULGED', 'SPECIFICALLY_ASKED', name='divulgencetype'), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'consultations',
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('case_id', sa.String(length=36), nullable=False),
+        sa.Column('transcript', sa.Text(), nullable=False),
+        sa.Column('overall_score', sa.Float(), nullable=True),
+        sa.Column('feedback', sa.Text(), nullable=True),
+        sa.Column('is_shared', sa.Boolean(), nullable=False),
+        sa.Column('coverage_analysis', sa.JSON(), nullable=True),
+        sa.Column('domain_scores', sa.JSON(), nullable=True),
+        sa.Column('audio_recording', sa.Text(), nullable=True),
+        sa.Column('duration_seconds', sa.Integer(), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['case_id'], ['cases.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'peer_comments',
+        sa.Column('consultation_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('comment', sa.String(length=300), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['consultation_id'], ['consultations.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('peer_comments')
+    op.drop_table('consultations')
+    op.drop_table('information_divulged')
+    op.drop_table('background_details')
+    op.drop_table('ice')
+    op.drop_table('doctor_info')
+    op.drop_index(op.f('ix_cases_case_number'), table_name='cases')
+    op.drop_table('cases')
+    op.drop_table('users')
+    sa.Enum(name='divulgencetype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='icetype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='gender').drop(op.get_bind(), checkfirst=True)
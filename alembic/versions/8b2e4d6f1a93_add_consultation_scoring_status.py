@@ -0,0 +1,37 @@
+"""add consultation scoring status
+
+Revision ID: 8b2e4d6f1a93
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a93'
+down_revision: Union[str, None] = '3f1c2a9b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+scoring_status = sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='scoringstatus')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    scoring_status.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        'consultations',
+        sa.Column('scoring_status', scoring_status, server_default='COMPLETED', nullable=False),
+    )
+    op.add_column('consultations', sa.Column('scoring_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('consultations', 'scoring_error')
+    op.drop_column('consultations', 'scoring_status')
+    scoring_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,51 @@
+"""add llm calls
+
+Revision ID: a93d5c7e1f28
+Revises: f1b6d2e8a047
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d5c7e1f28'
+down_revision: Union[str, None] = 'f1b6d2e8a047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'llm_calls',
+        sa.Column('consultation_id', sa.String(length=36), nullable=True),
+        sa.Column('endpoint', sa.String(length=100), nullable=True),
+        sa.Column('task', sa.String(length=50), nullable=False),
+        sa.Column('provider', sa.String(length=20), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+        sa.Column('completion_tokens', sa.Integer(), nullable=False),
+        sa.Column('cached_tokens', sa.Integer(), nullable=False),
+        sa.Column('queue_ms', sa.Float(), nullable=False),
+        sa.Column('time_to_first_token_ms', sa.Float(), nullable=True),
+        sa.Column('latency_ms', sa.Float(), nullable=False),
+        sa.Column('cost_usd', sa.Float(), nullable=True),
+        sa.Column('success', sa.Boolean(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['consultation_id'], ['consultations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_llm_calls_consultation_id'), 'llm_calls', ['consultation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_calls_consultation_id'), table_name='llm_calls')
+    op.drop_table('llm_calls')
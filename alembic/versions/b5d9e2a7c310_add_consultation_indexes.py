@@ -0,0 +1,66 @@
+"""add consultation indexes
+
+Revision ID: b5d9e2a7c310
+Revises: a93d5c7e1f28
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d9e2a7c310'
+down_revision: Union[str, None] = 'a93d5c7e1f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY does not block writes but cannot run inside a
+    # transaction. If a build fails, drop the INVALID index it leaves behind
+    # before running the upgrade again.
+    with op.get_context().autocommit_block():
+        # History pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        op.create_index(
+            'ix_consultations_user_id_created_at',
+            'consultations',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Shared feed pages, covering only the shared rows
+        op.create_index(
+            'ix_consultations_shared_created_at',
+            'consultations',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_where=sa.text('is_shared'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_consultations_case_id',
+            'consultations',
+            ['case_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_peer_comments_consultation_id_created_at',
+            'peer_comments',
+            ['consultation_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_peer_comments_consultation_id_created_at', table_name='peer_comments', postgresql_concurrently=True)
+        op.drop_index('ix_consultations_case_id', table_name='consultations', postgresql_concurrently=True)
+        op.drop_index('ix_consultations_shared_created_at', table_name='consultations', postgresql_concurrently=True)
+        op.drop_index('ix_consultations_user_id_created_at', table_name='consultations', postgresql_concurrently=True)
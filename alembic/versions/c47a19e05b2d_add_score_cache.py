@@ -0,0 +1,41 @@
+"""add score cache
+
+Revision ID: c47a19e05b2d
+Revises: 8b2e4d6f1a93
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a19e05b2d'
+down_revision: Union[str, None] = '8b2e4d6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'score_cache',
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_score_cache_cache_key'), 'score_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_score_cache_expires_at'), 'score_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_score_cache_expires_at'), table_name='score_cache')
+    op.drop_index(op.f('ix_score_cache_cache_key'), table_name='score_cache')
+    op.drop_table('score_cache')
@@ -0,0 +1,65 @@
+"""add recordings
+
+Revision ID: c8f4a1e6d392
+Revises: b5d9e2a7c310
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f4a1e6d392'
+down_revision: Union[str, None] = 'b5d9e2a7c310'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recordings',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('backend', sa.String(length=20), nullable=False),
+        sa.Column('storage_key', sa.String(length=200), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_recordings_sha256', 'recordings', ['sha256'], unique=True)
+    op.add_column('consultations', sa.Column('recording_id', sa.String(length=36), nullable=True))
+    # NOT VALID skips the scan of existing rows while the table is locked;
+    # VALIDATE below checks them without blocking writes
+    op.create_foreign_key(
+        'fk_consultations_recording_id_recordings', 'consultations', 'recordings',
+        ['recording_id'], ['id'], ondelete='SET NULL', postgresql_not_valid=True,
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. If the build
+    # fails, drop the INVALID index it leaves behind before upgrading again.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_consultations_recording_id'),
+            'consultations',
+            ['recording_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.execute('ALTER TABLE consultations VALIDATE CONSTRAINT fk_consultations_recording_id_recordings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_consultations_recording_id'), table_name='consultations', postgresql_concurrently=True
+        )
+    op.drop_constraint('fk_consultations_recording_id_recordings', 'consultations', type_='foreignkey')
+    op.drop_column('consultations', 'recording_id')
+    op.drop_index('ix_recordings_sha256', table_name='recordings')
+    op.drop_table('recordings')
@@ -0,0 +1,28 @@
+"""add consultation prompt version
+
+Revision ID: d5e8f3a2c614
+Revises: c47a19e05b2d
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8f3a2c614'
+down_revision: Union[str, None] = 'c47a19e05b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('consultations', sa.Column('prompt_version', sa.String(length=12), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('consultations', 'prompt_version')
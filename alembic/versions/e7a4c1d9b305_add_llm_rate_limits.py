@@ -0,0 +1,40 @@
+"""add llm rate limits
+
+Revision ID: e7a4c1d9b305
+Revises: d5e8f3a2c614
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4c1d9b305'
+down_revision: Union[str, None] = 'd5e8f3a2c614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'llm_rate_limits',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('request_level', sa.Float(), nullable=False),
+        sa.Column('token_level', sa.Float(), nullable=False),
+        sa.Column('refilled_at', sa.DateTime(), nullable=False),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_llm_rate_limits_name'), 'llm_rate_limits', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_rate_limits_name'), table_name='llm_rate_limits')
+    op.drop_table('llm_rate_limits')
@@ -0,0 +1,38 @@
+"""add case pool
+
+Revision ID: f1b6d2e8a047
+Revises: e7a4c1d9b305
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d2e8a047'
+down_revision: Union[str, None] = 'e7a4c1d9b305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'case_pool',
+        sa.Column('case_data', sa.JSON(), nullable=False),
+        sa.Column('model', sa.String(length=50), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_case_pool_created_at'), 'case_pool', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_case_pool_created_at'), table_name='case_pool')
+    op.drop_table('case_pool')
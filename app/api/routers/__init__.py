@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routers import user, consultation, case, admin
+from app.api.routers import user, consultation, case, admin, recording
 from app.core.config import settings
 
 # Create main router
@@ -10,4 +10,5 @@ router = APIRouter(prefix=settings.API_V1_STR)
 router.include_router(user.router)
 router.include_router(consultation.router)
 router.include_router(case.router)
-router.include_router(admin.router)
\ No newline at end of file
+router.include_router(admin.router)
+router.include_router(recording.router)
\ No newline at end of file
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
 from app.models.user import User
-from app.db.load import load
+from app.db.async_db_storage import AsyncDBStorage
+from app.db.load import async_load
 from app.models.case import Case
 from app.models.consultation import Consultation
 from app.core.config import settings
+from app.services.case_pool import case_pool
+from app.services.rate_limiter import rate_limiter
+from app.services.score_cache import score_cache
+from app.services.telemetry import llm_latency, llm_usage
 from loguru import logger
 
 
@@ -12,12 +17,12 @@ from loguru import logger
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/stats")
-async def get_admin_stats(db: Session = Depends(load)):
+async def get_admin_stats(db: AsyncDBStorage = Depends(async_load)):
     """Get database statistics for admin dashboard"""
     try:
-        user_count = db.query(User).count()
-        case_count = db.query(Case).count()
-        consultation_count = db.query(Consultation).count()
+        user_count = await db.scalar(select(func.count()).select_from(User))
+        case_count = await db.scalar(select(func.count()).select_from(Case))
+        consultation_count = await db.scalar(select(func.count()).select_from(Consultation))
         
         return {
             "user_count": user_count,
@@ -29,6 +34,38 @@ async def get_admin_stats(db: Session = Depends(load)):
         return {"error": str(e)}, 500
 
 
+@router.get("/score_cache")
+async def get_score_cache_stats():
+    """Get hit/miss counters for the scoring result cache"""
+    return score_cache.stats()
+
+
+@router.get("/llm_rate_limit")
+async def get_llm_rate_limit_stats():
+    """Get queue-wait and retry counters for the LLM rate limiter"""
+    return rate_limiter.stats()
+
+
+@router.get("/llm_metrics")
+async def get_llm_metrics():
+    """Get p50/p95/p99 LLM call timings and token usage per model and endpoint"""
+    return {
+        "latency": llm_latency.summary(),
+        "usage": llm_usage.summary(),
+    }
+
+
+@router.get("/case_pool")
+async def get_case_pool_stats():
+    """Get the fill level of the pre-generated case pool"""
+    return {
+        "enabled": settings.CASE_POOL_ENABLED,
+        "size": await case_pool.size(),
+        "target_size": case_pool.target_size,
+        "low_water": case_pool.low_water,
+    }
+
+
 @router.get("/admin/test-openai")
 async def test_openai_connection():
     """Test OpenAI connection"""
@@ -3,10 +3,14 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
 import httpx
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from app.models.user import User
-from app.services.consultation import generate_case, score_consultation
-from app.db.load import load
+from app.services.consultation import agenerate_case, score_consultation
+from app.services.case_pool import build_case, case_pool
+from app.services.telemetry import collect_llm_calls
+from app.services.cases import case_details_options
+from app.db.async_db_storage import AsyncDBStorage
+from app.db.load import async_load
 from app.models.case import Case, ICE, BackgroundDetail, InformationDivulged, DoctorInfo
 from app.schema.case import CreateCaseRequest, CaseDetails
 from app.core.config import settings
@@ -17,42 +21,27 @@ router = APIRouter(prefix="/cases", tags=["cases"])
 
 
 @router.get("/generate_case", status_code=status.HTTP_200_OK) 
-async def generate_case(db: Session = Depends(load)):
-    """Generate a new patient case for consultation"""
+async def generate_case(db: AsyncDBStorage = Depends(async_load)):
+    """
+    Generate a new patient case for consultation
+    
+    Cases come from the pre-generated pool, so this normally returns without
+    waiting for the model; only an empty pool falls back to generating inline.
+    """
     try:
-        # case_data = generate_case()
-        case_data = {
-            "name": "John Doe",
-            "age": 30,
-            "presenting": "I have a headache",
-            "context": "I have a headache"
-        }
-        
-        # Store the case in the database
-        new_case = Case(
-            case_number=case_data["name"],
-            patient_name=case_data["name"],
-            patient_age=case_data["age"],
-            patient_gender=None,  # Will be set based on generated case data in the future
-            presenting_complaint=case_data["presenting"],
-            notes=case_data["context"]
-        )
-        db.add(new_case)
-        db.commit()
-        db.refresh(new_case)
-        
-        doctor_info = DoctorInfo(
-            case_id=new_case.id,
-            name=case_data["name"],
-            age=case_data["age"],
-            past_medical_history="Patient reports occasional migraines since age 25",
-            current_medication="Paracetamol as needed",
-            context="Patient is a software engineer who works long hours on the computer"
-        )
-        db.add(doctor_info)
-        db.commit()
+        popped = await case_pool.pop(db)
+        if popped is not None:
+            case_data, new_case = popped
+        else:
+            with collect_llm_calls("GET /cases/generate_case"):
+                case_data, _ = await agenerate_case()
+            
+            # Store the case and its doctor information in one transaction
+            new_case = build_case(case_data)
+            db.add(new_case)
+            await db.commit()
         
-        return case_data
+        return {**case_data, "case_id": new_case.id}
     except Exception as e:
         error_detail = str(e)
         raise HTTPException(status_code=(
@@ -68,7 +57,7 @@ async def generate_case(db: Session = Depends(load)):
 
 
 @router.post("/create_case", status_code=status.HTTP_201_CREATED, response_model=CaseDetails)  
-async def create_case(request: CreateCaseRequest, db: Session = Depends(load)):
+async def create_case(request: CreateCaseRequest, db: AsyncDBStorage = Depends(async_load)):
     """Create a new patient case with ICE entries, background details, and information divulged"""
     try:
         # Create the main case record
@@ -80,66 +69,55 @@ async def create_case(request: CreateCaseRequest, db: Session = Depends(load)):
             presenting_complaint=request.presenting_complaint,
             notes=request.notes
         )
-        db.add(new_case)
         
-        # Commit to get the new case ID
-        db.commit()
-        db.refresh(new_case)
-        
-        # Create ICE entries
-        for ice_entry in request.ice_entries:
-            ice = ICE(
-                case_id=new_case.id,
-                ice_type=ice_entry.ice_type,
-                description=ice_entry.description
-            )
-            db.add(ice)
-        
-        # Create background details
-        for bg_detail in request.background_details:
-            detail = BackgroundDetail(
-                case_id=new_case.id,
-                detail=bg_detail.detail
-            )
-            db.add(detail)
-        
-        # Create information divulged entries
-        for info_divulged in request.information_divulged:
-            info = InformationDivulged(
-                case_id=new_case.id,
+        # Attach child records through the relationships so the whole
+        # case is written in a single commit and its collections stay
+        # loaded for the response
+        new_case.ice_entries = [
+            ICE(ice_type=ice_entry.ice_type, description=ice_entry.description)
+            for ice_entry in request.ice_entries
+        ]
+        new_case.background_details = [
+            BackgroundDetail(detail=bg_detail.detail)
+            for bg_detail in request.background_details
+        ]
+        new_case.information_divulged = [
+            InformationDivulged(
                 divulgence_type=info_divulged.divulgence_type,
                 description=info_divulged.description
             )
-            db.add(info)
-            
+            for info_divulged in request.information_divulged
+        ]
+        
         # Create doctor info if provided
+        new_case.doctor_info = None
         if request.doctor_info:
-            doctor_info = DoctorInfo(
-                case_id=new_case.id,
+            new_case.doctor_info = DoctorInfo(
                 name=request.doctor_info.name,
                 age=request.doctor_info.age,
                 past_medical_history=request.doctor_info.past_medical_history,
                 current_medication=request.doctor_info.current_medication,
                 context=request.doctor_info.context
             )
-            db.add(doctor_info)
         
-        db.commit()        
-        db.refresh(new_case)
+        db.add(new_case)
+        await db.commit()
         
         return new_case
     except Exception as e:
         if hasattr(db, 'rollback'):
-            db.rollback()
+            await db.rollback()
         logger.exception(f"Error creating case: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def get_cases(db: Session = Depends(load)):
+async def get_cases(db: AsyncDBStorage = Depends(async_load)):
     """Get all patient cases"""
     try:
-        cases = db.query(Case).order_by(Case.created_at.desc()).all()
+        cases = (await db.scalars(
+            select(Case).order_by(Case.created_at.desc())
+        )).all()
         
         result = []
         for case in cases:
@@ -167,10 +145,12 @@ async def get_cases(db: Session = Depends(load)):
 
 
 @router.get("/{case_id}", status_code=status.HTTP_200_OK, response_model=CaseDetails)
-async def get_case(case_id: str, db: Session = Depends(load)):
+async def get_case(case_id: str, db: AsyncDBStorage = Depends(async_load)):
     """Get a specific patient case by ID with all related data"""
     try:
-        case = db.query(Case).filter_by(id=case_id).first()
+        case = (await db.scalars(
+            select(Case).options(*case_details_options()).filter_by(id=case_id)
+        )).first()
         
         if not case:
             raise HTTPException(
@@ -189,10 +169,12 @@ async def get_case(case_id: str, db: Session = Depends(load)):
         )
 
 @router.get("/{case_id}/doctor_info", status_code=status.HTTP_200_OK)
-async def get_doctor_info(case_id: str, db: Session = Depends(load)):
+async def get_doctor_info(case_id: str, db: AsyncDBStorage = Depends(async_load)):
     """Get doctor information for a specific case"""
     try:
-        doctor_info = db.query(DoctorInfo).filter_by(case_id=case_id).first()
+        doctor_info = (await db.scalars(
+            select(DoctorInfo).filter_by(case_id=case_id)
+        )).first()
         
         if not doctor_info:
             raise HTTPException(
@@ -1,45 +1,141 @@
+import asyncio
 import json
-import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+import math
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 import httpx
-from sqlalchemy.orm import Session
-from app.models.user import User
-from app.services.consultation import generate_case, score_consultation
-from app.db.load import load
-from app.models.case import Case
-from app.models.consultation import Consultation, PeerComment
-from app.schema.consultation import CommentRequest, ScoreRequest
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload, undefer, undefer_group
+from app.services.consultation import (
+    apply_scores,
+    consultation_scores,
+    stream_score_consultation,
+)
+from app.services.cases import case_cache, case_details_options
+from app.services.rate_limiter import LLMRateLimitError
+from app.services.score_cache import score_cache, scoring_cache_key
+from app.services.scoring_jobs import ScoringQueueFullError, scoring_jobs
+from app.services.telemetry import collect_llm_calls, llm_call_rows
+from app.db.async_db_storage import AsyncDBStorage
+from app.db.load import async_load
+from app.models.case import Case, ICE, BackgroundDetail, InformationDivulged, DoctorInfo
+from app.models.consultation import Consultation, PeerComment, ScoringStatus
+from app.schema.consultation import BatchScoreRequest, CaseScoreRequest, CommentRequest, ScoreRequest
 from app.core.config import settings
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.sse import format_sse, format_sse_comment
 from loguru import logger
 
 
 router = APIRouter(prefix="/consultations", tags=["consultations"])
 
 
+async def get_or_create_case(db, case_details):
+    """
+    Find the case referenced by a scoring request, creating it if needed
+    
+    The case is returned with its child rows loaded so it can be scored
+    directly, reusing the rendered context cached for its id.
+    """
+    case = (await db.scalars(
+        select(Case).options(*case_details_options()).filter_by(
+            case_number=case_details.case_number
+        )
+    )).first()
+    
+    if not case:
+        # If case doesn't exist, create it with the details from the request
+        case = Case(
+            case_number=case_details.case_number,
+            patient_name=case_details.patient_name,
+            patient_age=case_details.patient_age,
+            patient_gender=case_details.patient_gender,
+            presenting_complaint=case_details.presenting_complaint,
+            notes=case_details.notes
+        )
+        case.ice_entries = [
+            ICE(ice_type=ice.ice_type, description=ice.description)
+            for ice in case_details.ice_entries
+        ]
+        case.background_details = [
+            BackgroundDetail(detail=detail.detail)
+            for detail in case_details.background_details
+        ]
+        case.information_divulged = [
+            InformationDivulged(divulgence_type=info.divulgence_type, description=info.description)
+            for info in case_details.information_divulged
+        ]
+        case.doctor_info = None
+        if case_details.doctor_info:
+            case.doctor_info = DoctorInfo(
+                name=case_details.doctor_info.name,
+                age=case_details.doctor_info.age,
+                past_medical_history=case_details.doctor_info.past_medical_history,
+                current_medication=case_details.doctor_info.current_medication,
+                context=case_details.doctor_info.context
+            )
+        db.add(case)
+        await db.commit()
+    
+    return case
+
+
+async def resolve_case(db, request):
+    """
+    Resolve the case a scoring request refers to
+    
+    Lean requests are served from the read-through case cache; requests that
+    carry the full case details fall back to find-or-create by case number.
+    Either way the request session is left without an open transaction, so
+    its connection goes back to the pool during the scoring call.
+    """
+    if isinstance(request, CaseScoreRequest):
+        case = await case_cache.get(request.case_id)
+        if case is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Case with ID {request.case_id} not found"
+            )
+        return case
+    case = await get_or_create_case(db, request.case_details)
+    # Ends the read transaction; sessions keep their objects loaded across commits
+    await db.commit()
+    return case
+
+
+def scoring_job_status(consultation):
+    """Summarise the scoring state of a consultation for the job endpoints"""
+    completed = consultation.scoring_status == ScoringStatus.COMPLETED
+    return {
+        "consultation_id": consultation.id,
+        "status": consultation.scoring_status.value,
+        "error": consultation.scoring_error,
+        "result": consultation_scores(consultation) if completed else None,
+    }
+
+
+def rate_limit_exception(error):
+    """HTTP 429 for a scoring call that could not be made within the LLM rate limits"""
+    retry_after = max(1, math.ceil(error.retry_after or settings.LLM_RETRY_BASE_DELAY_SECONDS))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(error),
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
 @router.post("/score_consultation", status_code=status.HTTP_201_CREATED)  
-async def score_consultation_route(request: ScoreRequest, db: Session = Depends(load)):
-    """Score a completed consultation based on transcript and case details"""
+async def score_consultation_route(
+    request: Union[CaseScoreRequest, ScoreRequest],
+    db: AsyncDBStorage = Depends(async_load),
+):
+    """Score a completed consultation based on transcript and either a case id or full case details"""
     try:
-        scores = score_consultation(request.transcript, request.case_details)
-        
-        # Find or create the case
-        case = db.query(Case).filter_by(
-            case_number=request.case_details.case_number
-        ).first()
-        
-        if not case:
-            # If case doesn't exist, create it
-            case = Case(
-                case_number=request.case_details.case_number,
-                patient_name=request.case_details.patient_name,
-                patient_age=request.case_details.patient_age,
-                presenting_complaint=request.case_details.presenting_complaint,
-                notes=request.case_details.notes
-            )
-            db.add(case)
-            db.commit()
-            db.refresh(case)
+        case = await resolve_case(db, request)
+        
+        with collect_llm_calls("POST /consultations/score_consultation") as llm_calls:
+            scores = await score_cache.score(request.transcript, case)
         
         consultation = Consultation(
             user_id=request.user_id,
@@ -49,61 +145,465 @@ async def score_consultation_route(request: ScoreRequest, db: Session = Depends(
             feedback=scores["feedback"],
             domain_scores=scores["scores"],
             coverage_analysis=scores["coverage_analysis"],
+            prompt_version=scores.get("prompt_version"),
             audio_recording=None, 
             duration_seconds=None
         )
         
         db.add(consultation)
-        db.commit()
-        db.refresh(consultation)
+        db.add_all(llm_call_rows(llm_calls, consultation.id))
+        await db.commit()
         
         scores["consultation_id"] = consultation.id
         
         return scores
+    except HTTPException:
+        raise
+    except LLMRateLimitError as e:
+        logger.warning(f"Scoring rate limited: {e}")
+        raise rate_limit_exception(e)
     except Exception as e:
-        logger.exception(f"Error scoring consultation")
+        logger.exception("Error scoring consultation")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@router.get("/history/{user_id}", status_code=status.HTTP_200_OK)
-async def get_history(user_id: str, db: Session = Depends(load)):
-    """Get history of consultation scores for a specific user"""
+def score_sections(scores):
+    """Split a complete scoring result into the sections emitted while streaming"""
+    for domain, value in scores["scores"].items():
+        yield f"scores.{domain}", value
+    for key in ("overall_score", "feedback", "coverage_analysis"):
+        if key in scores:
+            yield key, scores[key]
+
+
+async def save_consultation(consultation, llm_calls=()):
+    """Persist a consultation and the telemetry of its LLM calls in a short-lived session of its own"""
+    db = AsyncDBStorage()
+    db.setup_db()
     try:
-        consultations = db.query(Consultation).filter(
-            Consultation.user_id == user_id
-        ).join(
-            Case
-        ).order_by(Consultation.created_at.desc()).all()
+        db.add(consultation)
+        db.add_all(llm_call_rows(llm_calls, consultation.id))
+        await db.commit()
+    finally:
+        await db.close()
+
+
+@router.post("/score_consultation/stream")
+async def stream_score_consultation_route(
+    request: Union[CaseScoreRequest, ScoreRequest],
+    db: AsyncDBStorage = Depends(async_load),
+):
+    """
+    Score a consultation and stream the result as Server-Sent Events
+    
+    Each domain score (`scores.data_gathering`, ...) and each top-level section
+    (`overall_score`, `feedback`, `coverage_analysis`) is sent as its own event
+    as soon as the model has finished generating it. A final `complete` event
+    carries the full result with the id of the stored consultation.
+    """
+    try:
+        case = await resolve_case(db, request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error resolving case for streamed scoring")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    
+    async def events():
+        try:
+            cache_key = None
+            scores = None
+            if settings.SCORE_CACHE_ENABLED:
+                cache_key = scoring_cache_key(request.transcript, case)
+                scores = await score_cache.get(cache_key)
+            
+            llm_calls = []
+            if scores is not None:
+                for key, value in score_sections(scores):
+                    yield format_sse(key, value)
+            else:
+                with collect_llm_calls("POST /consultations/score_consultation/stream") as llm_calls:
+                    async for kind, key, value in stream_score_consultation(request.transcript, case):
+                        if kind == "section":
+                            yield format_sse(key, value)
+                        else:
+                            scores = value
+                if cache_key:
+                    await score_cache.set(cache_key, scores)
+            
+            consultation = Consultation(
+                user_id=request.user_id,
+                case_id=case.id,
+                transcript=request.transcript,
+                audio_recording=None,
+                duration_seconds=None
+            )
+            apply_scores(consultation, scores)
+            await save_consultation(consultation, llm_calls)
+            
+            scores["consultation_id"] = consultation.id
+            yield format_sse("complete", scores)
+        except LLMRateLimitError as e:
+            logger.warning(f"Streamed scoring rate limited: {e}")
+            yield format_sse("error", {
+                "error": str(e),
+                "status_code": status.HTTP_429_TOO_MANY_REQUESTS,
+                "retry_after": rate_limit_exception(e).headers["Retry-After"],
+            })
+        except Exception as e:
+            logger.exception("Error streaming consultation score")
+            yield format_sse("error", {"error": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def format_ndjson(data):
+    """Serialise one line of a newline-delimited JSON stream"""
+    return json.dumps(data, default=str) + "\n"
+
+
+@router.post("/score_consultation/batch")
+async def score_consultation_batch(request: BatchScoreRequest):
+    """
+    Score many consultations and stream the results as NDJSON
+    
+    Items are scored concurrently (at most SCORING_BATCH_CONCURRENCY at a
+    time) and one line is sent per item as soon as it finishes, in completion
+    order, carrying the item's `index` in the request. Completed items get the
+    id their consultation will be stored under; all consultations are then
+    inserted in a single transaction, and a final `summary` line reports
+    whether that commit succeeded.
+    """
+    if len(request.items) > settings.SCORING_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch can hold at most {settings.SCORING_BATCH_MAX_ITEMS} items"
+        )
+    
+    semaphore = asyncio.Semaphore(settings.SCORING_BATCH_CONCURRENCY)
+    
+    async def score_item(index, item):
+        async with semaphore:
+            with collect_llm_calls("POST /consultations/score_consultation/batch") as llm_calls:
+                try:
+                    case = await case_cache.get(item.case_id)
+                    if case is None:
+                        return index, None, f"Case with ID {item.case_id} not found", llm_calls
+                    return index, await score_cache.score(item.transcript, case), None, llm_calls
+                except Exception as e:
+                    logger.exception(f"Error scoring batch item {index}")
+                    return index, None, str(e), llm_calls
+    
+    async def lines():
+        tasks = [
+            asyncio.ensure_future(score_item(index, item))
+            for index, item in enumerate(request.items)
+        ]
+        consultations = []
+        rows = []
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, scores, error, llm_calls = await next_done
+                if error is not None:
+                    failed += 1
+                    yield format_ndjson({"type": "item", "index": index, "status": "failed", "error": error})
+                    continue
+                
+                item = request.items[index]
+                consultation = Consultation(
+                    user_id=item.user_id,
+                    case_id=item.case_id,
+                    transcript=item.transcript,
+                    audio_recording=None,
+                    duration_seconds=None
+                )
+                apply_scores(consultation, scores)
+                consultations.append(consultation)
+                rows += llm_call_rows(llm_calls, consultation.id)
+                scores["consultation_id"] = consultation.id
+                yield format_ndjson({"type": "item", "index": index, "status": "completed", "result": scores})
+        finally:
+            # Stop scoring if the client went away
+            for task in tasks:
+                task.cancel()
+        
+        summary = {"type": "summary", "completed": len(consultations), "failed": failed, "committed": True}
+        if consultations:
+            db = AsyncDBStorage()
+            db.setup_db()
+            try:
+                db.add_all(consultations)
+                db.add_all(rows)
+                await db.commit()
+            except Exception as e:
+                logger.exception(f"Error storing batch of {len(consultations)} consultations")
+                summary.update(committed=False, error=str(e))
+            finally:
+                await db.close()
+        yield format_ndjson(summary)
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/score_consultation/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_scoring_job(
+    request: Union[CaseScoreRequest, ScoreRequest],
+    db: AsyncDBStorage = Depends(async_load),
+):
+    """
+    Persist a consultation and score it in the background
+    
+    Returns immediately with the consultation id. Poll the job status endpoint
+    or subscribe to its event stream to receive the scores.
+    """
+    try:
+        case = await resolve_case(db, request)
         
-        history = []
-        for consultation in consultations:
-            has_recording = consultation.audio_recording is not None
+        consultation = Consultation(
+            user_id=request.user_id,
+            case_id=case.id,
+            transcript=request.transcript,
+            scoring_status=ScoringStatus.PENDING,
+            audio_recording=None,
+            duration_seconds=None
+        )
+        db.add(consultation)
+        await db.commit()
+        
+        try:
+            scoring_jobs.submit(consultation.id, request.transcript, case)
+        except ScoringQueueFullError as e:
+            consultation.scoring_status = ScoringStatus.FAILED
+            consultation.scoring_error = str(e)
+            await db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": "30"},
+            )
+        
+        return {
+            "consultation_id": consultation.id,
+            "status": consultation.scoring_status.value,
+            "status_url": f"{router.prefix}/score_consultation/jobs/{consultation.id}",
+            "events_url": f"{router.prefix}/score_consultation/jobs/{consultation.id}/events",
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error submitting scoring job")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/score_consultation/jobs/{consultation_id}", status_code=status.HTTP_200_OK)
+async def get_scoring_job(consultation_id: str, db: AsyncDBStorage = Depends(async_load)):
+    """Get the status of a background scoring job, with the scores once complete"""
+    consultation = await db.find_by_id(Consultation, consultation_id, options=[undefer_group("scores")])
+    
+    if not consultation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Consultation with ID {consultation_id} not found"
+        )
+    
+    return scoring_job_status(consultation)
+
+
+async def fetch_consultation(consultation_id):
+    """Load a consultation in a short-lived session of its own"""
+    db = AsyncDBStorage()
+    db.setup_db()
+    try:
+        return await db.find_by_id(Consultation, consultation_id, options=[undefer_group("scores")])
+    finally:
+        await db.close()
+
+
+@router.get("/score_consultation/jobs/{consultation_id}/events")
+async def stream_scoring_job(consultation_id: str):
+    """
+    Stream the progress of a background scoring job as Server-Sent Events
+    
+    Emits a `status` event on every state change, then a `result` event with
+    the scores or an `error` event if scoring failed.
+    """
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.SCORING_JOB_STREAM_TIMEOUT_SECONDS
+        last_status = None
+        
+        while True:
+            consultation = await fetch_consultation(consultation_id)
+            if consultation is None:
+                yield format_sse("error", {"error": "Consultation not found"})
+                return
             
-            # Get comment count if consultation is shared
-            comment_count = 0
-            if consultation.is_shared:
-                comment_count = len(consultation.peer_comments)
+            job = scoring_job_status(consultation)
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield format_sse("status", {"consultation_id": consultation_id, "status": last_status})
             
+            if last_status == ScoringStatus.COMPLETED.value:
+                yield format_sse("result", job["result"])
+                return
+            if last_status == ScoringStatus.FAILED.value:
+                yield format_sse("error", {"error": job["error"]})
+                return
+            if loop.time() >= deadline:
+                yield format_sse("timeout", {"consultation_id": consultation_id, "status": last_status})
+                return
+            
+            # Jobs running on this worker signal completion directly; jobs
+            # queued on another worker are polled through the database
+            if scoring_jobs.is_local(consultation_id):
+                await scoring_jobs.wait(consultation_id, settings.SCORING_JOB_POLL_INTERVAL_SECONDS * 15)
+            else:
+                await asyncio.sleep(settings.SCORING_JOB_POLL_INTERVAL_SECONDS)
+            yield format_sse_comment()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Computed in SQL so the recording itself is never read to answer it; older
+# consultations may still hold their audio inline
+has_recording = or_(
+    Consultation.recording_id.is_not(None),
+    Consultation.audio_recording.is_not(None),
+).label("has_recording")
+
+
+def consultation_case_details(case):
+    """The case fields shown with a consultation"""
+    return {
+        "case_number": case.case_number,
+        "patient_name": case.patient_name,
+        "patient_age": case.patient_age,
+        "presenting_complaint": case.presenting_complaint,
+        "notes": case.notes
+    }
+
+
+def consultation_summaries(*criteria, cursor=None, limit=None):
+    """
+    One query for a page of a consultation list endpoint
+    
+    Selects only the listed columns, joins the case and counts peer comments
+    with a correlated subquery, so a page costs one round trip and only the
+    comments of the rows on the page are counted. Pages are keyed on
+    (created_at, id) rather than an offset, so every page is an index range
+    scan and a late page costs the same as the first.
+    
+    Args:
+        criteria: Filters on Consultation, e.g. Consultation.user_id == user_id
+        cursor (str): next_cursor of the previous page, if any
+        limit (int): Page size; one extra row is fetched to detect a next page
+        
+    Returns:
+        Select: Rows for consultation_summary, newest first
+        
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        criteria += (tuple_(Consultation.created_at, Consultation.id) < tuple_(created_at, id),)
+    comment_count = (
+        select(func.count())
+        .where(PeerComment.consultation_id == Consultation.id)
+        .correlate(Consultation)
+        .scalar_subquery()
+        .label("comment_count")
+    )
+    return (
+        select(
+            Consultation.id,
+            Consultation.created_at,
+            Consultation.overall_score,
+            Consultation.duration_seconds,
+            Consultation.is_shared,
+            has_recording,
+            Case.case_number,
+            Case.patient_name,
+            Case.patient_age,
+            Case.presenting_complaint,
+            Case.notes,
+            comment_count,
+        )
+        .join(Case, Consultation.case_id == Case.id)
+        .where(*criteria)
+        .order_by(Consultation.created_at.desc(), Consultation.id.desc())
+        .limit(limit + 1 if limit else None)
+    )
+
+
+def next_page(rows, limit):
+    """
+    Split the rows fetched by consultation_summaries into a page and its cursor
+    
+    Returns:
+        tuple[list, str | None]: The rows of the page and the next_cursor, None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def consultation_summary(row):
+    """
+    List entry for a row of consultation_summaries
+
+    Only the overall score is listed; domain scores and feedback are served by
+    GET /{consultation_id}.
+    """
+    return {
+        "id": row.id,
+        "timestamp": row.created_at.isoformat(),
+        "case_details": consultation_case_details(row),
+        "overall_score": row.overall_score,
+        "has_recording": row.has_recording,
+        "duration_seconds": row.duration_seconds if row.has_recording else None,
+    }
+
+
+@router.get("/history/{user_id}", status_code=status.HTTP_200_OK)
+async def get_history(
+    user_id: str,
+    limit: int = Query(settings.CONSULTATION_PAGE_SIZE, ge=1, le=settings.CONSULTATION_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncDBStorage = Depends(async_load),
+):
+    """Get a page of the history of consultation scores for a specific user, newest first"""
+    try:
+        rows, next_cursor = next_page((await db.execute(consultation_summaries(
+            Consultation.user_id == user_id, cursor=cursor, limit=limit
+        ))).all(), limit)
+        
+        history = []
+        for row in rows:
             history.append({
-                "id": consultation.id,
-                "timestamp": consultation.created_at.isoformat(),
-                "case_details": {
-                    "case_number": consultation.case.case_number,
-                    "patient_name": consultation.case.patient_name,
-                    "patient_age": consultation.case.patient_age,
-                    "presenting_complaint": consultation.case.presenting_complaint,
-                    "notes": consultation.case.notes
-                },
-                "scores": consultation.domain_scores,
-                "overall_score": consultation.overall_score,
-                "feedback": consultation.feedback,
-                "has_recording": has_recording,
-                "duration_seconds": consultation.duration_seconds if has_recording else None,
-                "is_shared": consultation.is_shared,
-                "comment_count": comment_count
+                **consultation_summary(row),
+                "is_shared": row.is_shared,
+                # Comments are only counted while the consultation is shared
+                "comment_count": row.comment_count if row.is_shared else 0
             })
         
-        return {"history": history}
+        return {"history": history, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting history: {e}")
         error_detail = str(e)
@@ -132,7 +632,8 @@ async def get_vapi_call(call_id: str):
             "Content-Type": "application/json"
         }
         
-        response = httpx.get(vapi_url, headers=headers)
+        async with httpx.AsyncClient() as client:
+            response = await client.get(vapi_url, headers=headers)
         if not response.ok:
             return JSONResponse(
                 status_code=response.status_code,
@@ -211,10 +712,10 @@ async def get_vapi_call(call_id: str):
 
 # Peer collaboration API routes
 @router.post("/{consultation_id}/share")
-async def share_consultation(consultation_id: int, db: Session = Depends(load)):
+async def share_consultation(consultation_id: int, db: AsyncDBStorage = Depends(async_load)):
     """Share a consultation for peer review"""
     try:
-        consultation = db.query(Consultation).filter_by(id=consultation_id).first()
+        consultation = await db.find_by_id(Consultation, consultation_id)
         
         if not consultation:
             return JSONResponse(
@@ -223,7 +724,7 @@ async def share_consultation(consultation_id: int, db: Session = Depends(load)):
             )
         
         consultation.is_shared = True
-        db.commit()
+        await db.commit()
         
         return {"status": "success", "message": "Consultation shared for peer review"}
     except Exception as e:
@@ -234,10 +735,10 @@ async def share_consultation(consultation_id: int, db: Session = Depends(load)):
         )
 
 @router.post("/{consultation_id}/unshare")
-async def unshare_consultation(consultation_id: int, db: Session = Depends(load)):
+async def unshare_consultation(consultation_id: int, db: AsyncDBStorage = Depends(async_load)):
     """Unshare a consultation from peer review"""
     try:
-        consultation = db.query(Consultation).filter_by(id=consultation_id).first()
+        consultation = await db.find_by_id(Consultation, consultation_id)
         
         if not consultation:
             return JSONResponse(
@@ -246,7 +747,7 @@ async def unshare_consultation(consultation_id: int, db: Session = Depends(load)
             )
         
         consultation.is_shared = False
-        db.commit()
+        await db.commit()
         
         return {"status": "success", "message": "Consultation removed from peer review"}
     except Exception as e:
@@ -257,45 +758,38 @@ async def unshare_consultation(consultation_id: int, db: Session = Depends(load)
         )
 
 @router.get("/shared_consultations")
-async def get_shared_consultations(db: Session = Depends(load)):
-    """Get all shared consultations for peer review"""
+async def get_shared_consultations(
+    limit: int = Query(settings.CONSULTATION_PAGE_SIZE, ge=1, le=settings.CONSULTATION_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncDBStorage = Depends(async_load),
+):
+    """Get a page of the shared consultations for peer review, newest first"""
     try:
-        consultations = db.query(Consultation).filter_by(is_shared=True).join(
-            Case
-        ).order_by(Consultation.created_at.desc()).all()
+        # A bare is_shared filter matches the predicate of the partial index;
+        # "is_shared IS true" does not
+        rows, next_cursor = next_page((await db.execute(consultation_summaries(
+            Consultation.is_shared, cursor=cursor, limit=limit
+        ))).all(), limit)
         
         shared = []
-        for consultation in consultations:
-            has_recording = consultation.audio_recording is not None
-            
+        for row in rows:
             shared.append({
-                "id": consultation.id,
-                "timestamp": consultation.created_at.isoformat(),
-                "case_details": {
-                    "case_number": consultation.case.case_number,
-                    "patient_name": consultation.case.patient_name,
-                    "patient_age": consultation.case.patient_age,
-                    "presenting_complaint": consultation.case.presenting_complaint,
-                    "notes": consultation.case.notes
-                },
-                "scores": consultation.domain_scores,
-                "overall_score": consultation.overall_score,
-                "feedback": consultation.feedback,
-                "has_recording": has_recording,
-                "duration_seconds": consultation.duration_seconds if has_recording else None,
-                "comment_count": len(consultation.peer_comments)
+                **consultation_summary(row),
+                "comment_count": row.comment_count
             })
         
-        return {"shared_consultations": shared}
+        return {"shared_consultations": shared, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving shared consultations: {e}")
         return {"error": str(e)}, 500
 
 @router.post("/{consultation_id}/comments")
-async def add_comment(consultation_id: int, comment_request: CommentRequest, db: Session = Depends(load)):
+async def add_comment(consultation_id: int, comment_request: CommentRequest, db: AsyncDBStorage = Depends(async_load)):
     """Add a comment to a shared consultation"""
     try:
-        consultation = db.query(Consultation).filter_by(id=consultation_id).first()
+        consultation = await db.find_by_id(Consultation, consultation_id)
         
         if not consultation:
             return JSONResponse(
@@ -317,8 +811,7 @@ async def add_comment(consultation_id: int, comment_request: CommentRequest, db:
         )
         
         db.add(comment)
-        db.commit()
-        db.refresh(comment)
+        await db.commit()
         
         return {
             "status": "success",
@@ -333,10 +826,14 @@ async def add_comment(consultation_id: int, comment_request: CommentRequest, db:
         )
 
 @router.get("/{consultation_id}/comments")
-async def get_comments(consultation_id: int, db: Session = Depends(load)):
+async def get_comments(consultation_id: int, db: AsyncDBStorage = Depends(async_load)):
     """Get all comments for a shared consultation"""
     try:
-        consultation = db.query(Consultation).filter_by(id=consultation_id).first()
+        consultation = (await db.scalars(
+            select(Consultation).options(
+                selectinload(Consultation.peer_comments).selectinload(PeerComment.user)
+            ).filter_by(id=consultation_id)
+        )).first()
         
         if not consultation:
             return JSONResponse(
@@ -368,3 +865,45 @@ async def get_comments(consultation_id: int, db: Session = Depends(load)):
         )
 
 
+@router.get("/{consultation_id}", status_code=status.HTTP_200_OK)
+async def get_consultation(consultation_id: str, db: AsyncDBStorage = Depends(async_load)):
+    """
+    Get a consultation with its transcript, scores and coverage analysis
+    
+    The list endpoints leave these out. The audio recording is streamed
+    separately from recording_url.
+    """
+    options = [joinedload(Consultation.case), undefer_group("scores"), undefer(Consultation.transcript)]
+    
+    row = (await db.execute(
+        select(Consultation, has_recording).options(*options).where(Consultation.id == consultation_id)
+    )).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Consultation with ID {consultation_id} not found"
+        )
+    
+    consultation = row.Consultation
+    detail = {
+        "id": consultation.id,
+        "user_id": consultation.user_id,
+        "timestamp": consultation.created_at.isoformat(),
+        "case_id": consultation.case_id,
+        "case_details": consultation_case_details(consultation.case),
+        "transcript": consultation.transcript,
+        "scoring_status": consultation.scoring_status.value,
+        "scores": consultation.domain_scores,
+        "overall_score": consultation.overall_score,
+        "feedback": consultation.feedback,
+        "coverage_analysis": consultation.coverage_analysis,
+        "prompt_version": consultation.prompt_version,
+        "has_recording": row.has_recording,
+        "recording_url": (
+            f"{settings.API_V1_STR}{router.prefix}/{consultation.id}/recording" if row.has_recording else None
+        ),
+        "duration_seconds": consultation.duration_seconds if row.has_recording else None,
+        "is_shared": consultation.is_shared,
+    }
+    return detail
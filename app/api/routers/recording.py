@@ -0,0 +1,148 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from loguru import logger
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.db.async_db_storage import AsyncDBStorage
+from app.db.load import async_load
+from app.models.consultation import Consultation
+from app.services.recording_store import (
+    RecordingTooLargeError,
+    decode_inline_recording,
+    parse_range,
+    recording_store,
+)
+
+
+router = APIRouter(prefix="/consultations", tags=["recordings"])
+
+
+async def find_consultation(db, consultation_id, options=()):
+    consultation = await db.find_by_id(Consultation, consultation_id, options=list(options))
+    if not consultation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Consultation with ID {consultation_id} not found"
+        )
+    return consultation
+
+
+@router.put("/{consultation_id}/recording", status_code=status.HTTP_201_CREATED)
+async def upload_recording(
+    consultation_id: str,
+    request: Request,
+    duration_seconds: Optional[int] = Query(None, ge=0),
+    db: AsyncDBStorage = Depends(async_load),
+):
+    """
+    Upload the audio recording of a consultation as the raw request body
+
+    The body is streamed into the recording store chunk by chunk, so uploads
+    of any size use constant memory. Identical audio is stored once. No
+    transaction is open while the body streams in; the recording is attached
+    in a short one afterwards.
+    """
+    consultation = await find_consultation(db, consultation_id)
+    # Ends the read transaction; sessions keep their objects loaded across commits
+    await db.commit()
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.RECORDING_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Recording exceeds the {settings.RECORDING_MAX_BYTES} byte limit"
+        )
+
+    content_type = request.headers.get("content-type") or "application/octet-stream"
+    try:
+        recording, deduplicated = await recording_store.attach(
+            db, consultation, request.stream(), content_type, duration_seconds
+        )
+    except RecordingTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    logger.info(
+        f"Stored a {recording.size_bytes} byte recording for consultation {consultation_id}"
+        f"{' (deduplicated)' if deduplicated else ''}"
+    )
+    return {
+        "consultation_id": consultation.id,
+        "recording_id": recording.id,
+        "sha256": recording.sha256,
+        "size_bytes": recording.size_bytes,
+        "content_type": recording.content_type,
+        "duration_seconds": consultation.duration_seconds,
+        "deduplicated": deduplicated,
+    }
+
+
+def legacy_recording(audio_recording):
+    """
+    Decode audio saved inline on the consultation before the recording store
+
+    Returns:
+        tuple[bytes, str]: The audio and its media type
+    """
+    try:
+        return decode_inline_recording(audio_recording)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Stored recording could not be decoded"
+        )
+
+
+@router.get("/{consultation_id}/recording")
+async def download_recording(consultation_id: str, request: Request, db: AsyncDBStorage = Depends(async_load)):
+    """
+    Stream the audio recording of a consultation
+
+    Supports single HTTP byte ranges, so players can seek without
+    downloading the whole file.
+    """
+    consultation = await find_consultation(db, consultation_id, [selectinload(Consultation.recording)])
+
+    recording = consultation.recording
+    if recording is not None:
+        size = recording.size_bytes
+        content_type = recording.content_type
+        etag = f'"{recording.sha256}"'
+    else:
+        await db.refresh(consultation, attribute_names=["audio_recording"])
+        if consultation.audio_recording is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Consultation with ID {consultation_id} has no recording"
+            )
+        audio, content_type = legacy_recording(consultation.audio_recording)
+        size = len(audio)
+        etag = None
+
+    headers = {"Accept-Ranges": "bytes"}
+    if etag:
+        headers["ETag"] = etag
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    status_code = status.HTTP_200_OK
+    if byte_range:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if recording is not None:
+        body = recording_store.read(recording, start, end)
+    else:
+        body = iter([audio[start:end + 1]])
+    return StreamingResponse(body, status_code=status_code, media_type=content_type, headers=headers)
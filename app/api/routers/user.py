@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
-from sqlalchemy.orm import Session
 import httpx
 from loguru import logger
 
 from app.core.config import settings
-from app.db.load import load
+from app.db.async_db_storage import AsyncDBStorage
+from app.db.load import async_load
 from app.models.user import User
 from app.schema.user import CreateUser, OAuthUserCreate
 
@@ -17,7 +17,7 @@ router = APIRouter(prefix="/users", tags=["users"])
 async def register(
     response: Response,
     request: CreateUser,
-    db: Session = Depends(load),
+    db: AsyncDBStorage = Depends(async_load),
 ):
     """
     Two-step registration process:
@@ -26,7 +26,7 @@ async def register(
 
     Parameters:
     - request (CreateUser): An object containing user details
-    - db (Session): Database session
+    - db (AsyncDBStorage): Database session
 
     Returns:
     - Dict containing user details and registration status
@@ -75,7 +75,7 @@ async def register(
         )
 
         db.add(new_user)
-        db.commit()
+        await db.commit()
         
     except Exception as e:
         logger.exception(f"Database error during user creation: {e}")
@@ -99,7 +99,7 @@ async def register(
 @router.post("/oauth-register", status_code=status.HTTP_201_CREATED)
 async def oauth_register(
     request: OAuthUserCreate,
-    db: Session = Depends(load),
+    db: AsyncDBStorage = Depends(async_load),
 ):
     """
     Create user record after successful OAuth authentication.
@@ -107,7 +107,7 @@ async def oauth_register(
 
     Parameters:
     - request (OAuthUserCreate): User details from OAuth provider
-    - db (Session): Database session
+    - db (AsyncDBStorage): Database session
 
     Returns:
     - Dict containing user creation status
@@ -115,13 +115,13 @@ async def oauth_register(
     try:
         
         # Check if user already exists
-        existing_user = db.query(User).filter_by(id=request.id).first()
+        existing_user = await db.find_by_id(User, request.id)
         if existing_user:
             logger.info(f"User {request.id} already exists, updating details")
             # Update existing user details if needed
             existing_user.first_name = request.first_name
             existing_user.last_name = request.last_name
-            db.commit()
+            await db.commit()
             
             return {
                 "id": existing_user.id,
@@ -139,7 +139,7 @@ async def oauth_register(
         )
 
         db.add(new_user)
-        db.commit()
+        await db.commit()
         logger.info(f"Successfully created OAuth user {request.id}")
         
         return {
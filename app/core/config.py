@@ -25,7 +25,15 @@ class Settings(BaseSettings):
     DB_HOST: str = Field(..., env="DB_HOST")
     DB_PORT: str = Field(..., env="DB_PORT")
     DB_SSLMODE: str = Field("prefer", env="DB_SSLMODE")
-    
+
+    # Database connection pool settings
+    DB_POOL_SIZE: int = Field(5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")
+    DB_POOL_TIMEOUT: int = Field(30, env="DB_POOL_TIMEOUT")
+
+    # Refuse to start unless the database is at the alembic head revision
+    DB_SCHEMA_CHECK: bool = Field(True, env="DB_SCHEMA_CHECK")
     
     # VAPI settings
     ASSISTANT_ID: str = Field(..., env="ASSISTANT_ID")
@@ -46,7 +54,105 @@ class Settings(BaseSettings):
     
     # OpenAI
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
-    
+    OPENAI_TIMEOUT_SECONDS: float = Field(90.0, env="OPENAI_TIMEOUT_SECONDS")
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = Field(5.0, env="OPENAI_CONNECT_TIMEOUT_SECONDS")
+    # Retries of transient failures and 429s, with backoff under the rate limiter
+    OPENAI_MAX_RETRIES: int = Field(4, env="OPENAI_MAX_RETRIES")
+    OPENAI_MAX_CONNECTIONS: int = Field(100, env="OPENAI_MAX_CONNECTIONS")
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = Field(20, env="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+
+    # LLM backend: "openai", or "stub" for deterministic offline responses
+    LLM_PROVIDER: str = Field("openai", env="LLM_PROVIDER")
+    LLM_SCORING_MODEL: str = Field("gpt-4.1", env="LLM_SCORING_MODEL")
+    LLM_SUMMARY_MODEL: str = Field("gpt-4.1", env="LLM_SUMMARY_MODEL")
+    LLM_CASE_MODEL: str = Field("gpt-4o", env="LLM_CASE_MODEL")
+    STUB_LLM_LATENCY_SECONDS: float = Field(0.0, env="STUB_LLM_LATENCY_SECONDS")
+    STUB_LLM_LATENCY_JITTER_SECONDS: float = Field(0.0, env="STUB_LLM_LATENCY_JITTER_SECONDS")
+
+    # Shared token buckets per model; set to the account's limits for each model.
+    # The "database" store coordinates every worker, "memory" meters one process.
+    LLM_RATE_LIMIT_ENABLED: bool = Field(True, env="LLM_RATE_LIMIT_ENABLED")
+    LLM_RATE_LIMIT_STORE: str = Field("database", env="LLM_RATE_LIMIT_STORE")
+    LLM_REQUESTS_PER_MINUTE: int = Field(500, env="LLM_REQUESTS_PER_MINUTE")
+    LLM_TOKENS_PER_MINUTE: int = Field(300000, env="LLM_TOKENS_PER_MINUTE")
+    LLM_EXPECTED_OUTPUT_TOKENS: int = Field(1500, env="LLM_EXPECTED_OUTPUT_TOKENS")
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS: float = Field(60.0, env="LLM_RATE_LIMIT_MAX_WAIT_SECONDS")
+    LLM_RETRY_BASE_DELAY_SECONDS: float = Field(1.0, env="LLM_RETRY_BASE_DELAY_SECONDS")
+    LLM_RETRY_MAX_DELAY_SECONDS: float = Field(30.0, env="LLM_RETRY_MAX_DELAY_SECONDS")
+
+    # Share of LLM calls logged with their (truncated) prompt and response
+    LLM_TRACE_SAMPLE_RATE: float = Field(0.01, env="LLM_TRACE_SAMPLE_RATE")
+    LLM_TRACE_MAX_CHARS: int = Field(4000, env="LLM_TRACE_MAX_CHARS")
+
+    # Prompt templates are re-read when their file changes
+    PROMPT_HOT_RELOAD: bool = Field(True, env="PROMPT_HOT_RELOAD")
+    PROMPT_RELOAD_CHECK_SECONDS: float = Field(2.0, env="PROMPT_RELOAD_CHECK_SECONDS")
+
+    # Rendered case context blocks kept for the scoring prompt
+    CASE_CONTEXT_CACHE_SIZE: int = Field(256, env="CASE_CONTEXT_CACHE_SIZE")
+
+    # Read-through cache of case details resolved by id
+    CASE_CACHE_SIZE: int = Field(256, env="CASE_CACHE_SIZE")
+    CASE_CACHE_TTL_SECONDS: int = Field(300, env="CASE_CACHE_TTL_SECONDS")
+
+    # Pool of pre-generated cases served by /cases/generate_case
+    CASE_POOL_ENABLED: bool = Field(True, env="CASE_POOL_ENABLED")
+    CASE_POOL_TARGET_SIZE: int = Field(20, env="CASE_POOL_TARGET_SIZE")
+    CASE_POOL_LOW_WATER: int = Field(5, env="CASE_POOL_LOW_WATER")
+    CASE_POOL_REFILL_CONCURRENCY: int = Field(3, env="CASE_POOL_REFILL_CONCURRENCY")
+    CASE_POOL_CHECK_INTERVAL_SECONDS: float = Field(60.0, env="CASE_POOL_CHECK_INTERVAL_SECONDS")
+
+    # Keyset pages of the history and shared consultation lists
+    CONSULTATION_PAGE_SIZE: int = Field(20, env="CONSULTATION_PAGE_SIZE")
+    CONSULTATION_MAX_PAGE_SIZE: int = Field(100, env="CONSULTATION_MAX_PAGE_SIZE")
+
+    # Consultation audio recordings: "local" keeps them under RECORDING_LOCAL_PATH,
+    # "s3" in an S3-compatible bucket (set RECORDING_S3_ENDPOINT_URL for a local stand-in)
+    RECORDING_STORE: str = Field("local", env="RECORDING_STORE")
+    RECORDING_LOCAL_PATH: str = Field("recordings", env="RECORDING_LOCAL_PATH")
+    RECORDING_S3_BUCKET: Optional[str] = Field(None, env="RECORDING_S3_BUCKET")
+    RECORDING_S3_ENDPOINT_URL: Optional[str] = Field(None, env="RECORDING_S3_ENDPOINT_URL")
+    RECORDING_S3_REGION: Optional[str] = Field(None, env="RECORDING_S3_REGION")
+    RECORDING_S3_ACCESS_KEY_ID: Optional[str] = Field(None, env="RECORDING_S3_ACCESS_KEY_ID")
+    RECORDING_S3_SECRET_ACCESS_KEY: Optional[str] = Field(None, env="RECORDING_S3_SECRET_ACCESS_KEY")
+    RECORDING_MAX_BYTES: int = Field(200 * 1024 * 1024, env="RECORDING_MAX_BYTES")
+    RECORDING_CHUNK_BYTES: int = Field(256 * 1024, env="RECORDING_CHUNK_BYTES")
+
+    # Background scoring jobs
+    SCORING_WORKER_CONCURRENCY: int = Field(4, env="SCORING_WORKER_CONCURRENCY")
+    SCORING_QUEUE_MAX_SIZE: int = Field(100, env="SCORING_QUEUE_MAX_SIZE")
+    SCORING_JOB_POLL_INTERVAL_SECONDS: float = Field(1.0, env="SCORING_JOB_POLL_INTERVAL_SECONDS")
+    SCORING_JOB_STREAM_TIMEOUT_SECONDS: float = Field(300.0, env="SCORING_JOB_STREAM_TIMEOUT_SECONDS")
+    # Jobs unchanged for this long at startup were orphaned by a crash and are failed
+    SCORING_JOB_STALE_SECONDS: int = Field(1800, env="SCORING_JOB_STALE_SECONDS")
+
+    # Batch scoring endpoint
+    SCORING_BATCH_MAX_ITEMS: int = Field(200, env="SCORING_BATCH_MAX_ITEMS")
+    SCORING_BATCH_CONCURRENCY: int = Field(8, env="SCORING_BATCH_CONCURRENCY")
+
+    # Scoring result cache
+    SCORE_CACHE_ENABLED: bool = Field(True, env="SCORE_CACHE_ENABLED")
+    SCORE_CACHE_TTL_SECONDS: int = Field(86400, env="SCORE_CACHE_TTL_SECONDS")
+    SCORE_CACHE_MAX_ENTRIES: int = Field(512, env="SCORE_CACHE_MAX_ENTRIES")
+    SCORE_CACHE_TABLE_MAX_ENTRIES: int = Field(10000, env="SCORE_CACHE_TABLE_MAX_ENTRIES")
+
+    # "single" scores in one call; "parallel" runs one call per domain plus one for coverage
+    SCORING_MODE: str = Field("single", env="SCORING_MODE")
+    SCORING_PARALLEL_CONCURRENCY: int = Field(4, env="SCORING_PARALLEL_CONCURRENCY")
+
+    # "llm" asks the scoring model for coverage_analysis; "local" matches case items
+    # against the transcript and only sends the ambiguous ones to the model
+    COVERAGE_ENGINE: str = Field("llm", env="COVERAGE_ENGINE")
+    COVERAGE_COVERED_THRESHOLD: float = Field(0.6, env="COVERAGE_COVERED_THRESHOLD")
+    COVERAGE_PARTIAL_THRESHOLD: float = Field(0.3, env="COVERAGE_PARTIAL_THRESHOLD")
+    COVERAGE_LLM_REVIEW: bool = Field(True, env="COVERAGE_LLM_REVIEW")
+
+    # Transcripts estimated above the budget are condensed chunk by chunk before scoring
+    TRANSCRIPT_TOKEN_BUDGET: int = Field(6000, env="TRANSCRIPT_TOKEN_BUDGET")
+    TRANSCRIPT_CHUNK_TOKENS: int = Field(2500, env="TRANSCRIPT_CHUNK_TOKENS")
+    TRANSCRIPT_SUMMARY_MAX_TOKENS: int = Field(600, env="TRANSCRIPT_SUMMARY_MAX_TOKENS")
+    TRANSCRIPT_SUMMARY_CONCURRENCY: int = Field(4, env="TRANSCRIPT_SUMMARY_CONCURRENCY")
+
     class Config:
         env_file = ".env"
         case_sensitive = True
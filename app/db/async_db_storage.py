@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Async counterpart of DBStorage built on SQLAlchemy's AsyncSession and asyncpg
+
+contains:
+    - instance:
+        - add: stage an object in the session
+        - add_all: stage several objects in the session
+        - execute: run a statement and return the result
+        - scalars: run a statement and return its scalar results
+        - scalar: run a statement and return a single scalar
+        - find_by_id: fetch an object by primary key
+        - delete: remove an object from db
+        - commit: commit the session
+        - rollback: roll back the session
+        - refresh: reload an object's attributes
+        - close: end the session
+
+    - module:
+        - init_async_engine: create the shared async engine and session factory
+        - dispose_async_engine: release pooled connections on shutdown
+"""
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+
+
+def get_async_database_url():
+    """Builds the asyncpg connection URL from the configured credentials"""
+    return (
+        f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}"
+        f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+    )
+
+
+_async_engine = None
+_async_session_factory = None
+
+
+def init_async_engine():
+    """
+    Desc:
+        creates the process-wide async engine and session factory once.
+        Subsequent calls return the already initialised engine.
+    Return:
+        the shared async engine
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        return _async_engine
+
+    _async_engine = create_async_engine(
+        get_async_database_url(),
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    _async_session_factory = async_sessionmaker(
+        bind=_async_engine, expire_on_commit=False
+    )
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """
+    Desc:
+        closes every pooled connection and forgets the shared async engine
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
+class AsyncDBStorage:
+    """
+    Handles database operations on an AsyncSession checked out of the
+    process-wide asyncpg pool created by init_async_engine().
+
+    Relationships are not lazy loaded under asyncio, so queries that need
+    related rows must load them eagerly (e.g. with selectinload).
+    """
+
+    def __init__(self):
+        """Binds the storage to the shared async engine, creating it on first use"""
+        self.engine = init_async_engine()
+        self.__session = None
+
+    def setup_db(self):
+        """
+        Desc:
+             checks a session out of the shared pool
+        """
+        self.__session = _async_session_factory()
+
+    def add(self, obj):
+        """
+        Stages a new object in the session. Call commit() to persist it.
+
+        Parameters:
+            obj (Base): An instance of a SQLAlchemy model to be added to the database.
+        """
+        self.__session.add(obj)
+
+    def add_all(self, objs):
+        """
+        Stages several new objects in the session. Call commit() to persist them.
+
+        Parameters:
+            objs (list[Base]): Instances of SQLAlchemy models to be added to the database.
+        """
+        self.__session.add_all(objs)
+
+    async def execute(self, statement, params=None):
+        """
+        Executes a SQLAlchemy statement.
+
+        Parameters:
+            statement (Executable): The statement to run, e.g. select(User).
+            params (dict): Optional bound parameter values, e.g. for text().
+
+        Returns:
+            Result: The result of the statement.
+        """
+        return await self.__session.execute(statement, params)
+
+    async def scalars(self, statement):
+        """
+        Executes a statement and returns its scalar results.
+
+        Parameters:
+            statement (Executable): The statement to run, e.g. select(User).
+
+        Returns:
+            ScalarResult: The first column of every returned row.
+        """
+        return await self.__session.scalars(statement)
+
+    async def scalar(self, statement):
+        """
+        Executes a statement and returns the first column of the first row.
+
+        Parameters:
+            statement (Executable): The statement to run, e.g. select(func.count(User.id)).
+
+        Returns:
+            Any: The scalar value, or None if no row was returned.
+        """
+        return await self.__session.scalar(statement)
+
+    async def find_by_id(self, cls, id, options=None):
+        """
+        Retrieves an object by its ID.
+
+        Parameters:
+            cls (Base): The class of the object to retrieve.
+            id (str): The primary key of the object in the database.
+            options (list, optional): Loader options such as selectinload(...).
+
+        Returns:
+            instance of cls: The retrieved object, or None if no object found.
+        """
+        return await self.__session.get(cls, id, options=options)
+
+    async def delete(self, obj):
+        """
+        Removes an object from the session and the database.
+
+        Parameters:
+            obj (Base): An instance of a SQLAlchemy model to be deleted from the database.
+
+        Raises:
+            SQLAlchemyError: If the database operation fails.
+        """
+        try:
+            await self.__session.delete(obj)
+            await self.__session.commit()
+        except exc.SQLAlchemyError as e:
+            await self.__session.rollback()
+            print(f"Failed to delete object from database: {e}")
+            raise
+
+    async def commit(self):
+        """
+        Desc:
+            commit changes, rolling back if the commit fails
+        """
+        try:
+            await self.__session.commit()
+        except exc.SQLAlchemyError:
+            await self.__session.rollback()
+            raise
+
+    async def rollback(self):
+        """
+        Desc:
+            roll back pending changes
+        """
+        await self.__session.rollback()
+
+    async def refresh(self, obj, attribute_names=None):
+        """
+        Desc:
+            reload the attributes of obj from the database
+        """
+        await self.__session.refresh(obj, attribute_names=attribute_names)
+
+    async def close(self):
+        """
+        Desc:
+            closes the session and returns its connection to the pool
+        """
+        await self.__session.close()
@@ -15,11 +15,14 @@ contains:
         - engine
         - __session
         - dic
+
+    - module:
+        - init_engine: create the shared engine and session factory
+        - dispose_engine: release pooled connections on shutdown
 """
 from app.core.config import settings      
-from app.models.base_model import Base
 from sqlalchemy import create_engine, exc
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker
 
 
 def db_credentials_are_set():
@@ -32,34 +35,75 @@ if not db_credentials_are_set():
     print("DB credentials are not set")
 
 
+def get_database_url():
+    """Builds the psycopg2 connection URL from the configured credentials"""
+    return (
+        f"postgresql+psycopg2://{settings.DB_USER}:{settings.DB_PASSWORD}"
+        f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+    )
+
+
+_engine = None
+_session_factory = None
+
+
+def init_engine():
+    """
+    Desc:
+        creates the process-wide engine and session factory once.
+        Subsequent calls return the already initialised engine.
+    Return:
+        the shared engine
+    """
+    global _engine, _session_factory
+    if _engine is not None:
+        return _engine
+
+    try:
+        _engine = create_engine(
+            get_database_url(),
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        # Attempt to connect to the database to verify that the engine is working.
+        with _engine.connect() as conn:
+            pass
+    except exc.SQLAlchemyError as e:
+        _engine = None
+        print(f"Failed to connect to the database: {e}")
+        raise
+
+    _session_factory = sessionmaker(bind=_engine, expire_on_commit=False)
+    return _engine
+
+
+def dispose_engine():
+    """
+    Desc:
+        closes every pooled connection and forgets the shared engine
+    """
+    global _engine, _session_factory
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _session_factory = None
+
+
 class DBStorage:
     """
-    Handles database operations including connection setup and session management,
-    utilizing environment variables for database credentials.
+    Handles database operations on a session checked out of the
+    process-wide connection pool created by init_engine().
     """
 
     engine = None
     __session = None
 
     def __init__(self):
-        """Initializes a database engine connection using environment variables"""
-        DB_USER = settings.DB_USER
-        DB_PASSOWRD = settings.DB_PASSWORD
-        DB_HOST = settings.DB_HOST
-        DB_NAME = settings.DB_NAME
-        DB_PORT = settings.DB_PORT
-        DB_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSOWRD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-        try:
-            self.engine = create_engine(DB_URL, pool_pre_ping=True)
-            # Attempt to connect to the database to verify that the engine is working.
-            with self.engine.connect() as conn:
-                pass
-        except exc.SQLAlchemyError as e:
-            print(f"Failed to connect to the database: {e}")
-            # manage the error appropriately
-            raise
-
+        """Binds the storage to the shared engine, creating it on first use"""
+        self.engine = init_engine()
         self.__session = None
 
     def all(self, cls=None):
@@ -170,12 +214,9 @@ class DBStorage:
     def setup_db(self):
         """
         Desc:
-             init/load connection
+             checks a session out of the shared pool
         """
-        Base.metadata.create_all(self.engine)
-        sec = sessionmaker(bind=self.engine, expire_on_commit=False)
-        Session = scoped_session(sec)
-        self.__session = Session()
+        self.__session = _session_factory()
 
     def commit(self):
         """
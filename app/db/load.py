@@ -1,11 +1,13 @@
 #!/usr/bin/env python
 
+from .async_db_storage import AsyncDBStorage
 from .db_storage import DBStorage
 
 
 def load():
     """
-    Context manager to initialize and safely close the database connection.
+    Checks a session out of the shared connection pool and returns it
+    to the pool once the request is done.
     """
     db = DBStorage()
     db.setup_db()
@@ -13,3 +15,16 @@ def load():
         yield db
     finally:
         db.close()
+
+
+async def async_load():
+    """
+    Checks an AsyncSession out of the shared asyncpg pool and returns it
+    to the pool once the request is done.
+    """
+    db = AsyncDBStorage()
+    db.setup_db()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Startup check that the database schema matches the alembic migrations
+
+The schema is owned by alembic (see alembic/env.py); the application never
+creates tables itself. Instead it verifies once at startup that the database
+is stamped with the current head revision and refuses to start otherwise.
+"""
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database is not at the expected alembic revision"""
+
+
+def get_expected_revisions():
+    """
+    Returns:
+        set: the head revision(s) of the migration scripts shipped with the app
+    """
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def get_current_revisions(engine):
+    """
+    Parameters:
+        engine (Engine): engine connected to the application database
+
+    Returns:
+        set: the revision(s) recorded in the database's alembic_version table
+    """
+    with engine.connect() as conn:
+        return set(MigrationContext.configure(conn).get_current_heads())
+
+
+def check_schema_revision(engine):
+    """
+    Verifies that the database is at the expected alembic revision.
+
+    Parameters:
+        engine (Engine): engine connected to the application database
+
+    Raises:
+        SchemaVersionError: If the database revision differs from the migration head.
+    """
+    expected = get_expected_revisions()
+    current = get_current_revisions(engine)
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at revision {sorted(current) or 'none'}, "
+            f"expected {sorted(expected)}. Run `alembic upgrade head`."
+        )
+    return current
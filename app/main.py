@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -5,14 +6,42 @@ import uvicorn
 from app.core.config import settings
 from app.api.routers import router
 from app.core.logging_config import setup_logging
+from app.db.db_storage import init_engine, dispose_engine
+from app.db.migrations import check_schema_revision
+from app.services.llm_provider import close_llm_provider
+from app.services.scoring_jobs import scoring_jobs
+from app.services.case_pool import case_pool
+from app.db.async_db_storage import init_async_engine, dispose_async_engine
 
 # Set up Loguru for logging
 logger = setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared database pool on startup and release shared clients on shutdown"""
+    engine = init_engine()
+    if settings.DB_SCHEMA_CHECK:
+        revision = check_schema_revision(engine)
+        logger.info(f"Database schema at revision {', '.join(sorted(revision))}")
+    init_async_engine()
+    logger.info("Database connection pools initialised")
+    await scoring_jobs.start()
+    if settings.CASE_POOL_ENABLED:
+        await case_pool.start()
+    yield
+    await case_pool.stop()
+    await scoring_jobs.stop()
+    await close_llm_provider()
+    await dispose_async_engine()
+    dispose_engine()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
+    lifespan=lifespan,
 )
 
 # Set up CORS
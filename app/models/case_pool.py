@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Index, JSON, String
+
+from app.models.base_model import BaseModel, Base
+
+
+class PooledCase(BaseModel, Base):
+    """
+    A generated case waiting in the pool until /cases/generate_case hands
+    it out
+    """
+    __tablename__ = 'case_pool'
+    __table_args__ = (Index('ix_case_pool_created_at', 'created_at'),)
+
+    case_data = Column(JSON, nullable=False)
+    model = Column(String(50), nullable=True)
+
+    def __repr__(self):
+        return f"<PooledCase(id={self.id})>"
@@ -1,9 +1,18 @@
-from sqlalchemy import Column, Integer, Text, Float, Boolean, DateTime, ForeignKey, JSON, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Text, Float, Boolean, DateTime, ForeignKey, Index, JSON, String, Enum as SQLAlchemyEnum, text
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import enum
 
 from app.models.base_model import BaseModel, Base
+from app.models.llm_call import LLMCall
+from app.models.recording import Recording
+
+
+class ScoringStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
 
 
 class Consultation(BaseModel, Base):
@@ -11,23 +20,50 @@ class Consultation(BaseModel, Base):
     Consultation record including transcript, scoring, and audio recording
     """
     __tablename__ = 'consultations'
+    __table_args__ = (
+        # Keyset pages of a user's history and of the shared feed
+        Index('ix_consultations_user_id_created_at', 'user_id', text('created_at DESC'), text('id DESC')),
+        Index(
+            'ix_consultations_shared_created_at',
+            text('created_at DESC'),
+            text('id DESC'),
+            postgresql_where=text('is_shared'),
+        ),
+        Index('ix_consultations_case_id', 'case_id'),
+    )
     
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     case_id = Column(String(36), ForeignKey('cases.id'), nullable=False)
-    transcript = Column(Text, nullable=False)
+    # Large columns are only loaded when a query asks for their group
+    # (undefer_group("scores") or undefer_group("content")); reading them
+    # otherwise raises instead of emitting a query per row
+    transcript = deferred(Column(Text, nullable=False), group="content", raiseload=True)
     overall_score = Column(Float, nullable=True)
-    feedback = Column(Text, nullable=True)
+    feedback = deferred(Column(Text, nullable=True), group="scores", raiseload=True)
     is_shared = Column(Boolean, default=False, nullable=False)
-    coverage_analysis = Column(JSON, nullable=True)
-    domain_scores = Column(JSON, nullable=True)
-
+    coverage_analysis = deferred(Column(JSON, nullable=True), group="scores", raiseload=True)
+    domain_scores = deferred(Column(JSON, nullable=True), group="scores", raiseload=True)
+    scoring_status = Column(
+        SQLAlchemyEnum(ScoringStatus),
+        default=ScoringStatus.COMPLETED,
+        server_default=ScoringStatus.COMPLETED.value,
+        nullable=False,
+    )
+    scoring_error = Column(Text, nullable=True)
+    prompt_version = Column(String(12), nullable=True)
     
-    audio_recording = Column(Text, nullable=True)
+    # Recordings live in the recording store; audio_recording only holds
+    # inline base64 audio saved before the store existed
+    recording_id = Column(String(36), ForeignKey('recordings.id', ondelete='SET NULL'), nullable=True, index=True)
+    audio_recording = deferred(Column(Text, nullable=True), group="content", raiseload=True)
     duration_seconds = Column(Integer, nullable=True)
     
     user = relationship("User", back_populates="consultations")
     case = relationship("Case", back_populates="consultations")
+    # Referenced by class so they are mapped wherever Consultation is imported
+    recording = relationship(Recording, back_populates="consultations")
     peer_comments = relationship("PeerComment", back_populates="consultation", cascade="all, delete-orphan")
+    llm_calls = relationship(LLMCall, back_populates="consultation", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Consultation(id={self.id}, overall_score={self.overall_score})>"
@@ -38,6 +74,7 @@ class PeerComment(BaseModel, Base):
     Comments from peers on shared consultations
     """
     __tablename__ = 'peer_comments'
+    __table_args__ = (Index('ix_peer_comments_consultation_id_created_at', 'consultation_id', 'created_at'),)
     
     consultation_id = Column(String(36), ForeignKey('consultations.id'), nullable=False)
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Text, Float, Boolean, ForeignKey, String
+from sqlalchemy.orm import relationship
+
+from app.models.base_model import BaseModel, Base
+
+
+class LLMCall(BaseModel, Base):
+    """
+    Telemetry of one LLM call: usage, timings and estimated cost, linked to
+    the consultation it was made for
+    """
+    __tablename__ = 'llm_calls'
+
+    consultation_id = Column(String(36), ForeignKey('consultations.id', ondelete='CASCADE'), nullable=True, index=True)
+    endpoint = Column(String(100), nullable=True)
+    task = Column(String(50), nullable=False)
+    provider = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)
+    queue_ms = Column(Float, nullable=False, default=0.0)
+    time_to_first_token_ms = Column(Float, nullable=True)
+    latency_ms = Column(Float, nullable=False)
+    cost_usd = Column(Float, nullable=True)
+    success = Column(Boolean, nullable=False, default=True)
+    error = Column(Text, nullable=True)
+
+    consultation = relationship("Consultation", back_populates="llm_calls")
+
+    def __repr__(self):
+        return f"<LLMCall(id={self.id}, task='{self.task}', model='{self.model}')>"
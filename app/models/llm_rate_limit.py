@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Float, String
+
+from app.models.base_model import BaseModel, Base
+
+
+class LLMRateLimit(BaseModel, Base):
+    """
+    Token buckets shared by every worker calling an LLM model: one for
+    requests per minute and one for tokens per minute
+    """
+    __tablename__ = 'llm_rate_limits'
+
+    name = Column(String(100), nullable=False, unique=True, index=True)
+    request_level = Column(Float, nullable=False)
+    token_level = Column(Float, nullable=False)
+    refilled_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<LLMRateLimit(id={self.id}, name='{self.name}')>"
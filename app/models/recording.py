@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, Index, String
+from sqlalchemy.orm import relationship
+
+from app.models.base_model import BaseModel, Base
+
+
+class Recording(BaseModel, Base):
+    """
+    An audio recording held in the recording store. Recordings are keyed by
+    the sha256 of their content, so identical uploads share one row and one
+    stored object.
+    """
+    __tablename__ = 'recordings'
+    __table_args__ = (Index('ix_recordings_sha256', 'sha256', unique=True),)
+
+    sha256 = Column(String(64), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    content_type = Column(String(100), nullable=False)
+    backend = Column(String(20), nullable=False)
+    storage_key = Column(String(200), nullable=False)
+
+    consultations = relationship("Consultation", back_populates="recording")
+
+    def __repr__(self):
+        return f"<Recording(id={self.id}, sha256='{self.sha256}', size_bytes={self.size_bytes})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, JSON, String
+
+from app.models.base_model import BaseModel, Base
+
+
+class ScoreCacheEntry(BaseModel, Base):
+    """
+    Shared tier of the scoring result cache, keyed by a content hash of
+    the transcript, case details and scoring rubric
+    """
+    __tablename__ = 'score_cache'
+
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+    result = Column(JSON, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ScoreCacheEntry(id={self.id}, cache_key='{self.cache_key}')>"
@@ -98,8 +98,17 @@ class CaseDetails(BaseModel):
     background_details: List[BackgroundDetailResponse] = []
     information_divulged: List[InformationDivulgedResponse] = []
     doctor_info: Optional[DoctorInfoResponse] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
 
 
+
+
+class GeneratedCase(BaseModel):
+    """A case as returned by the case generation prompt"""
+    name: str = Field(..., min_length=1)
+    age: int = Field(..., ge=0, le=120)
+    presenting: str = Field(..., min_length=1)
+    context: str = Field(..., min_length=1)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 from enum import Enum
 
@@ -12,6 +12,55 @@ class ScoreRequest(BaseModel):
     user_id: str
 
 
+class CaseScoreRequest(BaseModel):
+    """Lean scoring request referencing a stored case by id"""
+    transcript: str
+    case_id: str
+    user_id: str
+
+
+class BatchScoreRequest(BaseModel):
+    """A session's worth of transcripts to score in one request"""
+    items: List[CaseScoreRequest] = Field(..., min_length=1)
+
+
+class DomainScore(BaseModel):
+    """Score of one RCGP domain with the evidence for it"""
+    score: Union[int, float] = Field(..., ge=1, le=5)
+    examples: List[str] = []
+    areas_for_improvement: List[str] = []
+
+
+class DomainScores(BaseModel):
+    data_gathering: DomainScore
+    clinical_management: DomainScore
+    interpersonal_skills: DomainScore
+
+
+class CoverageItem(BaseModel):
+    """One case item of the coverage analysis; type fields such as ice_type are kept as sent"""
+    description: str
+    coverage_status: str
+    evidence: Optional[str] = None
+
+    class Config:
+        extra = "allow"
+
+
+class CoverageAnalysis(BaseModel):
+    ice_coverage: List[CoverageItem]
+    information_coverage: List[CoverageItem]
+    background_coverage: List[CoverageItem]
+
+
+class ScoringResult(BaseModel):
+    """A complete scoring result, as stored on a consultation"""
+    scores: DomainScores
+    overall_score: float = Field(..., ge=1, le=5)
+    feedback: str = Field(..., min_length=1)
+    coverage_analysis: CoverageAnalysis
+
+
 class CommentRequest(BaseModel):
     comment: str
     user_id: str
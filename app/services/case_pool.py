@@ -0,0 +1,204 @@
+import asyncio
+import contextlib
+
+from loguru import logger
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.async_db_storage import AsyncDBStorage, init_async_engine
+from app.models.case import Case, DoctorInfo
+from app.models.case_pool import PooledCase
+from app.services.consultation import agenerate_case
+from app.services.telemetry import collect_llm_calls
+
+# pg advisory lock key shared by every worker's refill task
+REFILL_LOCK_KEY = 0x5CA_C0015
+
+
+def build_case(case_data):
+    """
+    Build a Case, with its DoctorInfo attached, from a generated case
+
+    Args:
+        case_data (dict): A validated GeneratedCase dump
+
+    Returns:
+        Case: The new, unsaved case
+    """
+    case = Case(
+        patient_name=case_data["name"],
+        patient_age=case_data["age"],
+        patient_gender=None,  # Will be set based on generated case data in the future
+        presenting_complaint=case_data["presenting"],
+        notes=case_data["context"]
+    )
+    # Generated names repeat, so number generated cases after their id
+    case.case_number = f"GEN-{case.id[:8].upper()}"
+    case.doctor_info = DoctorInfo(
+        name=case_data["name"],
+        age=case_data["age"],
+        context=case_data["context"]
+    )
+    return case
+
+
+class CasePool:
+    """
+    Pool of pre-generated cases kept in the case_pool table.
+
+    A background task tops the pool up to target_size whenever it falls below
+    low_water, so /cases/generate_case can hand out a case without waiting
+    for the model. Cases are popped with SELECT ... FOR UPDATE SKIP LOCKED, so
+    concurrent requests on any worker never receive the same case. Refills
+    take a PostgreSQL advisory lock, so only one worker tops the pool up at a
+    time and the pool never overshoots target_size.
+    """
+
+    def __init__(self, target_size, low_water, concurrency):
+        self.target_size = target_size
+        self.low_water = low_water
+        self.concurrency = concurrency
+        self._task = None
+        self._wakeup = None
+
+    async def start(self):
+        """Start the refill task"""
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._refill_loop(), name="case-pool-refill")
+        logger.info(f"Started case pool refill (target {self.target_size}, low water {self.low_water})")
+
+    async def stop(self):
+        """Cancel the refill task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def request_refill(self):
+        """Ask the refill task to check the pool level now"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def size(self):
+        """Number of cases waiting in the pool"""
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            return await db.scalar(select(func.count()).select_from(PooledCase))
+        finally:
+            await db.close()
+
+    async def pop(self, db):
+        """
+        Take the oldest pooled case and store it as a Case in one transaction
+
+        Args:
+            db (AsyncDBStorage): The request's session; committed on success
+
+        Returns:
+            tuple[dict, Case] | None: The generated case data and the stored
+            case, or None if the pool is empty
+        """
+        pooled = (await db.scalars(
+            select(PooledCase)
+            .order_by(PooledCase.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )).first()
+        if pooled is None:
+            self.request_refill()
+            return None
+
+        case = build_case(pooled.case_data)
+        db.add(case)
+        await db.delete(pooled)
+        await db.commit()
+
+        self.request_refill()
+        return pooled.case_data, case
+
+    @contextlib.asynccontextmanager
+    async def _refill_lock(self):
+        """
+        Hold the cross-worker refill lock for the duration of the block
+
+        The session-level lock lives on a dedicated autocommit connection, so
+        no transaction stays open while cases are generated, and it is freed
+        by PostgreSQL if the worker dies.
+
+        Returns:
+            bool: Whether this worker acquired the lock
+        """
+        async with init_async_engine().connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            locked = await connection.scalar(select(func.pg_try_advisory_lock(REFILL_LOCK_KEY)))
+            try:
+                yield locked
+            finally:
+                if locked:
+                    await connection.scalar(select(func.pg_advisory_unlock(REFILL_LOCK_KEY)))
+
+    async def refill(self):
+        """
+        Generate cases until the pool is back at target_size
+
+        Returns 0 straight away if another worker is already refilling.
+
+        Returns:
+            int: The number of cases added
+        """
+        async with self._refill_lock() as locked:
+            if not locked:
+                logger.debug("Case pool refill already running on another worker")
+                return 0
+            return await self._refill()
+
+    async def _refill(self):
+        missing = self.target_size - await self.size()
+        if missing <= 0:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def generate():
+            async with semaphore:
+                try:
+                    return await agenerate_case()
+                except Exception as e:
+                    logger.warning(f"Discarding generated case: {e}")
+                    return None
+
+        with collect_llm_calls("case_pool_refill"):
+            generated = [case for case in await asyncio.gather(*(generate() for _ in range(missing))) if case]
+        if not generated:
+            return 0
+
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            db.add_all([PooledCase(case_data=case_data, model=model) for case_data, model in generated])
+            await db.commit()
+        finally:
+            await db.close()
+        logger.info(f"Added {len(generated)} generated cases to the pool")
+        return len(generated)
+
+    async def _refill_loop(self):
+        while True:
+            try:
+                if await self.size() < self.low_water:
+                    await self.refill()
+            except Exception:
+                logger.exception("Error refilling the case pool")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.CASE_POOL_CHECK_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+case_pool = CasePool(
+    target_size=settings.CASE_POOL_TARGET_SIZE,
+    low_water=settings.CASE_POOL_LOW_WATER,
+    concurrency=settings.CASE_POOL_REFILL_CONCURRENCY,
+)
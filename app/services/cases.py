@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.db.async_db_storage import AsyncDBStorage
+from app.schema.case import CaseDetails
+from app.models.case import Case, ICE, BackgroundDetail, InformationDivulged, DoctorInfo, DivulgenceType
+
+
+def case_details_options():
+    """Loader options for the relationships serialised by CaseDetails"""
+    return [
+        selectinload(Case.ice_entries),
+        selectinload(Case.background_details),
+        selectinload(Case.information_divulged),
+        selectinload(Case.doctor_info),
+    ]
+
+
+def _enum_value(value):
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def render_case_context(case_details):
+    """
+    Format case details into the markdown block used by the scoring prompt
+
+    Args:
+        case_details (CaseDetails | Case): Details about the patient case
+
+    Returns:
+        str: The formatted case details
+    """
+    gender = case_details.patient_gender.value if case_details.patient_gender else 'Not specified'
+    parts = [
+        "\n**Patient Information:**\n",
+        f"- Name: {case_details.patient_name}\n",
+        f"- Age: {case_details.patient_age}\n",
+        f"- Gender: {gender}\n",
+        f"- Case Number: {case_details.case_number}\n",
+        "\n**Presenting Complaint:**\n",
+        f"{case_details.presenting_complaint}\n",
+        "\n**Clinical Notes:**\n",
+        f"{case_details.notes if case_details.notes else 'None provided'}\n",
+    ]
+
+    # Add Doctor Information if available
+    doctor_info = case_details.doctor_info
+    if doctor_info:
+        parts += [
+            "\n**Doctor Information:**\n",
+            f"- Name: {doctor_info.name}\n",
+            f"- Age: {doctor_info.age}\n",
+            f"- Past Medical History: {doctor_info.past_medical_history}\n",
+            f"- Current Medication: {doctor_info.current_medication}\n",
+            f"- Context: {doctor_info.context}\n",
+        ]
+
+    if case_details.ice_entries:
+        parts.append("\n**Patient's Ideas, Concerns, and Expectations (ICE):**\n")
+        for i, ice in enumerate(case_details.ice_entries, 1):
+            parts.append(f"{i}. {_enum_value(ice.ice_type)}: {ice.description}\n")
+
+    if case_details.background_details:
+        parts.append("\n**Background Information:**\n")
+        for i, detail in enumerate(case_details.background_details, 1):
+            parts.append(f"{i}. {detail.detail}\n")
+
+    if case_details.information_divulged:
+        parts.append("\n**Information to be Divulged:**\n")
+
+        # Group by divulgence type in a single pass
+        freely_divulged = []
+        specifically_asked = []
+        for info in case_details.information_divulged:
+            divulgence_type = _enum_value(info.divulgence_type)
+            if divulgence_type == DivulgenceType.FREELY_DIVULGED.value:
+                freely_divulged.append(info.description)
+            elif divulgence_type == DivulgenceType.SPECIFICALLY_ASKED.value:
+                specifically_asked.append(info.description)
+
+        if freely_divulged:
+            parts.append("\n*Information the patient will freely share:*\n")
+            parts += [f"{i}. {description}\n" for i, description in enumerate(freely_divulged, 1)]
+
+        if specifically_asked:
+            parts.append("\n*Information the patient will only share if specifically asked:*\n")
+            parts += [f"{i}. {description}\n" for i, description in enumerate(specifically_asked, 1)]
+
+    return "".join(parts)
+
+
+class CaseContextCache:
+    """
+    LRU cache of rendered case context blocks.
+
+    Entries are keyed by case id and remember the case's updated_at, so a
+    newer version of the case is re-rendered. Writes to a case or any of its
+    child rows in this process invalidate the entry immediately.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, case_details):
+        """
+        Return the rendered context for a case, rendering it on a miss
+
+        Args:
+            case_details (CaseDetails | Case): Details about the patient case
+
+        Returns:
+            str: The formatted case details
+        """
+        case_id = getattr(case_details, "id", None)
+        if case_id is None:
+            return render_case_context(case_details)
+
+        version = getattr(case_details, "updated_at", None)
+        with self._lock:
+            entry = self._entries.get(case_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(case_id)
+                self.hits += 1
+                return entry[1]
+
+        context = render_case_context(case_details)
+        with self._lock:
+            self.misses += 1
+            self._entries[case_id] = (version, context)
+            self._entries.move_to_end(case_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, case_id):
+        """Drop the rendered context of a case"""
+        with self._lock:
+            self._entries.pop(case_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CaseCache:
+    """
+    Read-through cache of case details backed by the cases table.
+
+    Cases are loaded with their child rows in a session of their own and kept
+    as immutable CaseDetails snapshots, so they can be shared between requests
+    and background jobs. Entries expire after ttl_seconds, which bounds how
+    stale another worker's copy can be; writes in this process invalidate
+    immediately.
+    """
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, case_id):
+        """
+        Args:
+            case_id (str): The id of the case
+
+        Returns:
+            CaseDetails | None: The case with its child rows, or None if it does not exist
+        """
+        entry = self._entries.get(case_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(case_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            case = (await db.scalars(
+                select(Case).options(*case_details_options()).filter_by(id=case_id)
+            )).first()
+            if case is None:
+                return None
+            details = CaseDetails.model_validate(case, from_attributes=True)
+        finally:
+            await db.close()
+
+        self._entries[case_id] = (time.monotonic() + self.ttl_seconds, details)
+        self._entries.move_to_end(case_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return details
+
+    def invalidate(self, case_id):
+        """Drop a cached case"""
+        self._entries.pop(case_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+case_contexts = CaseContextCache(max_entries=settings.CASE_CONTEXT_CACHE_SIZE)
+case_cache = CaseCache(
+    max_entries=settings.CASE_CACHE_SIZE,
+    ttl_seconds=settings.CASE_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_case(case_id):
+    """Forget every cached representation of a case"""
+    case_contexts.invalidate(case_id)
+    case_cache.invalidate(case_id)
+
+
+@event.listens_for(Case, "after_update")
+@event.listens_for(Case, "after_delete")
+def _invalidate_case(mapper, connection, target):
+    invalidate_case(target.id)
+
+
+@event.listens_for(ICE, "after_insert")
+@event.listens_for(ICE, "after_update")
+@event.listens_for(ICE, "after_delete")
+@event.listens_for(BackgroundDetail, "after_insert")
+@event.listens_for(BackgroundDetail, "after_update")
+@event.listens_for(BackgroundDetail, "after_delete")
+@event.listens_for(InformationDivulged, "after_insert")
+@event.listens_for(InformationDivulged, "after_update")
+@event.listens_for(InformationDivulged, "after_delete")
+@event.listens_for(DoctorInfo, "after_insert")
+@event.listens_for(DoctorInfo, "after_update")
+@event.listens_for(DoctorInfo, "after_delete")
+def _invalidate_parent_case(mapper, connection, target):
+    invalidate_case(target.case_id)
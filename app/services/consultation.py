@@ -1,16 +1,40 @@
 from datetime import datetime
+import asyncio
+import hashlib
 import json
-from openai import OpenAI
+import re
+from loguru import logger
 from app.core.config import settings
-from app.schema.consultation import CaseDetails
+from app.models.consultation import ScoringStatus
+from app.schema.case import GeneratedCase
+from app.schema.consultation import CoverageAnalysis, DomainScore, ScoringResult
+from app.services.cases import case_contexts
+from app.services.coverage import analyse_coverage, apply_coverage_review, format_review_items, split_turns
+from app.services.llm_provider import get_llm_provider
+from app.services.prompts import prompts
+from app.utils.json_repair import repair_json
+from app.utils.json_stream import JSONStreamParser
+from app.utils.tokens import estimate_tokens
 
 
-openai = OpenAI(api_key=settings.OPENAI_API_KEY)
+# Score keys of the RCGP domains and the rubric heading each one is scored against
+SCORING_DOMAINS = {
+    "data_gathering": "Data Gathering, Technical & Assessment Skills",
+    "clinical_management": "Clinical Management Skills",
+    "interpersonal_skills": "Interpersonal Skills",
+}
+
+_FILLER = re.compile(r",?\s*\b(?:u+m+|u+h+|e+r+m*|h+m+|m+h+m+|m{2,})\b[,.]?", re.IGNORECASE)
+# Stutters only: a word cut off and restarted ("I- I", "wh- what"), or said three
+# or more times in a row. A doubled word is left alone, as in "I had had a fall".
+_CUT_WORD = re.compile(r"\b(\w+)-\s+(?=\1)", re.IGNORECASE)
+_REPEATED_WORD = re.compile(r"\b(\w+)(?:,?\s+\1\b){2,}", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
 
 def load_generate_case_prompt():
-    """Load the case generation prompt from the prompts directory"""
-    with open("app/prompts/generate_case_prompt.md", "r") as f:
-        return f.read()
+    """Load the case generation prompt from the prompt registry"""
+    return prompts.get("generate_case_prompt.md").get_text()
 
 def generate_case():
     """
@@ -21,19 +45,18 @@ def generate_case():
     """
     prompt = load_generate_case_prompt()
 
-    # Call OpenAI API to generate a case
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[
+    # Call the configured LLM provider to generate a case
+    response = get_llm_provider().complete(
+        "generate_case",
+        [
             {"role": "system", "content": "You are a medical case generator for GP training."},
             {"role": "user", "content": prompt}
         ],
-        response_format={"type": "json_object"}
     )
 
     # Parse and return the generated case as a Python dictionary
     try:
-        return json.loads(response.choices[0].message.content)
+        return json.loads(response.text)
     except Exception as e:
         print(f"Error parsing case JSON: {e}")
         return {
@@ -44,15 +67,265 @@ def generate_case():
         }
 
 
+async def agenerate_case():
+    """
+    Generate and validate a new patient case without blocking the event loop
+    
+    Unlike generate_case there is no fallback case: a response that does not
+    match GeneratedCase raises, so only valid cases are kept.
+    
+    Returns:
+        tuple[dict, str]: The validated case and the model that generated it
+        
+    Raises:
+        ValueError: If the response is not a valid case
+    """
+    response = await get_llm_provider().acomplete(
+        "generate_case",
+        [
+            {"role": "system", "content": "You are a medical case generator for GP training."},
+            {"role": "user", "content": load_generate_case_prompt()}
+        ],
+    )
+    case = GeneratedCase.model_validate_json(response.text)
+    return case.model_dump(), response.model
+
+
 def load_scoring_rubric():
-    """Load the RCGP scoring rubric from the prompts directory"""
-    with open("app/prompts/scoring_rubric.md", "r") as f:
-        return f.read()
+    """Load the RCGP scoring rubric from the prompt registry"""
+    return prompts.get("scoring_rubric.md").get_text()
+
+
+def scoring_template_name():
+    """The single-call scoring template, without coverage when it is computed locally"""
+    if settings.COVERAGE_ENGINE == "local":
+        return "score_domains_prompt.md"
+    return "score_consultation_prompt.md"
+
+
+def scoring_prompt_version(mode=None):
+    """
+    Version hash of the scoring prompts and rubric, recorded with every score
+    
+    Args:
+        mode (str): Scoring mode to describe, defaults to SCORING_MODE
+    """
+    if (mode or settings.SCORING_MODE) == "parallel":
+        names = ["score_domain_prompt.md", "scoring_rubric.md"]
+        if settings.COVERAGE_ENGINE != "local":
+            names.append("coverage_analysis_prompt.md")
+    else:
+        names = [scoring_template_name(), "scoring_rubric.md"]
+
+    names.append("summarise_transcript_prompt.md")
+    # Results also depend on how long transcripts are condensed and, with
+    # local coverage, on the matcher thresholds
+    parts = [prompts.version(*names), settings.TRANSCRIPT_TOKEN_BUDGET, settings.TRANSCRIPT_CHUNK_TOKENS]
+    if settings.COVERAGE_ENGINE == "local":
+        parts += [
+            prompts.get("coverage_review_prompt.md").get_version(),
+            settings.COVERAGE_COVERED_THRESHOLD,
+            settings.COVERAGE_PARTIAL_THRESHOLD,
+            settings.COVERAGE_LLM_REVIEW,
+        ]
+    return hashlib.sha256(":".join(map(str, parts)).encode("utf-8")).hexdigest()[:12]
+
+
+def clean_transcript(transcript):
+    """
+    Strip timestamps, filler words and stutters from a transcript
+    
+    Args:
+        transcript (str): The full consultation transcript
+        
+    Returns:
+        str: The transcript with one turn per line
+    """
+    lines = []
+    for turn in split_turns(transcript):
+        turn = _FILLER.sub(" ", turn)
+        turn = _CUT_WORD.sub("", turn)
+        turn = _REPEATED_WORD.sub(r"\1", turn)
+        turn = re.sub(r"\s+", " ", turn).strip()
+        if turn and not turn.endswith(":"):
+            lines.append(turn)
+    return "\n".join(lines)
+
+
+def _pack(units, max_tokens, separator):
+    """Join consecutive units into pieces of at most max_tokens estimated tokens"""
+    pieces = []
+    current = []
+    current_tokens = 0
+    for unit in units:
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(separator.join(current))
+            current = []
+            current_tokens = 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        pieces.append(separator.join(current))
+    return pieces
+
+
+def split_turn(turn, max_tokens):
+    """
+    Split a turn longer than max_tokens at sentence ends, and any sentence
+    that is still too long between words
+    
+    Returns:
+        list[str]: Consecutive pieces of the turn
+    """
+    units = []
+    for sentence in _SENTENCE_END.split(turn):
+        if estimate_tokens(sentence) > max_tokens:
+            units += _pack(sentence.split(), max_tokens, " ")
+        else:
+            units.append(sentence)
+    return _pack(units, max_tokens, " ")
+
+
+def chunk_transcript(transcript, max_tokens):
+    """
+    Split a cleaned transcript into chunks of whole turns
+    
+    Args:
+        transcript (str): A transcript with one turn per line
+        max_tokens (int): Estimated token limit of each chunk
+        
+    Returns:
+        list[str]: The chunks; a turn longer than the limit is split with split_turn
+    """
+    turns = []
+    for turn in transcript.splitlines():
+        if estimate_tokens(turn) > max_tokens:
+            turns += split_turn(turn, max_tokens)
+        else:
+            turns.append(turn)
+    return _pack(turns, max_tokens, "\n")
+
+
+async def prepare_transcript(transcript, case_details):
+    """
+    Bring a transcript within TRANSCRIPT_TOKEN_BUDGET for the scoring prompt
+    
+    The transcript is cleaned first. If it is still over budget it is split
+    into chunks that are condensed into evidence notes concurrently (map),
+    and the notes are joined in order to stand in for the transcript in the
+    single scoring call (reduce).
+    
+    Args:
+        transcript (str): The full consultation transcript
+        case_details (CaseDetails | Case): Details about the patient case
+        
+    Returns:
+        str: The transcript text to put in scoring prompts
+    """
+    cleaned = clean_transcript(transcript)
+    if estimate_tokens(cleaned) <= settings.TRANSCRIPT_TOKEN_BUDGET:
+        return cleaned
+
+    chunks = chunk_transcript(cleaned, settings.TRANSCRIPT_CHUNK_TOKENS)
+    formatted_case_details = case_contexts.get(case_details)
+    template = prompts.get("summarise_transcript_prompt.md")
+    semaphore = asyncio.Semaphore(settings.TRANSCRIPT_SUMMARY_CONCURRENCY)
+
+    async def summarise(number, chunk):
+        prompt = template.assemble(
+            static={},
+            dynamic={
+                "case_details": formatted_case_details,
+                "part": number,
+                "parts": len(chunks),
+                "transcript": chunk,
+            },
+        )
+        async with semaphore:
+            response = await get_llm_provider().acomplete(
+                "summarise",
+                scoring_messages(prompt),
+                json_response=False,
+                max_tokens=settings.TRANSCRIPT_SUMMARY_MAX_TOKENS,
+            )
+        return response.text.strip()
+
+    tasks = [asyncio.ensure_future(summarise(i, chunk)) for i, chunk in enumerate(chunks, 1)]
+    try:
+        summaries = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    logger.info(
+        f"Condensed a transcript of ~{estimate_tokens(cleaned)} tokens "
+        f"into {len(chunks)} evidence summaries"
+    )
+    return "\n\n".join(
+        f"[Evidence from part {i} of {len(chunks)} of the consultation]\n{summary}"
+        for i, summary in enumerate(summaries, 1)
+    )
 
-def score_consultation(transcript, case_details):
+
+def rubric_sections():
+    """
+    Split the scoring rubric into its per-domain sections
+    
+    Returns:
+        dict: Section text keyed by heading, without the number and score range
+    """
+    sections = {}
+    heading = None
+    lines = []
+    for line in load_scoring_rubric().splitlines():
+        if line.startswith("## "):
+            if heading is not None:
+                sections[heading] = "\n".join(lines).strip()
+            heading = re.sub(r"^\d+\.\s*|\s*\(Score.*\)$", "", line[3:].strip())
+            lines = [line]
+        elif heading is not None:
+            lines.append(line)
+    if heading is not None:
+        sections[heading] = "\n".join(lines).strip()
+    return sections
+
+
+def build_scoring_prompt(transcript, case_details):
+    """
+    Build the RCGP scoring prompt for a consultation
+    
+    The instructions and rubric form a static prefix shared by every call, and
+    the case and transcript follow, so the provider can cache the prefix.
+    
+    Args:
+        transcript (str): The full consultation transcript
+        case_details (CaseDetails | Case): Details about the patient case
+        
+    Returns:
+        str: The user prompt sent to the scoring model
+    """
+    scoring_rubric = load_scoring_rubric()
+    
+    # Reuse the rendered case block for this case id and version
+    formatted_case_details = case_contexts.get(case_details)
+    
+    # Fill the precompiled scoring template, static parts first
+    prompt = prompts.get(scoring_template_name()).assemble(
+        static={"scoring_rubric": scoring_rubric},
+        dynamic={"case_details": formatted_case_details, "transcript": transcript},
+    )
+    return prompt
+
+
+async def score_consultation(transcript, case_details):
     """
     Score a completed consultation transcript based on RCGP rubric
     
+    The completion is awaited on the shared LLM provider so the event loop
+    keeps serving other requests while the model is generating.
+    
     Args:
         transcript (str): The full consultation transcript
         case_details (CaseDetails): Details about the patient case
@@ -60,169 +333,426 @@ def score_consultation(transcript, case_details):
     Returns:
         dict: Scores and feedback for the consultation
     """
-    scoring_rubric = load_scoring_rubric()
+    if settings.SCORING_MODE == "parallel":
+        return await score_consultation_parallel(transcript, case_details)
+
+    scoring_transcript = await prepare_transcript(transcript, case_details)
+    prompt = build_scoring_prompt(scoring_transcript, case_details)
+
+    request = get_llm_provider().acomplete("score", scoring_messages(prompt))
+
+    coverage_analysis = None
+    if settings.COVERAGE_ENGINE == "local":
+        response, coverage_analysis = await asyncio.gather(
+            request, local_coverage_analysis(transcript, case_details, scoring_transcript)
+        )
+    else:
+        response = await request
+
+    # Parse the response, re-requesting only the sections it lacks
+    scoring_result = repair_json(response.text) or {}
+    if coverage_analysis is not None:
+        scoring_result["coverage_analysis"] = coverage_analysis
+    scoring_result, _ = await complete_scoring_result(scoring_result, scoring_transcript, case_details)
     
-    # Format case details into a clean, readable format
-    formatted_case_details = f"""
-**Patient Information:**
-- Name: {case_details.patient_name}
-- Age: {case_details.patient_age}
-- Gender: {case_details.patient_gender.value if case_details.patient_gender else 'Not specified'}
-- Case Number: {case_details.case_number}
-
-**Presenting Complaint:**
-{case_details.presenting_complaint}
-
-**Clinical Notes:**
-{case_details.notes if case_details.notes else 'None provided'}
-"""
-
-    # Add Doctor Information if available
-    if case_details.doctor_info:
-        formatted_case_details += f"""
-**Doctor Information:**
-- Name: {case_details.doctor_info.name}
-- Age: {case_details.doctor_info.age}
-- Past Medical History: {case_details.doctor_info.past_medical_history}
-- Current Medication: {case_details.doctor_info.current_medication}
-- Context: {case_details.doctor_info.context}
-"""
-
-    # Format ICE entries
-    if case_details.ice_entries:
-        formatted_case_details += "\n**Patient's Ideas, Concerns, and Expectations (ICE):**\n"
-        for i, ice in enumerate(case_details.ice_entries, 1):
-            ice_type = ice.ice_type.value if hasattr(ice.ice_type, 'value') else str(ice.ice_type)
-            formatted_case_details += f"{i}. {ice_type}: {ice.description}\n"
-    
-    # Format background details
-    if case_details.background_details:
-        formatted_case_details += "\n**Background Information:**\n"
-        for i, detail in enumerate(case_details.background_details, 1):
-            formatted_case_details += f"{i}. {detail.detail}\n"
-    
-    # Format information divulged
-    if case_details.information_divulged:
-        formatted_case_details += "\n**Information to be Divulged:**\n"
-        
-        # Group by divulgence type
-        freely_divulged = [info for info in case_details.information_divulged 
-                          if info.divulgence_type.value == 'FREELY_DIVULGED']
-        specifically_asked = [info for info in case_details.information_divulged 
-                            if info.divulgence_type.value == 'SPECIFICALLY_ASKED']
-        
-        if freely_divulged:
-            formatted_case_details += "\n*Information the patient will freely share:*\n"
-            for i, info in enumerate(freely_divulged, 1):
-                formatted_case_details += f"{i}. {info.description}\n"
-        
-        if specifically_asked:
-            formatted_case_details += "\n*Information the patient will only share if specifically asked:*\n"
-            for i, info in enumerate(specifically_asked, 1):
-                formatted_case_details += f"{i}. {info.description}\n"
-    
-    # Create a prompt for scoring
-    prompt = f"""
-You are an expert medical consultant evaluator who specializes in assessing GP trainee consultations.
-You will be scoring a consultation based on the Royal College of General Practitioners (RCGP) assessment framework.
-You will also analyze and report on which specific informational aspects of the case were covered during the consultation in a dedicated 'coverage_analysis' section.
-
-**Crucial Guidance for Scoring vs. Coverage Analysis:**
-It is essential to differentiate between the assessment of the trainee's skills (reflected in the scores for Data Gathering, Clinical Management, and Interpersonal Skills) and the factual coverage of case information (detailed in 'coverage_analysis').
-
-1.  **Domain Scoring (Data Gathering, Clinical Management, Interpersonal Skills):** These scores (1-5) must be based on the *quality, depth, appropriateness, and proficiency* of the trainee's actions, clinical reasoning, and communication, as defined by the RCGP assessment framework provided below. For example, how effectively did they gather information, not just *what* information they gathered? How sound was their clinical judgment and management plan? How effectively did they communicate and build rapport?
-2.  **Coverage Analysis:** This section is intended to objectively list which predefined elements of the case (ICE, specific information, background) were mentioned or explored. You don't need to rephrase or summarize the information, just list it as it is.
-
-**Important:** A high degree of coverage in the 'coverage_analysis' section **does not automatically equate to high scores in the primary domains.** A trainee might mention all required information points but do so with poor technique, flawed reasoning, or inadequate interpersonal skills. Conversely, a trainee might demonstrate excellent skills in the areas they explored, even if they missed a minor informational point. Your domain scoring should reflect the *skill and competency* demonstrated, using the RCGP rubric as your primary guide.
-
-Here are the case details that were provided to the GP trainee:
-{formatted_case_details}
-
-Here is the transcript of the consultation:
-{transcript}
-
-Based on the RCGP assessment framework below, score this consultation:
-
-{scoring_rubric}
-
-Analyze the transcript and provide scores (1-5) for each domain:
-1. Data Gathering
-2. Clinical Management
-3. Interpersonal Skills
-
-For each domain, provide:
-- Score (1-5, where 1 is poor and 5 is excellent)
-- Specific examples from the transcript that justify the score
-- Areas for improvement
-
-Then calculate an overall score (average of the three domains).
-Finally, provide concise, actionable feedback for the trainee.
-
-For the coverage analysis, identify which ICE entries, background details, and information points were covered, partially covered, or not covered in the consultation. Include evidence from the transcript to support your assessment.
-
-Respond with a JSON object in this format:
-{{
-  "scores": {{
-    "data_gathering": {{
-      "score": 1-5,
-      "examples": ["example1", "example2"],
-      "areas_for_improvement": ["area1", "area2"]
-    }},
-    "clinical_management": {{
-      "score": 1-5,
-      "examples": ["example1", "example2"],
-      "areas_for_improvement": ["area1", "area2"]
-    }},
-    "interpersonal_skills": {{
-      "score": 1-5,
-      "examples": ["example1", "example2"],
-      "areas_for_improvement": ["area1", "area2"]
-    }}
-  }},
-  "overall_score": float,
-  "feedback": "Concise feedback paragraph here",
-  "coverage_analysis": {{
-    "ice_coverage": [
-      {{
-        "ice_type": "IDEA/CONCERN/EXPECTATION",
-        "description": "description text",
-        "coverage_status": "COVERED/PARTIALLY_COVERED/NOT_COVERED",
-        "evidence": "Quote from transcript or explanation"
-      }}
-    ],
-    "information_coverage": [
-      {{
-        "divulgence_type": "FREELY_DIVULGED/SPECIFICALLY_ASKED",
-        "description": "description text",
-        "coverage_status": "COVERED/PARTIALLY_COVERED/NOT_COVERED",
-        "evidence": "Quote from transcript or explanation"
-      }}
-    ],
-    "background_coverage": [
-      {{
-        "description": "description text",
-        "coverage_status": "COVERED/PARTIALLY_COVERED/NOT_COVERED",
-        "evidence": "Quote from transcript or explanation"
-      }}
-    ]
-  }}
-}}
-"""
-
-    print("prompt", prompt)
-    response = openai.chat.completions.create(
-        model="gpt-4.1",
-        messages=[
-            {"role": "system", "content": "You are a medical consultation scoring assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        response_format={"type": "json_object"}
+    return finalise_scoring_result(scoring_result)
+
+
+async def local_coverage_analysis(transcript, case_details, review_transcript=None):
+    """
+    Build the coverage analysis with the local matcher
+    
+    Items the matcher cannot place confidently are sent to the model in one
+    short review call; if that call fails they keep the local
+    PARTIALLY_COVERED status.
+    
+    Args:
+        transcript (str): The full consultation transcript
+        case_details (CaseDetails | Case): Details about the patient case
+        review_transcript (str): Transcript text for the review prompt, e.g.
+            the output of prepare_transcript; defaults to the full transcript
+        
+    Returns:
+        dict: The coverage_analysis section of a scoring result
+    """
+    coverage, ambiguous = analyse_coverage(transcript, case_details)
+    if not ambiguous or not settings.COVERAGE_LLM_REVIEW:
+        return coverage
+
+    prompt = prompts.get("coverage_review_prompt.md").assemble(
+        static={},
+        dynamic={
+            "transcript": review_transcript or transcript,
+            "items": format_review_items(coverage, ambiguous),
+        },
     )
+    try:
+        response = await get_llm_provider().acomplete("coverage_review", scoring_messages(prompt))
+        apply_coverage_review(coverage, ambiguous, json.loads(response.text))
+    except Exception as e:
+        logger.warning(f"Coverage review failed, keeping local statuses: {e}")
+    return coverage
+
 
-    # Parse the response
-    scoring_result = json.loads(response.choices[0].message.content)
+async def score_consultation_parallel(transcript, case_details):
+    """
+    Score a consultation with one concurrent call per RCGP domain plus one for coverage
     
-    # Add timestamp to the result
-    scoring_result["timestamp"] = datetime.now().isoformat()
+    Each call only carries its own part of the rubric and output format, so the
+    wall-clock time is that of the slowest call rather than of one long
+    generation. The partial results are validated and merged into the shape
+    returned by score_consultation, with the overall score computed locally.
+    
+    Args:
+        transcript (str): The full consultation transcript
+        case_details (CaseDetails | Case): Details about the patient case
+        
+    Returns:
+        dict: Scores and feedback for the consultation
+        
+    Raises:
+        ValueError: If a sub-call returns a result that cannot be merged
+    """
+    scoring_transcript = await prepare_transcript(transcript, case_details)
+    formatted_case_details = case_contexts.get(case_details)
+    sections = rubric_sections()
+    semaphore = asyncio.Semaphore(settings.SCORING_PARALLEL_CONCURRENCY)
+
+    # Each domain's instructions and rubric are a static prefix of its prompt
+    dynamic = {"case_details": formatted_case_details, "transcript": scoring_transcript}
+    domain_template = prompts.get("score_domain_prompt.md")
+    prompts_by_part = {
+        domain: domain_template.assemble(
+            static={"domain_title": title, "domain_rubric": sections.get(title) or load_scoring_rubric()},
+            dynamic=dynamic,
+        )
+        for domain, title in SCORING_DOMAINS.items()
+    }
+    local_coverage = settings.COVERAGE_ENGINE == "local"
+    if not local_coverage:
+        prompts_by_part["coverage_analysis"] = prompts.get("coverage_analysis_prompt.md").assemble(
+            static={},
+            dynamic=dynamic,
+        )
+
+    async def complete(part, prompt):
+        if part == "coverage_analysis":
+            task, parse = "coverage", parse_coverage
+        else:
+            task, parse = "score_domain", parse_domain_response
+        async with semaphore:
+            return await request_section(task, prompt, parse, attempts=2)
+
+    parts = list(prompts_by_part)
+    tasks = [asyncio.ensure_future(complete(part, prompt)) for part, prompt in prompts_by_part.items()]
+    if local_coverage:
+        parts.append("coverage_analysis")
+        tasks.append(asyncio.ensure_future(
+            local_coverage_analysis(transcript, case_details, scoring_transcript)
+        ))
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # One failed sub-call fails the whole score, so stop paying for the rest
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return finalise_scoring_result(merge_scoring_results(dict(zip(parts, results))))
+
+
+def parse_domain_score(value):
+    """Validate one domain of a scoring result"""
+    return DomainScore.model_validate(value).model_dump()
+
+
+def parse_domain_response(value):
+    """Validate a score_domain response, keeping the feedback it carries"""
+    domain = parse_domain_score(value)
+    domain["feedback"] = value.get("feedback") or ""
+    return domain
+
+
+def parse_feedback(value):
+    """Validate the feedback of a scoring result"""
+    if isinstance(value, dict):
+        value = value.get("feedback")
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("Feedback is missing")
+    return value.strip()
+
+
+def parse_coverage(value):
+    """Validate a coverage analysis, either bare or nested under its section key"""
+    if isinstance(value, dict) and "coverage_analysis" in value:
+        value = value["coverage_analysis"]
+    return CoverageAnalysis.model_validate(value).model_dump()
+
+
+# Sections of a single-call scoring result that are validated, and re-requested, on their own
+SCORING_SECTIONS = {
+    **{f"scores.{domain}": parse_domain_score for domain in SCORING_DOMAINS},
+    "feedback": parse_feedback,
+    "coverage_analysis": parse_coverage,
+}
+
+
+def section_value(scoring_result, section):
+    """The value of a section such as "scores.data_gathering" in a parsed result"""
+    if section.startswith("scores."):
+        scores = scoring_result.get("scores")
+        return scores.get(section.split(".", 1)[1]) if isinstance(scores, dict) else None
+    return scoring_result.get(section)
+
+
+async def request_section(task, prompt, parse, attempts=1):
+    """
+    Request one section of a scoring result and validate it
+    
+    Args:
+        task (str): The provider task, see model_for
+        prompt (str): The user prompt
+        parse (callable): Validates the parsed response, raising ValueError if unusable
+        attempts (int): Calls to make before giving up on an unusable response
+        
+    Returns:
+        The validated section
+        
+    Raises:
+        ValueError: If no response was usable
+    """
+    for attempt in range(1, attempts + 1):
+        response = await get_llm_provider().acomplete(task, scoring_messages(prompt))
+        try:
+            return parse(repair_json(response.text))
+        except ValueError as e:
+            error = e
+            logger.warning(f"Unusable {task} response (attempt {attempt} of {attempts}): {e}")
+    raise ValueError(f"Invalid {task} response: {error}")
+
+
+async def request_missing_sections(missing, sections, transcript, case_details):
+    """
+    Re-request the given sections of a scoring result in small follow-up calls
+    
+    Domain scores and coverage use the per-section prompts of parallel mode and
+    run concurrently; feedback is written last, from the completed scores.
+    
+    Args:
+        missing (list[str]): Sections to request, keys of SCORING_SECTIONS
+        sections (dict): The valid sections already known, updated in place
+        transcript (str): Transcript text used in the scoring prompt
+        case_details (CaseDetails | Case): Details about the patient case
+    """
+    dynamic = {"case_details": case_contexts.get(case_details), "transcript": transcript}
+    rubric = rubric_sections()
+    requests = {}
+    for section in missing:
+        if section.startswith("scores."):
+            title = SCORING_DOMAINS[section.split(".", 1)[1]]
+            prompt = prompts.get("score_domain_prompt.md").assemble(
+                static={"domain_title": title, "domain_rubric": rubric.get(title) or load_scoring_rubric()},
+                dynamic=dynamic,
+            )
+            requests[section] = request_section("score_domain", prompt, parse_domain_score)
+        elif section == "coverage_analysis":
+            prompt = prompts.get("coverage_analysis_prompt.md").assemble(static={}, dynamic=dynamic)
+            requests[section] = request_section("coverage", prompt, parse_coverage)
+
+    tasks = [asyncio.ensure_future(request) for request in requests.values()]
+    try:
+        sections.update(zip(requests, await asyncio.gather(*tasks)))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    if "feedback" in missing:
+        scores = {domain: sections[f"scores.{domain}"] for domain in SCORING_DOMAINS}
+        prompt = prompts.get("score_feedback_prompt.md").assemble(
+            static={},
+            dynamic={**dynamic, "scores": json.dumps(scores, indent=2)},
+        )
+        sections["feedback"] = await request_section("score_feedback", prompt, parse_feedback)
+
+
+async def complete_scoring_result(scoring_result, transcript, case_details):
+    """
+    Validate a single-call scoring result, re-requesting only what is unusable
+    
+    Each section is validated on its own, so a malformed or missing section
+    costs a small follow-up call instead of a full re-score. An overall score
+    that is missing or out of range is recomputed from the domain scores.
+    
+    Args:
+        scoring_result (dict): The parsed, possibly partial, response
+        transcript (str): Transcript text used in the scoring prompt
+        case_details (CaseDetails | Case): Details about the patient case
+        
+    Returns:
+        tuple[dict, list[str]]: The validated result and the sections that were re-requested
+        
+    Raises:
+        ValueError: If a section is still unusable after its follow-up call
+    """
+    sections = {}
+    missing = []
+    for section, parse in SCORING_SECTIONS.items():
+        try:
+            sections[section] = parse(section_value(scoring_result, section))
+        except ValueError:
+            missing.append(section)
+
+    if missing:
+        logger.warning(f"Scoring response is missing or has invalid {', '.join(missing)}; re-requesting them")
+        await request_missing_sections(missing, sections, transcript, case_details)
+
+    scores = {domain: sections[f"scores.{domain}"] for domain in SCORING_DOMAINS}
+    overall_score = scoring_result.get("overall_score")
+    if isinstance(overall_score, bool) or not isinstance(overall_score, (int, float)) or not 1 <= overall_score <= 5:
+        overall_score = round(sum(domain["score"] for domain in scores.values()) / len(scores), 2)
+
+    result = ScoringResult.model_validate({
+        "scores": scores,
+        "overall_score": overall_score,
+        "feedback": sections["feedback"],
+        "coverage_analysis": sections["coverage_analysis"],
+    })
+    return result.model_dump(), missing
+
+
+def merge_scoring_results(results):
+    """
+    Merge per-domain and coverage results into a single scoring result
     
+    Args:
+        results (dict): Parsed responses keyed by domain, plus "coverage_analysis"
+        
+    Returns:
+        dict: Scores, overall score, feedback and coverage analysis
+        
+    Raises:
+        ValueError: If a domain score is missing or out of range
+    """
+    scores = {}
+    feedback = []
+    for domain in SCORING_DOMAINS:
+        result = results[domain]
+        score = result.get("score")
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not 1 <= score <= 5:
+            raise ValueError(f"Invalid {domain} score: {score!r}")
+        scores[domain] = {
+            "score": score,
+            "examples": list(result.get("examples") or []),
+            "areas_for_improvement": list(result.get("areas_for_improvement") or []),
+        }
+        if result.get("feedback"):
+            feedback.append(result["feedback"].strip())
+
+    coverage_analysis = parse_coverage(results["coverage_analysis"])
+
+    overall_score = sum(domain["score"] for domain in scores.values()) / len(scores)
+    return {
+        "scores": scores,
+        "overall_score": round(overall_score, 2),
+        "feedback": " ".join(feedback),
+        "coverage_analysis": coverage_analysis,
+    }
+
+
+async def stream_score_consultation(transcript, case_details):
+    """
+    Score a consultation while the completion is streamed from the model
+    
+    The JSON response is parsed incrementally, so each section is available
+    as soon as the model has finished writing it.
+    
+    Args:
+        transcript (str): The full consultation transcript
+        case_details (CaseDetails | Case): Details about the patient case
+        
+    Yields:
+        tuple: ("section", key, value) for every completed top-level key, with
+        "scores" split into "scores.<domain>", then ("result", None, scores)
+        with the complete result
+    """
+    scoring_transcript = await prepare_transcript(transcript, case_details)
+    prompt = build_scoring_prompt(scoring_transcript, case_details)
+
+    # The local coverage analysis runs while the model is streaming
+    coverage_task = None
+    if settings.COVERAGE_ENGINE == "local":
+        coverage_task = asyncio.ensure_future(
+            local_coverage_analysis(transcript, case_details, scoring_transcript)
+        )
+
+    parser = JSONStreamParser(expand=("scores",))
+    async for delta in get_llm_provider().astream("score", scoring_messages(prompt)):
+        for key, value in parser.feed(delta):
+            yield "section", key, value
+
+    scoring_result = repair_json(parser.text) or {}
+    if coverage_task is not None:
+        scoring_result["coverage_analysis"] = await coverage_task
+        yield "section", "coverage_analysis", scoring_result["coverage_analysis"]
+
+    # Sections that were missing or invalid are re-requested and sent again
+    scoring_result, requested = await complete_scoring_result(scoring_result, scoring_transcript, case_details)
+    for section in requested:
+        yield "section", section, section_value(scoring_result, section)
+
+    # Streaming always uses the single-call prompt, whatever SCORING_MODE is
+    yield "result", None, finalise_scoring_result(scoring_result, scoring_prompt_version("single"))
+
+
+def scoring_messages(prompt):
+    """Chat messages for a scoring prompt"""
+    return [
+        {"role": "system", "content": "You are a medical consultation scoring assistant."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def finalise_scoring_result(scoring_result, prompt_version=None):
+    """Add timestamp and prompt version to a parsed scoring result"""
+    scoring_result["timestamp"] = datetime.now().isoformat()
+    scoring_result["prompt_version"] = prompt_version or scoring_prompt_version()
     return scoring_result
+
+
+def apply_scores(consultation, scores):
+    """
+    Copy a scoring result onto a Consultation row
+    
+    Args:
+        consultation (Consultation): The consultation being scored
+        scores (dict): Result returned by score_consultation
+    """
+    consultation.overall_score = scores["overall_score"]
+    consultation.feedback = scores["feedback"]
+    consultation.domain_scores = scores["scores"]
+    consultation.coverage_analysis = scores["coverage_analysis"]
+    consultation.prompt_version = scores.get("prompt_version")
+    consultation.scoring_status = ScoringStatus.COMPLETED
+    consultation.scoring_error = None
+
+
+def consultation_scores(consultation):
+    """
+    Rebuild the scoring response for a consultation that has been scored
+    
+    Args:
+        consultation (Consultation): A completed consultation
+        
+    Returns:
+        dict: The same shape returned by the synchronous scoring endpoint
+    """
+    return {
+        "scores": consultation.domain_scores,
+        "overall_score": consultation.overall_score,
+        "feedback": consultation.feedback,
+        "coverage_analysis": consultation.coverage_analysis,
+        "prompt_version": consultation.prompt_version,
+        "timestamp": consultation.updated_at.isoformat() if consultation.updated_at else None,
+        "consultation_id": consultation.id,
+    }
@@ -0,0 +1,225 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+COVERED = "COVERED"
+PARTIALLY_COVERED = "PARTIALLY_COVERED"
+NOT_COVERED = "NOT_COVERED"
+
+NO_EVIDENCE = "Not discussed in the transcript"
+MAX_EVIDENCE_LENGTH = 300
+
+_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+same she should so some such than that the their theirs them themselves then there these they this
+those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves patient patients doctor ok okay yes yeah um uh erm
+hmm right well really like just know think mean
+""".split())
+
+_TIMESTAMP = re.compile(r"\[?\(?\b\d{1,2}:\d{2}(?::\d{2})?(?:\.\d+)?\b\)?\]?")
+_SPEAKER = re.compile(r"^\s*[A-Za-z][\w .'-]{0,30}:\s+")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token):
+    """Crude suffix stripping so "headaches" matches "headache" and "worried" matches "worry" """
+    for suffix, replacement in (("ies", "y"), ("ied", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", ""), ("ly", "")):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def tokenize(text):
+    """Lower-case content-word stems of a piece of text"""
+    return [
+        _stem(token)
+        for token in _TOKEN.findall(text.lower())
+        if token not in _STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def split_turns(transcript):
+    """
+    Split a transcript into turns, one per non-empty line
+
+    Returns:
+        list[str]: The text of each turn with timestamps removed
+    """
+    turns = []
+    for line in transcript.splitlines():
+        line = _TIMESTAMP.sub(" ", line).strip()
+        if line:
+            turns.append(line)
+    return turns
+
+
+@dataclass
+class CoverageMatch:
+    """Best match of one case item in the transcript"""
+    section: str
+    index: int
+    similarity: float
+    evidence: str
+
+
+class TranscriptIndex:
+    """
+    TF-IDF index over the turns of one transcript.
+
+    Each turn is indexed on its own and together with the following turn, so
+    a question and the patient's answer can match an item between them. An
+    item's similarity to a window is the share of the item's TF-IDF weight
+    found in the window, which is what "was this mentioned" asks; a plain
+    cosine would penalise long turns that cover several items at once.
+    """
+
+    def __init__(self, transcript):
+        self.turns = split_turns(transcript)
+        turn_tokens = [set(tokenize(_SPEAKER.sub("", turn))) for turn in self.turns]
+
+        self.windows = []
+        for i, tokens in enumerate(turn_tokens):
+            self.windows.append((i, i + 1, tokens))
+            if i + 1 < len(turn_tokens):
+                self.windows.append((i, i + 2, tokens | turn_tokens[i + 1]))
+
+        document_frequency = Counter()
+        for tokens in turn_tokens:
+            document_frequency.update(tokens)
+        count = len(turn_tokens)
+        self._idf = {
+            token: math.log((count + 1) / (frequency + 1)) + 1
+            for token, frequency in document_frequency.items()
+        }
+        # Terms never said in the consultation weigh the most
+        self._unseen_idf = math.log(count + 1) + 1
+
+        self._postings = {}
+        for position, (_, _, tokens) in enumerate(self.windows):
+            for token in tokens:
+                self._postings.setdefault(token, []).append(position)
+
+    def match(self, text):
+        """
+        Find the window that best covers a case item
+
+        Returns:
+            tuple[float, str]: Similarity in [0, 1] and the matching transcript text
+        """
+        weights = {}
+        for token, frequency in Counter(tokenize(text)).items():
+            weights[token] = (1 + math.log(frequency)) * self._idf.get(token, self._unseen_idf)
+        total = sum(weights.values())
+        if not total:
+            return 0.0, NO_EVIDENCE
+
+        found = Counter()
+        for token, weight in weights.items():
+            for position in self._postings.get(token, ()):
+                found[position] += weight
+        if not found:
+            return 0.0, NO_EVIDENCE
+
+        position, weight = max(found.items(), key=lambda item: (item[1], -item[0]))
+        start, end, _ = self.windows[position]
+        evidence = " ".join(self.turns[start:end])
+        if len(evidence) > MAX_EVIDENCE_LENGTH:
+            evidence = evidence[:MAX_EVIDENCE_LENGTH - 3].rstrip() + "..."
+        return weight / total, evidence
+
+
+def coverage_status(similarity):
+    """Map a similarity to a coverage status using the configured thresholds"""
+    if similarity >= settings.COVERAGE_COVERED_THRESHOLD:
+        return COVERED
+    if similarity >= settings.COVERAGE_PARTIAL_THRESHOLD:
+        return PARTIALLY_COVERED
+    return NOT_COVERED
+
+
+def _enum_value(value):
+    return value.value if hasattr(value, "value") else value
+
+
+def analyse_coverage(transcript, case_details):
+    """
+    Work out which case items were covered in a consultation without an LLM
+
+    Args:
+        transcript (str): The consultation transcript
+        case_details (CaseDetails | Case): Details about the patient case
+
+    Returns:
+        tuple[dict, list[CoverageMatch]]: The coverage_analysis section of a
+        scoring result, and the items whose similarity fell between the
+        thresholds, which a reviewer may want to judge
+    """
+    index = TranscriptIndex(transcript)
+    coverage = {"ice_coverage": [], "information_coverage": [], "background_coverage": []}
+    ambiguous = []
+
+    def add(section, text, entry):
+        similarity, evidence = index.match(text)
+        status = coverage_status(similarity)
+        entry.update(coverage_status=status, evidence=evidence if status != NOT_COVERED else NO_EVIDENCE)
+        coverage[section].append(entry)
+        if status == PARTIALLY_COVERED:
+            ambiguous.append(CoverageMatch(section, len(coverage[section]) - 1, similarity, evidence))
+
+    for ice in case_details.ice_entries:
+        add("ice_coverage", ice.description, {
+            "ice_type": _enum_value(ice.ice_type),
+            "description": ice.description,
+        })
+    for info in case_details.information_divulged:
+        add("information_coverage", info.description, {
+            "divulgence_type": _enum_value(info.divulgence_type),
+            "description": info.description,
+        })
+    for detail in case_details.background_details:
+        add("background_coverage", detail.detail, {
+            "description": detail.detail,
+        })
+    return coverage, ambiguous
+
+
+def apply_coverage_review(coverage, ambiguous, review):
+    """
+    Overwrite ambiguous items with the statuses a reviewer returned
+
+    Args:
+        coverage (dict): Result of analyse_coverage
+        ambiguous (list[CoverageMatch]): Items sent for review, numbered from 1
+        review (dict): {"items": [{"id": n, "coverage_status": ..., "evidence": ...}]}
+    """
+    for item in review.get("items") or []:
+        try:
+            match = ambiguous[int(item["id"]) - 1]
+        except (KeyError, ValueError, TypeError, IndexError):
+            continue
+        status = item.get("coverage_status")
+        if status not in (COVERED, PARTIALLY_COVERED, NOT_COVERED):
+            continue
+        entry = coverage[match.section][match.index]
+        entry["coverage_status"] = status
+        if item.get("evidence"):
+            entry["evidence"] = item["evidence"]
+        elif status == NOT_COVERED:
+            entry["evidence"] = NO_EVIDENCE
+
+
+def format_review_items(coverage, ambiguous):
+    """Numbered list of ambiguous items and their closest transcript match for the review prompt"""
+    lines = []
+    for number, match in enumerate(ambiguous, 1):
+        entry = coverage[match.section][match.index]
+        lines.append(f"{number}. {entry['description']}\n   Closest match: {match.evidence}")
+    return "\n".join(lines)
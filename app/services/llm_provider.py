@@ -0,0 +1,535 @@
+import asyncio
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import httpx
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+
+from app.core.config import settings
+from app.services.rate_limiter import LLMRateLimitError, rate_limiter
+from app.services.telemetry import record_llm_call
+from app.utils.tokens import estimate_tokens
+
+
+@dataclass
+class LLMResult:
+    """Text of a completion and the usage reported for it"""
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+
+def model_for(task):
+    """
+    Model configured for a task
+
+    Args:
+        task (str): One of "generate_case", "score", "score_domain", "score_feedback",
+            "coverage", "coverage_review" or "summarise"
+    """
+    if task == "generate_case":
+        return settings.LLM_CASE_MODEL
+    if task in ("coverage_review", "summarise"):
+        return settings.LLM_SUMMARY_MODEL
+    return settings.LLM_SCORING_MODEL
+
+
+class LLMProvider(ABC):
+    """
+    Interface of the chat-completion backends used by the services.
+
+    Callers name the task a completion is for rather than a model, so the
+    model, and the whole backend, can be chosen per environment in Settings.
+    Every async call is metered by the shared rate limiter, and calls the
+    backend rejects as transient are retried with backoff. Backends implement
+    _complete, _acomplete and _astream.
+    """
+
+    name = None
+
+    def _bucket(self, task):
+        return f"{self.name}:{model_for(task)}"
+
+    def _estimate(self, messages, max_tokens):
+        prompt = sum(estimate_tokens(message["content"]) for message in messages)
+        return prompt + (max_tokens or settings.LLM_EXPECTED_OUTPUT_TOKENS)
+
+    def _retry_after(self, error):
+        """
+        Classify a failed call
+
+        Returns:
+            tuple[float | None, bool]: Seconds the backend asked to wait (0 if
+            it did not say) or None if the call should not be retried, and
+            whether the backend rejected the call for rate limiting
+        """
+        return None, False
+
+    def _record(self, task, messages, started, attempt_started, ttft=None, result=None, error=None):
+        finished = time.perf_counter()
+        record_llm_call(
+            {
+                "task": task,
+                "provider": self.name,
+                "model": result.model if result else model_for(task),
+                "prompt_tokens": result.prompt_tokens if result else 0,
+                "completion_tokens": result.completion_tokens if result else 0,
+                "cached_tokens": result.cached_tokens if result else 0,
+                "queue_ms": (attempt_started - started) * 1000,
+                "time_to_first_token_ms": (ttft - attempt_started) * 1000 if ttft else None,
+                "latency_ms": (finished - attempt_started) * 1000,
+                "success": error is None,
+                "error": None if error is None else f"{type(error).__name__}: {error}",
+            },
+            messages=messages,
+            response_text=result.text if result else None,
+        )
+
+    def _final_error(self, error, attempt, retry_after, rate_limited):
+        """The exception to raise for a failed call, or None to retry it"""
+        if retry_after is not None and attempt < settings.OPENAI_MAX_RETRIES:
+            return None
+        if rate_limited:
+            final = LLMRateLimitError(
+                "LLM provider rate limit reached, try again shortly",
+                retry_after=retry_after,
+            )
+            final.__cause__ = error
+            return final
+        return error
+
+    def complete(self, task, messages, json_response=True, max_tokens=None):
+        """
+        Run a completion synchronously
+
+        Args:
+            task (str): What the completion is for, see model_for
+            messages (list[dict]): Chat messages
+            json_response (bool): Ask for a JSON object response
+            max_tokens (int): Optional cap on the output tokens
+
+        Returns:
+            LLMResult: The completion
+
+        Raises:
+            LLMRateLimitError: If the backend kept rejecting the call for rate limiting
+        """
+        # The shared buckets are async only; synchronous calls are retried but not metered
+        started = time.perf_counter()
+        for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+            attempt_started = time.perf_counter()
+            try:
+                result = self._complete(task, messages, json_response, max_tokens)
+            except Exception as e:
+                retry_after, rate_limited = self._retry_after(e)
+                final = self._final_error(e, attempt, retry_after, rate_limited)
+                if final is not None:
+                    self._record(task, messages, started, attempt_started, error=e)
+                    raise final
+                rate_limiter.record_retry(rate_limited)
+                time.sleep(rate_limiter.backoff_delay(attempt, retry_after))
+            else:
+                self._record(task, messages, started, attempt_started, result=result)
+                return result
+
+    async def acomplete(self, task, messages, json_response=True, max_tokens=None):
+        """
+        Async variant of complete, metered by the shared rate limiter
+
+        The telemetry of the call counts rate-limit waits, backoff and failed
+        attempts as queue time, and the successful attempt as latency.
+        """
+        bucket = self._bucket(task)
+        estimated = self._estimate(messages, max_tokens)
+        started = time.perf_counter()
+        for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+            await rate_limiter.acquire(bucket, estimated)
+            attempt_started = time.perf_counter()
+            try:
+                result = await self._acomplete(task, messages, json_response, max_tokens)
+            except Exception as e:
+                retry_after, rate_limited = self._retry_after(e)
+                final = self._final_error(e, attempt, retry_after, rate_limited)
+                if final is not None:
+                    self._record(task, messages, started, attempt_started, error=e)
+                    raise final
+                rate_limiter.record_retry(rate_limited)
+                await asyncio.sleep(rate_limiter.backoff_delay(attempt, retry_after))
+            else:
+                self._record(task, messages, started, attempt_started, result=result)
+                await rate_limiter.settle(bucket, estimated, result.prompt_tokens + result.completion_tokens)
+                return result
+
+    async def astream(self, task, messages, json_response=True):
+        """
+        Stream a completion, metered by the shared rate limiter
+
+        Failures are only retried until the first piece of text has arrived.
+
+        Yields:
+            str: Pieces of the response text as they are generated
+        """
+        bucket = self._bucket(task)
+        estimated = self._estimate(messages, None)
+        started = time.perf_counter()
+        for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+            await rate_limiter.acquire(bucket, estimated)
+            attempt_started = time.perf_counter()
+            first_token = None
+            pieces = []
+            result = None
+            try:
+                async for item in self._astream(task, messages, json_response):
+                    if isinstance(item, LLMResult):
+                        result = item
+                        continue
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    pieces.append(item)
+                    yield item
+            except Exception as e:
+                retry_after, rate_limited = self._retry_after(e)
+                final = self._final_error(e, attempt, retry_after, rate_limited)
+                if first_token is not None or final is not None:
+                    self._record(task, messages, started, attempt_started, first_token, error=e)
+                    raise final or e
+                rate_limiter.record_retry(rate_limited)
+                await asyncio.sleep(rate_limiter.backoff_delay(attempt, retry_after))
+            else:
+                if result is None:
+                    result = LLMResult(text="", model=model_for(task))
+                result.text = "".join(pieces)
+                self._record(task, messages, started, attempt_started, first_token, result=result)
+                await rate_limiter.settle(bucket, estimated, result.prompt_tokens + result.completion_tokens)
+                return
+
+    @abstractmethod
+    def _complete(self, task, messages, json_response, max_tokens):
+        """Return the LLMResult of one blocking completion"""
+
+    @abstractmethod
+    async def _acomplete(self, task, messages, json_response, max_tokens):
+        """Return the LLMResult of one completion"""
+
+    @abstractmethod
+    def _astream(self, task, messages, json_response):
+        """
+        Async generator yielding text pieces, then optionally an LLMResult
+        carrying the usage
+        """
+
+    async def aclose(self):
+        """Release any clients held by the provider"""
+
+
+def _retry_after_header(headers):
+    """Seconds to wait from Retry-After or retry-after-ms, 0 if neither is usable"""
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return 0.0
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class OpenAIProvider(LLMProvider):
+    """
+    Completions from the OpenAI API.
+
+    Each client is created on first use and kept for the life of the worker,
+    so concurrent calls reuse pooled TLS connections instead of opening new ones.
+    The SDK's own retries are disabled; LLMProvider retries under the limiter.
+    """
+
+    name = "openai"
+
+    def __init__(self):
+        self._client = None
+        self._async_client = None
+
+    def _timeout(self):
+        return httpx.Timeout(
+            settings.OPENAI_TIMEOUT_SECONDS,
+            connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+        )
+
+    def _limits(self):
+        return httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=0,
+                timeout=self._timeout(),
+                http_client=DefaultHttpxClient(limits=self._limits()),
+            )
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=0,
+                timeout=self._timeout(),
+                http_client=DefaultAsyncHttpxClient(limits=self._limits()),
+            )
+        return self._async_client
+
+    def _request(self, task, messages, json_response, max_tokens):
+        request = {"model": model_for(task), "messages": messages}
+        if json_response:
+            request["response_format"] = {"type": "json_object"}
+        if max_tokens:
+            request["max_tokens"] = max_tokens
+        return request
+
+    def _result(self, response):
+        result = self._result_usage(response)
+        result.text = response.choices[0].message.content
+        return result
+
+    def _result_usage(self, response):
+        usage = response.usage
+        details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        return LLMResult(
+            text="",
+            model=response.model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            cached_tokens=(getattr(details, "cached_tokens", None) or 0) if details else 0,
+        )
+
+    def _retry_after(self, error):
+        if isinstance(error, RateLimitError):
+            if getattr(error, "code", None) == "insufficient_quota":
+                return None, False
+            return _retry_after_header(error.response.headers), True
+        if isinstance(error, (APIConnectionError, InternalServerError)):
+            return 0.0, False
+        return None, False
+
+    def _complete(self, task, messages, json_response, max_tokens):
+        response = self.client.chat.completions.create(
+            **self._request(task, messages, json_response, max_tokens)
+        )
+        return self._result(response)
+
+    async def _acomplete(self, task, messages, json_response, max_tokens):
+        response = await self.async_client.chat.completions.create(
+            **self._request(task, messages, json_response, max_tokens)
+        )
+        return self._result(response)
+
+    async def _astream(self, task, messages, json_response):
+        stream = await self.async_client.chat.completions.create(
+            **self._request(task, messages, json_response, None),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                # The last chunk carries the usage and no choices
+                yield self._result_usage(chunk)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+        if self._client is not None:
+            self._client.close()
+        self._async_client = None
+        self._client = None
+
+
+class StubProvider(LLMProvider):
+    """
+    Deterministic offline completions for load tests and benchmarks.
+
+    Responses follow the schema each task expects and are derived from a hash
+    of the messages, so the same prompt always gets the same answer. Every
+    call waits STUB_LLM_LATENCY_SECONDS, plus up to
+    STUB_LLM_LATENCY_JITTER_SECONDS chosen from the same hash, to stand in
+    for the provider's response time. Prompt caching is modelled on the
+    OpenAI API: a prompt prefix of at least 1024 tokens that was seen before
+    is reported as cached, in steps of 128 tokens.
+    """
+
+    name = "stub"
+
+    _CACHE_MIN_CHARS = 1024 * 4
+    _CACHE_STEP_CHARS = 128 * 4
+    _CACHE_MAX_PREFIXES = 100000
+
+    def __init__(self):
+        self._prefixes = set()
+
+    _NAMES = ("James", "David", "Michael", "Robert", "John", "Thomas", "Daniel", "Paul")
+    _COMPLAINTS = (
+        "Persistent headache for the past two weeks.",
+        "Low back pain after lifting boxes at work.",
+        "Feeling tired all the time for three months.",
+        "Cough that has not settled after a chest infection.",
+    )
+
+    def _seed(self, task, messages):
+        digest = hashlib.sha256(task.encode("utf-8"))
+        digest.update(json.dumps(messages, sort_keys=True).encode("utf-8"))
+        return int.from_bytes(digest.digest()[:8], "big")
+
+    def _latency(self, seed):
+        jitter = settings.STUB_LLM_LATENCY_JITTER_SECONDS * ((seed % 1000) / 1000)
+        return settings.STUB_LLM_LATENCY_SECONDS + jitter
+
+    def _domain(self, seed, shift):
+        score = 1 + (seed >> shift) % 5
+        return {
+            "score": score,
+            "examples": [f"Stub example for a score of {score}"],
+            "areas_for_improvement": ["Stub area for improvement"],
+        }
+
+    def _respond(self, task, seed):
+        if task == "generate_case":
+            return {
+                "name": self._NAMES[seed % len(self._NAMES)],
+                "age": 18 + seed % 68,
+                "presenting": self._COMPLAINTS[(seed >> 8) % len(self._COMPLAINTS)],
+                "context": "Stub case generated offline.",
+            }
+        coverage = {"ice_coverage": [], "information_coverage": [], "background_coverage": []}
+        if task == "score":
+            scores = {
+                domain: self._domain(seed, shift)
+                for domain, shift in (("data_gathering", 0), ("clinical_management", 8), ("interpersonal_skills", 16))
+            }
+            overall_score = sum(domain["score"] for domain in scores.values()) / len(scores)
+            return {
+                "scores": scores,
+                "overall_score": round(overall_score, 2),
+                "feedback": "Stub feedback.",
+                "coverage_analysis": coverage,
+            }
+        if task == "score_domain":
+            return {**self._domain(seed, 0), "feedback": "Stub feedback."}
+        if task == "score_feedback":
+            return {"feedback": "Stub feedback."}
+        if task == "coverage":
+            return {"coverage_analysis": coverage}
+        if task == "coverage_review":
+            return {"items": []}
+        return None
+
+    def _cached_tokens(self, messages):
+        prompt = "".join(message["content"] for message in messages)
+        if len(self._prefixes) > self._CACHE_MAX_PREFIXES:
+            self._prefixes.clear()
+        digest = hashlib.sha256()
+        cached = 0
+        position = 0
+        for end in range(self._CACHE_MIN_CHARS, len(prompt) + 1, self._CACHE_STEP_CHARS):
+            digest.update(prompt[position:end].encode("utf-8"))
+            position = end
+            prefix = digest.hexdigest()
+            if prefix in self._prefixes:
+                cached = end
+            else:
+                self._prefixes.add(prefix)
+        return cached // 4
+
+    def _result(self, task, messages, text):
+        prompt_length = sum(len(message["content"]) for message in messages)
+        return LLMResult(
+            text=text,
+            model=f"stub-{model_for(task)}",
+            prompt_tokens=prompt_length // 4,
+            completion_tokens=len(text) // 4,
+            cached_tokens=self._cached_tokens(messages),
+        )
+
+    def _text(self, task, seed):
+        response = self._respond(task, seed)
+        if response is None:
+            return f"Stub evidence notes {seed:016x}."
+        return json.dumps(response)
+
+    def _complete(self, task, messages, json_response, max_tokens):
+        seed = self._seed(task, messages)
+        time.sleep(self._latency(seed))
+        return self._result(task, messages, self._text(task, seed))
+
+    async def _acomplete(self, task, messages, json_response, max_tokens):
+        seed = self._seed(task, messages)
+        await asyncio.sleep(self._latency(seed))
+        return self._result(task, messages, self._text(task, seed))
+
+    async def _astream(self, task, messages, json_response):
+        seed = self._seed(task, messages)
+        text = self._text(task, seed)
+        pieces = [text[i:i + 32] for i in range(0, len(text), 32)]
+        delay = self._latency(seed) / max(len(pieces), 1)
+        for piece in pieces:
+            await asyncio.sleep(delay)
+            yield piece
+        yield self._result(task, messages, text)
+
+
+_PROVIDERS = {
+    OpenAIProvider.name: OpenAIProvider,
+    StubProvider.name: StubProvider,
+}
+
+_provider = None
+
+
+def get_llm_provider():
+    """
+    Return the process-wide provider selected by LLM_PROVIDER
+
+    Raises:
+        ValueError: If LLM_PROVIDER names an unknown provider
+    """
+    global _provider
+    if _provider is None:
+        provider_class = _PROVIDERS.get(settings.LLM_PROVIDER)
+        if provider_class is None:
+            raise ValueError(f"Unknown LLM provider: {settings.LLM_PROVIDER}")
+        _provider = provider_class()
+    return _provider
+
+
+async def close_llm_provider():
+    """Close the shared provider and its clients"""
+    global _provider
+    if _provider is not None:
+        await _provider.aclose()
+    _provider = None
@@ -0,0 +1,183 @@
+import hashlib
+import string
+import threading
+import time
+from importlib import resources
+from pathlib import Path
+
+from app.core.config import settings
+
+
+class PromptTemplate:
+    """
+    A prompt template loaded from the app.prompts package.
+
+    Placeholders use string.Template syntax ($name or ${name}), so literal
+    braces in JSON examples need no escaping. The template is split once into
+    static segments and placeholder names; rendering only joins them. The file
+    is re-read only when its mtime changes, and every version of the text gets
+    a short content hash that can be stored alongside results.
+    """
+
+    def __init__(self, resource):
+        self.resource = resource
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self.text = None
+        self.version = None
+        self.placeholders = ()
+        self._segments = ()
+        self._load()
+
+    def _stat_mtime(self):
+        if isinstance(self.resource, Path):
+            return self.resource.stat().st_mtime_ns
+        return None
+
+    def _load(self):
+        text = self.resource.read_text(encoding="utf-8")
+        segments = []
+        placeholders = []
+        position = 0
+        for match in string.Template.pattern.finditer(text):
+            literal = text[position:match.start()]
+            if match.group("escaped") is not None:
+                literal += "$"
+            elif match.group("invalid") is not None:
+                literal += match.group(0)
+            else:
+                name = match.group("named") or match.group("braced")
+                segments.append((literal, name))
+                placeholders.append(name)
+                literal = None
+            if literal is not None:
+                segments.append((literal, None))
+            position = match.end()
+        segments.append((text[position:], None))
+
+        self.text = text
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        self.placeholders = tuple(dict.fromkeys(placeholders))
+        self._segments = tuple(segments)
+        self._mtime = self._stat_mtime()
+
+    def refresh(self):
+        """Reload the template if hot reload is enabled and the file changed on disk"""
+        if not settings.PROMPT_HOT_RELOAD:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < settings.PROMPT_RELOAD_CHECK_SECONDS:
+            return
+        with self._lock:
+            self._checked_at = now
+            mtime = self._stat_mtime()
+            if mtime is not None and mtime != self._mtime:
+                self._load()
+
+    def get_text(self):
+        """Return the current raw text of the template"""
+        self.refresh()
+        return self.text
+
+    def get_version(self):
+        """Return the content hash of the current template text"""
+        self.refresh()
+        return self.version
+
+    def render(self, **values):
+        """
+        Fill the placeholders of the template
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        self.refresh()
+        parts = []
+        for literal, name in self._segments:
+            parts.append(literal)
+            if name is not None:
+                parts.append(str(values[name]))
+        return "".join(parts)
+
+    def render_parts(self, static, dynamic):
+        """
+        Render the template as a static prefix followed by the per-call rest
+
+        Providers cache prompt prefixes, so templates keep instructions, rubric
+        and output format first and the case and transcript last. The prefix
+        runs up to the first dynamic placeholder and is byte-identical for
+        every call with the same static values.
+
+        Args:
+            static (dict): Values shared by every call, e.g. the rubric
+            dynamic (dict): Values of this call, e.g. the case and transcript
+
+        Returns:
+            tuple[str, str]: The static prefix and the rest of the prompt
+
+        Raises:
+            KeyError: If a placeholder has no value
+            ValueError: If a static placeholder comes after a dynamic one
+        """
+        self.refresh()
+        prefix = []
+        rest = None
+        for literal, name in self._segments:
+            (prefix if rest is None else rest).append(literal)
+            if name is None:
+                continue
+            if name in dynamic:
+                if rest is None:
+                    rest = []
+                rest.append(str(dynamic[name]))
+            elif rest is None:
+                prefix.append(str(static[name]))
+            elif name in static:
+                raise ValueError(f"Static placeholder {name} follows a dynamic one in {self.resource.name}")
+            else:
+                raise KeyError(name)
+        return "".join(prefix), "".join(rest or ())
+
+    def assemble(self, static, dynamic):
+        """Render the template from render_parts, static prefix first"""
+        prefix, rest = self.render_parts(static, dynamic)
+        return prefix + rest
+
+
+class PromptRegistry:
+    """Loads each template of a package once and hands out the shared instance"""
+
+    def __init__(self, package):
+        self.package = package
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """
+        Args:
+            name (str): File name of the template inside the package
+
+        Returns:
+            PromptTemplate: The loaded template
+        """
+        template = self._templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    template = PromptTemplate(resources.files(self.package) / name)
+                    self._templates[name] = template
+        return template
+
+    def version(self, *names):
+        """Combined version hash of several templates, e.g. a prompt and its rubric"""
+        if len(names) == 1:
+            return self.get(names[0]).get_version()
+        digest = hashlib.sha256()
+        for name in names:
+            digest.update(f"{name}:{self.get(name).get_version()};".encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+
+prompts = PromptRegistry("app.prompts")
@@ -0,0 +1,267 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.async_db_storage import AsyncDBStorage
+
+
+class LLMRateLimitError(Exception):
+    """Raised when an LLM call cannot be made within the provider's rate limits"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _wait_seconds(request_level, token_level, requests, tokens, rpm, tpm):
+    """Seconds until both buckets hold enough for a call"""
+    return max(
+        max(0.0, requests - request_level) * 60.0 / rpm,
+        max(0.0, tokens - token_level) * 60.0 / tpm,
+    )
+
+
+class MemoryRateLimitStore:
+    """
+    Token buckets held in process memory.
+
+    Only meters the calls of one worker; used for tests, local runs and
+    single-worker deployments.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+
+    def _refill(self, name, rpm, tpm):
+        now = time.monotonic()
+        request_level, token_level, refilled_at = self._buckets.get(name, (rpm, tpm, now))
+        elapsed = now - refilled_at
+        request_level = min(rpm, request_level + elapsed * rpm / 60.0)
+        token_level = min(tpm, token_level + elapsed * tpm / 60.0)
+        return request_level, token_level, now
+
+    async def try_acquire(self, name, requests, tokens, rpm, tpm):
+        """
+        Take requests and tokens from the buckets if both hold enough
+
+        Returns:
+            float: 0 if the call may go ahead, otherwise seconds to wait before retrying
+        """
+        request_level, token_level, now = self._refill(name, rpm, tpm)
+        if request_level >= requests and token_level >= tokens:
+            self._buckets[name] = (request_level - requests, token_level - tokens, now)
+            return 0.0
+        self._buckets[name] = (request_level, token_level, now)
+        return _wait_seconds(request_level, token_level, requests, tokens, rpm, tpm)
+
+    async def adjust(self, name, tokens, tpm):
+        """Return unused tokens to the bucket, or take extra ones when tokens is negative"""
+        request_level, token_level, refilled_at = self._buckets.get(name, (0.0, tpm, time.monotonic()))
+        self._buckets[name] = (request_level, min(tpm, token_level + tokens), refilled_at)
+
+
+class DatabaseRateLimitStore:
+    """
+    Token buckets in the llm_rate_limits table, shared by every worker.
+
+    Refilling and taking from both buckets is a single conditional UPDATE, so
+    concurrent workers can never overdraw them. Time is measured by the
+    database clock so worker clock skew does not matter.
+    """
+
+    # asyncpg infers one type per parameter, and :rpm and :tpm are used both
+    # as LEAST() bounds and in float arithmetic, so every value is cast
+    _RPM = "CAST(:rpm AS double precision)"
+    _TPM = "CAST(:tpm AS double precision)"
+    _REQUESTS = "CAST(:requests AS double precision)"
+    _TOKENS = "CAST(:tokens AS double precision)"
+    _REFILLED = "EXTRACT(EPOCH FROM (LOCALTIMESTAMP - refilled_at))"
+    _REQUEST_LEVEL = f"LEAST({_RPM}, request_level + {_REFILLED} * {_RPM} / 60.0)"
+    _TOKEN_LEVEL = f"LEAST({_TPM}, token_level + {_REFILLED} * {_TPM} / 60.0)"
+
+    _ACQUIRE = text(f"""
+        UPDATE llm_rate_limits
+        SET request_level = {_REQUEST_LEVEL} - {_REQUESTS},
+            token_level = {_TOKEN_LEVEL} - {_TOKENS},
+            refilled_at = LOCALTIMESTAMP
+        WHERE name = :name
+          AND {_REQUEST_LEVEL} >= {_REQUESTS}
+          AND {_TOKEN_LEVEL} >= {_TOKENS}
+        RETURNING request_level
+    """)
+    _LEVELS = text(f"""
+        SELECT {_REQUEST_LEVEL} AS request_level, {_TOKEN_LEVEL} AS token_level
+        FROM llm_rate_limits
+        WHERE name = :name
+    """)
+    _CREATE = text(f"""
+        INSERT INTO llm_rate_limits (id, name, request_level, token_level, refilled_at, created_at, updated_at)
+        VALUES (:id, :name, {_RPM}, {_TPM}, LOCALTIMESTAMP, CAST(:now AS timestamp), CAST(:now AS timestamp))
+        ON CONFLICT (name) DO NOTHING
+    """)
+    _ADJUST = text(f"""
+        UPDATE llm_rate_limits
+        SET token_level = LEAST({_TPM}, token_level + {_TOKENS})
+        WHERE name = :name
+    """)
+
+    def __init__(self):
+        self._created = set()
+
+    async def try_acquire(self, name, requests, tokens, rpm, tpm):
+        """
+        Take requests and tokens from the shared buckets if both hold enough
+
+        Returns:
+            float: 0 if the call may go ahead, otherwise seconds to wait before retrying
+        """
+        params = {"name": name, "requests": requests, "tokens": tokens, "rpm": rpm, "tpm": tpm}
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            if name not in self._created:
+                await db.execute(self._CREATE, {
+                    "id": str(uuid.uuid4()), "name": name, "rpm": rpm, "tpm": tpm, "now": datetime.utcnow(),
+                })
+                self._created.add(name)
+            acquired = (await db.execute(self._ACQUIRE, params)).first()
+            await db.commit()
+            if acquired is not None:
+                return 0.0
+            levels = (await db.execute(self._LEVELS, params)).first()
+        finally:
+            await db.close()
+        if levels is None:
+            return 0.0
+        return _wait_seconds(levels.request_level, levels.token_level, requests, tokens, rpm, tpm)
+
+    async def adjust(self, name, tokens, tpm):
+        """Return unused tokens to the bucket, or take extra ones when tokens is negative"""
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            await db.execute(self._ADJUST, {"name": name, "tokens": tokens, "tpm": tpm})
+            await db.commit()
+        finally:
+            await db.close()
+
+
+class RateLimiter:
+    """
+    Meters LLM calls against requests-per-minute and tokens-per-minute limits.
+
+    Each call first waits for room in both buckets of its model, charging the
+    estimated prompt and output tokens; the estimate is corrected with the
+    usage the provider reports. Calls the provider still rejects are retried
+    with jittered exponential backoff, honouring Retry-After when it is sent.
+    If the store is unavailable calls go ahead unmetered rather than failing.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.calls = 0
+        self.throttled_calls = 0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+        self.retries = 0
+        self.rate_limited_responses = 0
+        self.exhausted = 0
+        self.store_errors = 0
+
+    async def acquire(self, bucket, tokens):
+        """
+        Wait until a call of the given size fits in the bucket
+
+        Raises:
+            LLMRateLimitError: If the call would have to wait longer than LLM_RATE_LIMIT_MAX_WAIT_SECONDS
+        """
+        self.calls += 1
+        if not settings.LLM_RATE_LIMIT_ENABLED:
+            return
+
+        rpm = settings.LLM_REQUESTS_PER_MINUTE
+        tpm = settings.LLM_TOKENS_PER_MINUTE
+        tokens = min(tokens, tpm)
+        started = time.monotonic()
+        deadline = started + settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS
+        throttled = False
+        while True:
+            try:
+                wait = await self.store.try_acquire(bucket, 1, tokens, rpm, tpm)
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"Rate limit store unavailable, calling unmetered: {e}")
+                wait = 0.0
+            if wait <= 0:
+                break
+            if time.monotonic() + wait > deadline:
+                self.exhausted += 1
+                raise LLMRateLimitError(
+                    f"LLM rate limit reached for {bucket}, try again shortly",
+                    retry_after=wait,
+                )
+            # Jitter spreads out workers that were all waiting for the same refill
+            throttled = True
+            await asyncio.sleep(wait + random.uniform(0, min(wait, 1.0)))
+
+        waited = time.monotonic() - started
+        if throttled:
+            self.throttled_calls += 1
+        self.queue_wait_seconds += waited
+        self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, waited)
+
+    async def settle(self, bucket, estimated_tokens, used_tokens):
+        """Correct the token bucket with the usage reported for a call"""
+        if not settings.LLM_RATE_LIMIT_ENABLED or not used_tokens:
+            return
+        try:
+            await self.store.adjust(bucket, estimated_tokens - used_tokens, settings.LLM_TOKENS_PER_MINUTE)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Rate limit store unavailable, usage not recorded: {e}")
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        Delay before retry number attempt (from 0)
+
+        Uses the server's Retry-After when given, otherwise exponential backoff
+        with full jitter capped at LLM_RETRY_MAX_DELAY_SECONDS.
+        """
+        if retry_after:
+            return retry_after + random.uniform(0, settings.LLM_RETRY_BASE_DELAY_SECONDS)
+        ceiling = min(settings.LLM_RETRY_MAX_DELAY_SECONDS, settings.LLM_RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    def record_retry(self, rate_limited):
+        self.retries += 1
+        if rate_limited:
+            self.rate_limited_responses += 1
+
+    def stats(self):
+        """Queue-wait and retry counters for the admin dashboard"""
+        return {
+            "enabled": settings.LLM_RATE_LIMIT_ENABLED,
+            "store": settings.LLM_RATE_LIMIT_STORE,
+            "requests_per_minute": settings.LLM_REQUESTS_PER_MINUTE,
+            "tokens_per_minute": settings.LLM_TOKENS_PER_MINUTE,
+            "calls": self.calls,
+            "throttled_calls": self.throttled_calls,
+            "queue_wait_seconds": round(self.queue_wait_seconds, 3),
+            "average_queue_wait_seconds": round(self.queue_wait_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_queue_wait_seconds": round(self.max_queue_wait_seconds, 3),
+            "retries": self.retries,
+            "rate_limited_responses": self.rate_limited_responses,
+            "exhausted": self.exhausted,
+            "store_errors": self.store_errors,
+        }
+
+
+rate_limiter = RateLimiter(
+    DatabaseRateLimitStore() if settings.LLM_RATE_LIMIT_STORE == "database" else MemoryRateLimitStore()
+)
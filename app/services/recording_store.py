@@ -0,0 +1,399 @@
+import asyncio
+import base64
+import hashlib
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.models.consultation import Consultation
+from app.models.recording import Recording
+
+
+class RecordingTooLargeError(Exception):
+    """Raised when an upload exceeds RECORDING_MAX_BYTES"""
+
+
+class LocalUpload:
+    """An upload being written to a temporary file next to the store"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.path = backend.root / "tmp" / f"{uuid.uuid4()}.part"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+
+    async def write(self, chunk):
+        await asyncio.to_thread(self._file.write, chunk)
+
+    async def commit(self, key):
+        """Move the upload into place under key"""
+        self._file.close()
+        target = self.backend.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Identical content may already be there from a concurrent upload
+        await asyncio.to_thread(os.replace, self.path, target)
+
+    async def abort(self):
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class LocalRecordingBackend:
+    """Recordings stored as files under a directory on the local filesystem"""
+
+    name = "local"
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, key):
+        return self.root / key
+
+    def start_upload(self):
+        return LocalUpload(self)
+
+    async def read(self, key, start, end, chunk_size):
+        """
+        Yield the bytes from start to end (inclusive) of a stored recording
+
+        Args:
+            key (str): Storage key of the recording
+            start (int): First byte
+            end (int): Last byte
+            chunk_size (int): Largest piece yielded at once
+        """
+        with open(self.path(key), "rb") as file:
+            await asyncio.to_thread(file.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(file.read, min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class S3Upload:
+    """
+    An upload spooled to a temporary file, sent to the bucket once its
+    content hash, and so its key, is known
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._file = tempfile.TemporaryFile()
+
+    async def write(self, chunk):
+        await asyncio.to_thread(self._file.write, chunk)
+
+    async def commit(self, key):
+        await asyncio.to_thread(self._file.seek, 0)
+        # upload_fileobj sends large files as a multipart upload
+        await asyncio.to_thread(self.backend.client.upload_fileobj, self._file, self.backend.bucket, key)
+        self._file.close()
+
+    async def abort(self):
+        self._file.close()
+
+
+class S3RecordingBackend:
+    """
+    Recordings stored in an S3-compatible bucket.
+
+    boto3 is only needed when this backend is selected. Point
+    RECORDING_S3_ENDPOINT_URL at a local stand-in such as MinIO for
+    development.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket):
+        if not bucket:
+            raise ValueError("RECORDING_S3_BUCKET must be set for the s3 recording store")
+        self.bucket = bucket
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("The s3 recording store requires boto3 to be installed") from e
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=settings.RECORDING_S3_ENDPOINT_URL,
+                region_name=settings.RECORDING_S3_REGION,
+                aws_access_key_id=settings.RECORDING_S3_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.RECORDING_S3_SECRET_ACCESS_KEY,
+            )
+        return self._client
+
+    def start_upload(self):
+        return S3Upload(self)
+
+    async def read(self, key, start, end, chunk_size):
+        """Yield the bytes from start to end (inclusive) of a stored recording"""
+        response = await asyncio.to_thread(
+            self.client.get_object, Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}"
+        )
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+
+class RecordingStore:
+    """
+    Content-addressed store for consultation audio.
+
+    Uploads are streamed to the backend chunk by chunk while their sha256 is
+    computed, so a recording is never held in memory. A recording whose hash
+    is already known is not stored twice: the upload is discarded and the
+    existing Recording is reused.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def key(sha256):
+        return f"{sha256[:2]}/{sha256}"
+
+    async def save(self, db, chunks, content_type):
+        """
+        Store an uploaded recording
+
+        Args:
+            db (AsyncDBStorage): Session the Recording is added to; the caller commits
+            chunks (AsyncIterator[bytes]): The body of the upload
+            content_type (str): Media type sent with the upload
+
+        Returns:
+            tuple[Recording, bool]: The recording, and whether identical content was already stored
+
+        Raises:
+            RecordingTooLargeError: If the upload exceeds RECORDING_MAX_BYTES
+            ValueError: If the upload is empty
+        """
+        upload = self.backend.start_upload()
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > settings.RECORDING_MAX_BYTES:
+                    raise RecordingTooLargeError(
+                        f"Recording exceeds the {settings.RECORDING_MAX_BYTES} byte limit"
+                    )
+                digest.update(chunk)
+                await upload.write(chunk)
+            if size == 0:
+                raise ValueError("Recording is empty")
+
+            sha256 = digest.hexdigest()
+            existing = await self.find(db, sha256)
+            if existing is not None:
+                await upload.abort()
+                return existing, True
+            await upload.commit(self.key(sha256))
+        except BaseException:
+            await upload.abort()
+            raise
+
+        recording = Recording(
+            sha256=sha256,
+            size_bytes=size,
+            content_type=content_type,
+            backend=self.backend.name,
+            storage_key=self.key(sha256),
+        )
+        db.add(recording)
+        return recording, False
+
+    async def find(self, db, sha256):
+        return await db.scalar(select(Recording).where(Recording.sha256 == sha256))
+
+    async def attach(self, db, consultation, chunks, content_type, duration_seconds=None):
+        """
+        Store an upload and point a consultation at it, in one commit
+
+        Two identical recordings uploaded at once both reach the insert; the
+        loser of the unique sha256 index retries against the winner's row.
+
+        Returns:
+            tuple[Recording, bool]: As for save
+        """
+        recording, deduplicated = await self.save(db, chunks, content_type)
+        consultation.recording_id = recording.id
+        if duration_seconds is not None:
+            consultation.duration_seconds = duration_seconds
+        try:
+            await db.commit()
+        except IntegrityError:
+            existing = await self.find(db, recording.sha256)
+            if existing is None:
+                raise
+            logger.info(f"Recording {recording.sha256[:12]} was stored concurrently, reusing it")
+            recording, deduplicated = existing, True
+            consultation.recording_id = recording.id
+            if duration_seconds is not None:
+                consultation.duration_seconds = duration_seconds
+            await db.commit()
+            # The rollback expired the consultation; reload it for the caller
+            await db.refresh(consultation)
+        return recording, deduplicated
+
+    async def backfill_inline(self, db, batch_size=50):
+        """
+        Move audio saved inline on consultations into the store
+
+        Each consultation is moved in its own short transaction: the audio is
+        stored, recording_id set and audio_recording cleared. Audio that cannot
+        be decoded or is over RECORDING_MAX_BYTES is left inline and logged.
+
+        Args:
+            db (AsyncDBStorage): Session used for the reads and updates
+            batch_size (int): Consultation ids read per query
+
+        Returns:
+            tuple[int, int]: The number of consultations moved and skipped
+        """
+        moved = skipped = 0
+        last_id = ""
+        while True:
+            ids = (await db.scalars(
+                select(Consultation.id)
+                .where(
+                    Consultation.recording_id.is_(None),
+                    Consultation.audio_recording.is_not(None),
+                    Consultation.id > last_id,
+                )
+                .order_by(Consultation.id)
+                .limit(batch_size)
+            )).all()
+            await db.commit()
+            if not ids:
+                return moved, skipped
+
+            for consultation_id in ids:
+                last_id = consultation_id
+                audio_recording = await db.scalar(
+                    select(Consultation.audio_recording).where(Consultation.id == consultation_id)
+                )
+                try:
+                    audio, content_type = decode_inline_recording(audio_recording)
+                    recording, _ = await self.save(db, _single_chunk(audio), content_type)
+                except (RecordingTooLargeError, ValueError) as e:
+                    await db.rollback()
+                    logger.warning(f"Leaving the recording of consultation {consultation_id} inline: {e}")
+                    skipped += 1
+                    continue
+                await db.execute(
+                    update(Consultation)
+                    .where(Consultation.id == consultation_id)
+                    .values(recording_id=recording.id, audio_recording=None)
+                )
+                await db.commit()
+                moved += 1
+            logger.info(f"Moved {moved} inline recordings into the {self.backend.name} store")
+
+    def read(self, recording, start, end):
+        """
+        Stream a byte range of a recording
+
+        Args:
+            recording (Recording): The recording to read
+            start (int): First byte
+            end (int): Last byte, inclusive
+
+        Returns:
+            AsyncIterator[bytes]: Chunks of at most RECORDING_CHUNK_BYTES
+        """
+        return self.backend.read(recording.storage_key, start, end, settings.RECORDING_CHUNK_BYTES)
+
+
+async def _single_chunk(data):
+    yield data
+
+
+def decode_inline_recording(audio_recording):
+    """
+    Decode audio saved inline on a consultation before the recording store
+
+    Args:
+        audio_recording (str): Base64 audio, optionally as a data: URL
+
+    Returns:
+        tuple[bytes, str]: The audio and its media type
+
+    Raises:
+        ValueError: If the audio is not valid base64
+    """
+    content_type = "application/octet-stream"
+    if audio_recording.startswith("data:") and "," in audio_recording:
+        header, audio_recording = audio_recording.split(",", 1)
+        content_type = header[5:].split(";", 1)[0] or content_type
+    try:
+        return base64.b64decode(audio_recording), content_type
+    except ValueError as e:
+        raise ValueError(f"Inline recording is not valid base64: {e}") from e
+
+
+def parse_range(header, size):
+    """
+    Resolve a single-range HTTP Range header against a recording's size
+
+    Args:
+        header (str): The Range header, e.g. "bytes=0-1023" or "bytes=-500"
+        size (int): Size of the recording in bytes
+
+    Returns:
+        tuple[int, int] | None: First and last byte to send, or None to send
+        the whole recording (no header, or one this endpoint does not handle)
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    # Syntactically invalid ranges are ignored, as HTTP allows
+    if not (first or last) or not (first.isdigit() or not first) or not (last.isdigit() or not last):
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(f"Range {header} starts beyond a recording of {size} bytes")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _backend():
+    if settings.RECORDING_STORE == "s3":
+        return S3RecordingBackend(settings.RECORDING_S3_BUCKET)
+    if settings.RECORDING_STORE == "local":
+        return LocalRecordingBackend(settings.RECORDING_LOCAL_PATH)
+    raise ValueError(f"Unknown recording store: {settings.RECORDING_STORE}")
+
+
+recording_store = RecordingStore(_backend())
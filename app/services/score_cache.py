@@ -0,0 +1,280 @@
+import asyncio
+import copy
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.async_db_storage import AsyncDBStorage
+from app.models.score_cache import ScoreCacheEntry
+from app.services.consultation import score_consultation, scoring_prompt_version
+from app.services.llm_provider import model_for
+
+
+def _enum_value(value):
+    return value.value if hasattr(value, "value") else value
+
+
+def normalise_transcript(transcript):
+    """Normalise unicode and whitespace so trivially different resubmissions share a key"""
+    transcript = unicodedata.normalize("NFC", transcript)
+    lines = [re.sub(r"\s+", " ", line).strip() for line in transcript.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def case_fingerprint(case_details):
+    """
+    Canonical JSON of the case fields that reach the scoring prompt
+
+    Works with both CaseDetails schemas and Case ORM objects.
+    """
+    doctor_info = case_details.doctor_info
+    return json.dumps({
+        "case_number": case_details.case_number,
+        "patient_name": case_details.patient_name,
+        "patient_age": case_details.patient_age,
+        "patient_gender": _enum_value(case_details.patient_gender),
+        "presenting_complaint": case_details.presenting_complaint,
+        "notes": case_details.notes,
+        "doctor_info": None if doctor_info is None else [
+            doctor_info.name,
+            doctor_info.age,
+            doctor_info.past_medical_history,
+            doctor_info.current_medication,
+            doctor_info.context,
+        ],
+        "ice_entries": [
+            [_enum_value(ice.ice_type), ice.description] for ice in case_details.ice_entries
+        ],
+        "background_details": [detail.detail for detail in case_details.background_details],
+        "information_divulged": [
+            [_enum_value(info.divulgence_type), info.description]
+            for info in case_details.information_divulged
+        ],
+    }, sort_keys=True, separators=(",", ":"))
+
+
+def scoring_cache_key(transcript, case_details):
+    """
+    Content hash identifying a scoring request
+
+    Args:
+        transcript (str): The consultation transcript
+        case_details (CaseDetails): Details about the patient case
+
+    Returns:
+        str: Hex SHA-256 of the normalised transcript, case details, prompt version,
+        provider and model
+    """
+    digest = hashlib.sha256()
+    for part in (
+        f"{settings.LLM_PROVIDER}:{model_for('score')}:{settings.SCORING_MODE}",
+        scoring_prompt_version(),
+        case_fingerprint(case_details),
+        normalise_transcript(transcript),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class ScoreCache:
+    """
+    Two-tier cache of scoring results.
+
+    The in-memory tier is an LRU bounded by max_entries with a per-entry TTL.
+    The table tier (score_cache) is shared by every worker; each write purges
+    expired rows and keeps at most max_table_entries, dropping the rows that
+    expire soonest. It uses short-lived sessions of its own so a cache failure
+    never disturbs the caller's transaction. Concurrent requests for the same
+    key on one worker share a single LLM call.
+    """
+
+    def __init__(self, ttl_seconds, max_entries, max_table_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_table_entries = max_table_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.memory_hits = 0
+        self.table_hits = 0
+        self.misses = 0
+
+    def _get_memory(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _set_memory(self, key, result):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_table(self, key):
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            entry = (await db.scalars(
+                select(ScoreCacheEntry).filter(
+                    ScoreCacheEntry.cache_key == key,
+                    ScoreCacheEntry.expires_at > datetime.utcnow(),
+                )
+            )).first()
+        except Exception as e:
+            logger.warning(f"Score cache lookup failed: {e}")
+            return None
+        finally:
+            await db.close()
+        return entry.result if entry else None
+
+    async def _set_table(self, key, result):
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        entry = ScoreCacheEntry(cache_key=key, result=result, expires_at=expires_at)
+        statement = insert(ScoreCacheEntry).values(
+            id=entry.id,
+            cache_key=key,
+            result=result,
+            expires_at=expires_at,
+            created_at=now,
+            updated_at=now,
+        ).on_conflict_do_update(
+            index_elements=[ScoreCacheEntry.cache_key],
+            set_={"result": result, "expires_at": expires_at, "updated_at": now},
+        )
+        # Expiry of the newest row beyond the cap, NULL while under it
+        cap = (
+            select(ScoreCacheEntry.expires_at)
+            .order_by(ScoreCacheEntry.expires_at.desc())
+            .offset(self.max_table_entries)
+            .limit(1)
+            .scalar_subquery()
+        )
+        prune = delete(ScoreCacheEntry).where(
+            or_(ScoreCacheEntry.expires_at <= now, ScoreCacheEntry.expires_at <= cap)
+        )
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            await db.execute(statement)
+            await db.execute(prune)
+            await db.commit()
+        except Exception as e:
+            logger.warning(f"Score cache store failed: {e}")
+        finally:
+            await db.close()
+
+    async def get(self, key):
+        """
+        Look a result up in memory, then in the shared table
+
+        Returns:
+            dict | None: A copy of the cached result, or None on a miss
+        """
+        result = self._get_memory(key)
+        if result is not None:
+            self.memory_hits += 1
+            return copy.deepcopy(result)
+
+        result = await self._get_table(key)
+        if result is not None:
+            self.table_hits += 1
+            self._set_memory(key, result)
+            return copy.deepcopy(result)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key, result):
+        """Store a result in both tiers"""
+        result = copy.deepcopy(result)
+        self._set_memory(key, result)
+        await self._set_table(key, result)
+
+    async def score(self, transcript, case_details):
+        """
+        Return cached scores for a consultation, calling the LLM only on a miss
+
+        Args:
+            transcript (str): The consultation transcript
+            case_details (CaseDetails): Details about the patient case
+
+        Returns:
+            dict: Scores and feedback for the consultation
+        """
+        if not settings.SCORE_CACHE_ENABLED:
+            return await score_consultation(transcript, case_details)
+
+        key = scoring_cache_key(transcript, case_details)
+        result = await self.get(key)
+        if result is not None:
+            return result
+
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                return copy.deepcopy(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling() or not inflight.cancelled():
+                    raise
+                # The call we were waiting on was cancelled; make it again
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await score_consultation(transcript, case_details)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled, e.g. by a client disconnect: release the waiters
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
+
+        await self.set(key, result)
+        return copy.deepcopy(result)
+
+    def clear(self):
+        """Drop every entry of the in-memory tier"""
+        self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for the admin dashboard"""
+        lookups = self.memory_hits + self.table_hits + self.misses
+        return {
+            "enabled": settings.SCORE_CACHE_ENABLED,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_hits": self.memory_hits,
+            "table_hits": self.table_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.table_hits) / lookups if lookups else 0.0,
+        }
+
+
+score_cache = ScoreCache(
+    ttl_seconds=settings.SCORE_CACHE_TTL_SECONDS,
+    max_entries=settings.SCORE_CACHE_MAX_ENTRIES,
+    max_table_entries=settings.SCORE_CACHE_TABLE_MAX_ENTRIES,
+)
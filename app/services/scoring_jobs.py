@@ -0,0 +1,200 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.async_db_storage import AsyncDBStorage
+from app.models.consultation import Consultation, ScoringStatus
+from app.services.consultation import apply_scores
+from app.services.score_cache import score_cache
+from app.services.telemetry import collect_llm_calls, llm_call_rows
+
+
+class ScoringQueueFullError(Exception):
+    """Raised when the scoring queue cannot accept more jobs"""
+
+
+@dataclass
+class ScoringJob:
+    consultation_id: str
+    transcript: str
+    case_details: Any
+
+
+class ScoringJobQueue:
+    """
+    Bounded in-process queue that scores consultations in the background.
+
+    A fixed number of worker tasks pull jobs from the queue, so the number of
+    concurrent LLM calls is set by SCORING_WORKER_CONCURRENCY independently of
+    how many HTTP requests the worker accepts. Job state is persisted on the
+    Consultation row, so any worker can report on a job.
+    """
+
+    def __init__(self, concurrency, max_size):
+        self.concurrency = concurrency
+        self.max_size = max_size
+        self._queue = None
+        self._workers = []
+        self._done_events = {}
+
+    async def start(self):
+        """Fail jobs orphaned by a previous process, then start the worker tasks"""
+        await self.fail_stale_jobs()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"scoring-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"Started {self.concurrency} scoring workers")
+
+    async def stop(self):
+        """Cancel the workers and fail any job still waiting in the queue"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        abandoned = []
+        while self._queue is not None and not self._queue.empty():
+            abandoned.append(self._queue.get_nowait().consultation_id)
+        for consultation_id in abandoned:
+            await self._mark_failed(consultation_id, "Scoring worker shut down before the job ran")
+
+    def submit(self, consultation_id, transcript, case_details):
+        """
+        Enqueue a consultation for scoring
+
+        Args:
+            consultation_id (str): The persisted consultation to score
+            transcript (str): The consultation transcript
+            case_details (CaseDetails | Case): Case with its child rows loaded
+
+        Raises:
+            ScoringQueueFullError: If the queue is at capacity or not running
+        """
+        if self._queue is None:
+            raise ScoringQueueFullError("Scoring workers are not running")
+        try:
+            self._queue.put_nowait(ScoringJob(consultation_id, transcript, case_details))
+        except asyncio.QueueFull:
+            raise ScoringQueueFullError("Scoring queue is full")
+        self._done_events[consultation_id] = asyncio.Event()
+
+    def is_local(self, consultation_id):
+        """Whether the job was submitted to this worker and has not been reported yet"""
+        return consultation_id in self._done_events
+
+    async def wait(self, consultation_id, timeout):
+        """
+        Wait until a locally submitted job finishes
+
+        Returns:
+            bool: True if the job finished within the timeout
+        """
+        event = self._done_events.get(consultation_id)
+        if event is None:
+            return False
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                await self._mark_failed(job.consultation_id, "Scoring worker shut down while the job was running")
+                raise
+            except Exception:
+                logger.exception(f"Unexpected error running scoring job {job.consultation_id}")
+            finally:
+                self._queue.task_done()
+                event = self._done_events.pop(job.consultation_id, None)
+                if event is not None:
+                    event.set()
+
+    async def _run(self, job):
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            consultation = await db.find_by_id(Consultation, job.consultation_id)
+            if consultation is None:
+                logger.warning(f"Consultation {job.consultation_id} vanished before scoring")
+                return
+            consultation.scoring_status = ScoringStatus.RUNNING
+            await db.commit()
+
+            with collect_llm_calls("scoring_job") as llm_calls:
+                try:
+                    scores = await score_cache.score(job.transcript, job.case_details)
+                except Exception as e:
+                    logger.exception(f"Error scoring consultation {job.consultation_id}")
+                    consultation.scoring_status = ScoringStatus.FAILED
+                    consultation.scoring_error = str(e)
+                else:
+                    apply_scores(consultation, scores)
+            db.add_all(llm_call_rows(llm_calls, consultation.id))
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def fail_stale_jobs(self):
+        """
+        Fail jobs left PENDING or RUNNING by a worker that crashed or was killed
+
+        Jobs only live in the memory of the process that accepted them, so
+        nothing else will finish them. A job counts as stale once its row has
+        not changed for SCORING_JOB_STALE_SECONDS, which leaves the live jobs
+        of other processes alone.
+
+        Returns:
+            int: The number of jobs failed
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.SCORING_JOB_STALE_SECONDS)
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            result = await db.execute(
+                update(Consultation)
+                .where(
+                    Consultation.scoring_status.in_([ScoringStatus.PENDING, ScoringStatus.RUNNING]),
+                    Consultation.updated_at < cutoff,
+                )
+                .values(
+                    scoring_status=ScoringStatus.FAILED,
+                    scoring_error="Scoring job was interrupted before it finished; resubmit it",
+                )
+            )
+            await db.commit()
+        finally:
+            await db.close()
+        if result.rowcount:
+            logger.warning(f"Failed {result.rowcount} scoring jobs left unfinished by a previous worker")
+        return result.rowcount
+
+    async def _mark_failed(self, consultation_id, error):
+        db = AsyncDBStorage()
+        db.setup_db()
+        try:
+            consultation = await db.find_by_id(Consultation, consultation_id)
+            # A job cancelled while committing its result has already finished
+            if consultation is not None and consultation.scoring_status in (ScoringStatus.PENDING, ScoringStatus.RUNNING):
+                consultation.scoring_status = ScoringStatus.FAILED
+                consultation.scoring_error = error
+                await db.commit()
+        finally:
+            await db.close()
+
+
+scoring_jobs = ScoringJobQueue(
+    concurrency=settings.SCORING_WORKER_CONCURRENCY,
+    max_size=settings.SCORING_QUEUE_MAX_SIZE,
+)
@@ -0,0 +1,223 @@
+import bisect
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from loguru import logger
+
+from app.core.config import settings
+from app.models.llm_call import LLMCall
+
+
+# USD per million tokens: (input, cached input, output). Dated model
+# snapshots such as "gpt-4.1-2025-04-14" match by prefix.
+MODEL_PRICES = {
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+# Upper bounds in milliseconds of the histogram buckets
+_BUCKETS_MS = tuple(round(10 * 1.25 ** i, 1) for i in range(48))
+
+_collector = ContextVar("llm_call_collector", default=None)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens):
+    """
+    Estimated cost of a call in USD
+
+    Returns:
+        float | None: The cost, or None if the model has no known price
+    """
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            input_price, cached_price, output_price = MODEL_PRICES[name]
+            uncached = max(0, prompt_tokens - cached_tokens)
+            return (
+                uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price
+            ) / 1_000_000
+    return None
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histograms of call timings, labelled by model, endpoint and
+    metric.
+
+    Buckets grow by 25%, so percentiles are accurate to within one bucket
+    while memory stays constant however many calls are recorded.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model, endpoint, metric, value_ms):
+        key = (model, endpoint, metric)
+        index = bisect.bisect_left(_BUCKETS_MS, value_ms)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(_BUCKETS_MS) + 1), "count": 0, "sum": 0.0}
+            series["counts"][index] += 1
+            series["count"] += 1
+            series["sum"] += value_ms
+
+    @staticmethod
+    def _percentile(series, fraction):
+        rank = fraction * series["count"]
+        seen = 0
+        for index, count in enumerate(series["counts"]):
+            seen += count
+            if seen >= rank:
+                return _BUCKETS_MS[index] if index < len(_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def summary(self):
+        """
+        Returns:
+            list[dict]: Count, mean and p50/p95/p99 of every series
+        """
+        with self._lock:
+            items = [(key, dict(series, counts=list(series["counts"]))) for key, series in self._series.items()]
+        return [
+            {
+                "model": model,
+                "endpoint": endpoint,
+                "metric": metric,
+                "count": series["count"],
+                "mean_ms": round(series["sum"] / series["count"], 1),
+                "p50_ms": self._percentile(series, 0.50),
+                "p95_ms": self._percentile(series, 0.95),
+                "p99_ms": self._percentile(series, 0.99),
+            }
+            for (model, endpoint, metric), series in sorted(items, key=lambda item: item[0])
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class UsageTotals:
+    """Token and cost counters per model and endpoint"""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, call):
+        key = (call["model"], call["endpoint"])
+        with self._lock:
+            totals = self._totals.setdefault(key, {
+                "calls": 0, "failures": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cached_tokens": 0, "cost_usd": 0.0,
+            })
+            totals["calls"] += 1
+            totals["failures"] += 0 if call["success"] else 1
+            totals["prompt_tokens"] += call["prompt_tokens"]
+            totals["completion_tokens"] += call["completion_tokens"]
+            totals["cached_tokens"] += call["cached_tokens"]
+            totals["cost_usd"] += call["cost_usd"] or 0.0
+
+    def summary(self):
+        """
+        Returns:
+            list[dict]: Totals of every series, with the share of prompt tokens
+            served from the provider's prompt cache
+        """
+        with self._lock:
+            return [
+                {
+                    "model": model,
+                    "endpoint": endpoint,
+                    **totals,
+                    "cost_usd": round(totals["cost_usd"], 6),
+                    "cached_prompt_share": (
+                        round(totals["cached_tokens"] / totals["prompt_tokens"], 3) if totals["prompt_tokens"] else 0.0
+                    ),
+                }
+                for (model, endpoint), totals in sorted(self._totals.items())
+            ]
+
+
+llm_latency = LatencyHistogram()
+llm_usage = UsageTotals()
+
+
+@contextmanager
+def collect_llm_calls(endpoint):
+    """
+    Collect the LLM calls made inside the block, including in tasks it starts
+
+    Args:
+        endpoint (str): Label for the calls, e.g. "POST /consultations/score_consultation"
+
+    Yields:
+        list[dict]: The calls recorded so far; turn them into rows with llm_call_rows
+    """
+    calls = []
+    token = _collector.set((endpoint, calls))
+    try:
+        yield calls
+    finally:
+        _collector.reset(token)
+
+
+def current_endpoint():
+    collector = _collector.get()
+    return collector[0] if collector else None
+
+
+def record_llm_call(call, messages=None, response_text=None):
+    """
+    Record one LLM call in the histograms, the active collector and the trace log
+
+    Args:
+        call (dict): Telemetry fields of LLMCall, without the consultation id
+        messages (list[dict]): The prompt, only logged when the call is sampled
+        response_text (str): The response, only logged when the call is sampled
+    """
+    call["endpoint"] = call.get("endpoint") or current_endpoint() or "background"
+    call["cost_usd"] = estimate_cost(
+        call["model"], call["prompt_tokens"], call["completion_tokens"], call["cached_tokens"]
+    )
+
+    llm_latency.observe(call["model"], call["endpoint"], "latency_ms", call["latency_ms"])
+    llm_latency.observe(call["model"], call["endpoint"], "queue_ms", call["queue_ms"])
+    if call.get("time_to_first_token_ms") is not None:
+        llm_latency.observe(call["model"], call["endpoint"], "time_to_first_token_ms", call["time_to_first_token_ms"])
+    llm_usage.add(call)
+
+    collector = _collector.get()
+    if collector is not None:
+        collector[1].append(call)
+
+    if random.random() < settings.LLM_TRACE_SAMPLE_RATE:
+        limit = settings.LLM_TRACE_MAX_CHARS
+        logger.bind(
+            llm_call=call,
+            prompt=[{**message, "content": message["content"][:limit]} for message in messages or []],
+            response=(response_text or "")[:limit],
+        ).info(
+            f"LLM call {call['task']} on {call['model']}: {call['latency_ms']:.0f} ms, "
+            f"{call['prompt_tokens']}+{call['completion_tokens']} tokens"
+        )
+
+
+def llm_call_rows(calls, consultation_id):
+    """
+    Build LLMCall rows for collected calls
+
+    Args:
+        calls (list[dict]): Calls gathered by collect_llm_calls
+        consultation_id (str): The consultation they were made for
+
+    Returns:
+        list[LLMCall]: Unsaved rows
+    """
+    return [LLMCall(consultation_id=consultation_id, **call) for call in calls]
@@ -0,0 +1,110 @@
+import json
+import re
+
+
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _strip_trailing_commas(text):
+    """Drop commas directly before a closing bracket, outside strings"""
+    pieces = []
+    position = 0
+    in_string = False
+    escape = False
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+        if c == '"':
+            in_string = True
+        elif c == ",":
+            match = _TRAILING_COMMA.match(text, i)
+            if match:
+                pieces.append(text[position:i])
+                position = i + 1
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+def _close_truncated(text):
+    """
+    Cut a truncated document back to its last complete member and close
+    the brackets that are still open
+    """
+    stack = []
+    in_string = False
+    escape = False
+    cut = None
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+        if c == '"':
+            in_string = True
+        elif c in _CLOSERS:
+            stack.append(c)
+        elif c in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return text[:i + 1]
+            cut = (i + 1, list(stack))
+        elif c == "," and stack:
+            cut = (i, list(stack))
+
+    if cut is None:
+        return None
+    end, open_brackets = cut
+    return text[:end] + "".join(_CLOSERS[c] for c in reversed(open_brackets))
+
+
+def repair_json(text):
+    """
+    Parse a JSON object from model output, repairing common defects
+
+    Handles Markdown code fences, prose around the object, trailing commas
+    and output cut off mid-object; a truncated member is dropped rather than
+    guessed.
+
+    Args:
+        text (str): The raw model response
+
+    Returns:
+        dict | None: The parsed object, or None if nothing usable was found
+    """
+    if not text:
+        return None
+    try:
+        value = json.loads(text)
+        return value if isinstance(value, dict) else None
+    except ValueError:
+        pass
+
+    text = _FENCE.sub("", text)
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = text[start:]
+
+    closed = _close_truncated(_strip_trailing_commas(text))
+    if closed is None:
+        return None
+    try:
+        value = json.loads(_strip_trailing_commas(closed))
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
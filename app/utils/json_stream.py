@@ -0,0 +1,121 @@
+import json
+
+
+class JSONStreamParser:
+    """
+    Incremental parser that reports members of a streamed JSON object as soon
+    as each one is complete.
+
+    Feed it text chunks as they arrive; feed() returns (path, value) pairs for
+    every top-level member that finished in the chunk. Members named in
+    `expand` are not reported whole; their own members are reported instead,
+    e.g. expand=("scores",) yields "scores.data_gathering".
+    """
+
+    def __init__(self, expand=()):
+        self.expand = set(expand)
+        self._text = ""
+        self._position = 0
+        self._frames = []
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+
+    def _top(self):
+        return self._frames[-1] if self._frames else None
+
+    def _child_path(self, frame):
+        if frame is None:
+            return ()
+        if frame["kind"] == "object" and frame["path"] is not None:
+            return frame["path"] + (frame["key"],)
+        return None
+
+    def _should_emit(self, path):
+        if len(path) == 1:
+            return path[0] not in self.expand
+        return len(path) == 2 and path[0] in self.expand
+
+    def _finish(self, frame, end, events):
+        if frame["path"] is not None:
+            path = frame["path"] + (frame["key"],)
+            if self._should_emit(path):
+                raw = self._text[frame["value_start"]:end]
+                events.append((".".join(path), json.loads(raw)))
+        frame["value_start"] = None
+        frame["state"] = "after"
+
+    def feed(self, chunk):
+        """
+        Args:
+            chunk (str): The next piece of the JSON document
+
+        Returns:
+            list[tuple[str, Any]]: Members completed by this chunk
+        """
+        self._text += chunk
+        text = self._text
+        events = []
+
+        for i in range(self._position, len(text)):
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    frame = self._top()
+                    if frame is not None and frame["kind"] == "object" and frame["state"] == "key":
+                        frame["key"] = json.loads(text[self._key_start:i + 1])
+                        frame["state"] = "colon"
+                continue
+
+            frame = self._top()
+            if (
+                frame is not None
+                and frame["kind"] == "object"
+                and frame["state"] == "value"
+                and not c.isspace()
+            ):
+                frame["value_start"] = i
+                frame["state"] = "in_value"
+
+            if c == '"':
+                self._in_string = True
+                if frame is not None and frame["kind"] == "object" and frame["state"] == "key":
+                    self._key_start = i
+            elif c in "{[":
+                self._frames.append({
+                    "kind": "object" if c == "{" else "array",
+                    "path": self._child_path(frame),
+                    "key": None,
+                    "state": "key",
+                    "value_start": None,
+                })
+            elif c in "}]":
+                if frame is None:
+                    continue
+                if frame["kind"] == "object" and frame["value_start"] is not None:
+                    # A scalar member closed by the end of its object
+                    self._finish(frame, i, events)
+                self._frames.pop()
+                parent = self._top()
+                if parent is not None and parent["kind"] == "object" and parent["value_start"] is not None:
+                    self._finish(parent, i + 1, events)
+            elif c == "," and frame is not None and frame["kind"] == "object":
+                if frame["value_start"] is not None:
+                    self._finish(frame, i, events)
+                frame["state"] = "key"
+            elif c == ":" and frame is not None and frame["kind"] == "object" and frame["state"] == "colon":
+                frame["state"] = "value"
+
+        self._position = len(text)
+        return events
+
+    @property
+    def text(self):
+        """Everything fed so far"""
+        return self._text
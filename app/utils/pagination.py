@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at, id):
+    """
+    Opaque cursor pointing just after a row of a (created_at, id) ordered list
+
+    Args:
+        created_at (datetime): Creation time of the last row of the page
+        id (str): Id of the last row of the page
+
+    Returns:
+        str: URL-safe token for the next_cursor field
+    """
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Read a cursor made by encode_cursor
+
+    Returns:
+        tuple[datetime, str]: The created_at and id the next page starts after
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
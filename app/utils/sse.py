@@ -0,0 +1,20 @@
+import json
+
+
+def format_sse(event, data):
+    """
+    Format a Server-Sent Events message
+
+    Args:
+        event (str): The event name
+        data: JSON-serialisable payload
+
+    Returns:
+        str: The encoded event, terminated by a blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def format_sse_comment(comment="keep-alive"):
+    """Format an SSE comment line, used to keep idle connections open"""
+    return f": {comment}\n\n"
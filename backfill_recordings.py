@@ -0,0 +1,44 @@
+"""
+Recording Backfill
+Moves audio saved inline on consultations (the legacy audio_recording column)
+into the recording store configured by RECORDING_STORE, points each
+consultation at its Recording and clears the inline copy. Safe to run while
+the API is serving and to re-run; consultations already moved are skipped.
+
+Usage:
+    python backfill_recordings.py --batch-size 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add the project directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.async_db_storage import AsyncDBStorage, dispose_async_engine
+from app.models.case import Case
+from app.models.user import User
+from app.services.recording_store import recording_store
+
+# The models Consultation's relationships name must be mapped before the first query
+MODELS = (Case, User)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=50, help="consultation ids read per query")
+    args = parser.parse_args()
+
+    db = AsyncDBStorage()
+    db.setup_db()
+    try:
+        moved, skipped = await recording_store.backfill_inline(db, batch_size=args.batch_size)
+    finally:
+        await db.close()
+        await dispose_async_engine()
+    print(f"Moved {moved} inline recordings into the store, left {skipped} inline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Prompt Caching Benchmark for the Scoring Prompt
+Sends the same consultations to the configured LLM provider in two prompt
+layouts: case and transcript before the static instructions and rubric (the
+previous layout), and static prefix first (the layout the services use).
+Reports time to first token, the share of prompt tokens served from the
+provider's prompt cache and the input cost per call for each layout.
+
+Usage:
+    python benchmark_prompt_cache.py --calls 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+from types import SimpleNamespace
+
+# Add the project directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.cases import render_case_context
+from app.services.consultation import load_scoring_rubric, scoring_messages, scoring_template_name
+from app.services.llm_provider import close_llm_provider, get_llm_provider
+from app.services.prompts import prompts
+from app.services.rate_limiter import MemoryRateLimitStore, rate_limiter
+from app.services.telemetry import collect_llm_calls, estimate_cost
+
+LAYOUTS = ("dynamic_first", "static_first")
+
+COMPLAINTS = (
+    "Persistent headache for the past two weeks.",
+    "Low back pain after lifting boxes at work.",
+    "Feeling tired all the time for three months.",
+    "Cough that has not settled after a chest infection.",
+)
+
+
+def sample_case(index):
+    """A minimal case with the attributes render_case_context reads"""
+    return SimpleNamespace(
+        patient_name=f"Patient {index}",
+        patient_age=30 + index % 50,
+        patient_gender=None,
+        case_number=f"BENCH-{index:03d}",
+        presenting_complaint=COMPLAINTS[index % len(COMPLAINTS)],
+        notes="Benchmark case.",
+        doctor_info=None,
+        ice_entries=[],
+        background_details=[],
+        information_divulged=[],
+    )
+
+
+def sample_transcript(index, turns=40):
+    """A synthetic consultation, different for every index"""
+    lines = []
+    for turn in range(turns):
+        lines.append(f"Doctor: Question {turn} of consultation {index}, how has that been affecting you?")
+        lines.append(f"Patient: It has been going on for about {turn % 7 + 1} days, consultation {index}.")
+    return "\n".join(lines)
+
+
+def layout_messages(layout, index):
+    """Scoring messages for one consultation in the given layout"""
+    prefix, rest = prompts.get(scoring_template_name()).render_parts(
+        static={"scoring_rubric": load_scoring_rubric()},
+        dynamic={"case_details": render_case_context(sample_case(index)), "transcript": sample_transcript(index)},
+    )
+    if layout == "static_first":
+        return scoring_messages(prefix + rest)
+    return scoring_messages(rest + "\n\n" + prefix)
+
+
+async def run_layout(layout, calls):
+    """Score every sample consultation in turn and return the recorded calls"""
+    provider = get_llm_provider()
+    with collect_llm_calls(f"benchmark {layout}") as recorded:
+        for index in range(calls):
+            async for _ in provider.astream("score", layout_messages(layout, index)):
+                pass
+    return recorded
+
+
+def report(layout, recorded):
+    ttft = [call["time_to_first_token_ms"] for call in recorded if call["time_to_first_token_ms"] is not None]
+    prompt_tokens = sum(call["prompt_tokens"] for call in recorded)
+    cached_tokens = sum(call["cached_tokens"] for call in recorded)
+    # The stub reports its models as "stub-<model>"; price them as the real model
+    input_cost = [
+        estimate_cost(call["model"].removeprefix("stub-"), call["prompt_tokens"], 0, call["cached_tokens"]) or 0.0
+        for call in recorded
+    ]
+    print(
+        f"{layout:<14} calls={len(recorded):<4} "
+        f"ttft_p50={statistics.median(ttft) if ttft else 0:8.1f} ms  "
+        f"ttft_mean={statistics.fmean(ttft) if ttft else 0:8.1f} ms  "
+        f"cached={cached_tokens / prompt_tokens if prompt_tokens else 0:6.1%}  "
+        f"input_cost/call=${statistics.fmean(input_cost) if input_cost else 0:.5f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10, help="consultations scored per layout")
+    args = parser.parse_args()
+
+    # Meter the benchmark in process so it does not need the database
+    rate_limiter.store = MemoryRateLimitStore()
+    try:
+        for layout in LAYOUTS:
+            report(layout, await run_layout(layout, args.calls))
+    finally:
+        await close_llm_provider()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Shared test setup
+
+Settings are read when app modules are imported, so the required ones get
+placeholder values here before any test module imports the app. LLM calls go
+to the offline stub provider.
+
+Tests that need PostgreSQL take the database fixture. They run against the
+database named by TEST_DATABASE_URL, e.g.
+postgresql://postgres@localhost:5432/sca_test, migrated to the alembic head,
+and are skipped when it is not set.
+"""
+import os
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    _url = urlparse(TEST_DATABASE_URL)
+    os.environ.update(
+        DB_USER=_url.username or "",
+        DB_PASSWORD=_url.password or "",
+        DB_HOST=_url.hostname or "localhost",
+        DB_PORT=str(_url.port or 5432),
+        DB_NAME=_url.path.lstrip("/"),
+    )
+
+for _name, _value in {
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_NAME": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "ASSISTANT_ID": "test",
+    "VAPI_API_KEY": "test",
+    "OPENAI_API_KEY": "test",
+    "LLM_PROVIDER": "stub",
+    "CASE_POOL_ENABLED": "false",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+
+@pytest.fixture(scope="session")
+async def database():
+    """Migrate the test database to head once and release the pool afterwards"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from alembic import command
+    from alembic.config import Config
+
+    from app.db.async_db_storage import dispose_async_engine
+
+    root = Path(__file__).resolve().parent.parent
+    config = Config(str(root / "alembic.ini"))
+    config.set_main_option("script_location", str(root / "alembic"))
+    command.upgrade(config, "head")
+    yield
+    await dispose_async_engine()
+
+
+@pytest.fixture
+async def db(database):
+    """A session on the test database"""
+    from app.db.async_db_storage import AsyncDBStorage
+
+    storage = AsyncDBStorage()
+    storage.setup_db()
+    yield storage
+    await storage.close()
+
+
+@pytest.fixture
+async def user(db):
+    """A stored user to own consultations"""
+    from app.models.user import User
+
+    user = User(first_name="Test", last_name="Trainee")
+    db.add(user)
+    await db.commit()
+    return user
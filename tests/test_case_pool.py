@@ -0,0 +1,45 @@
+import asyncio
+
+from sqlalchemy import delete
+
+from app.models.case_pool import PooledCase
+from app.services import case_pool as case_pool_module
+from app.services.case_pool import CasePool
+
+
+async def test_concurrent_refills_do_not_overshoot(db, monkeypatch):
+    await db.execute(delete(PooledCase))
+    await db.commit()
+
+    calls = 0
+
+    async def fake_generate_case():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"name": "Pat", "age": 40, "presenting": "Cough", "context": ""}, "stub"
+
+    monkeypatch.setattr(case_pool_module, "agenerate_case", fake_generate_case)
+    # One pool per uvicorn worker, each on its own connection
+    workers = [CasePool(target_size=3, low_water=1, concurrency=3) for _ in range(3)]
+
+    added = await asyncio.gather(*(worker.refill() for worker in workers))
+
+    assert sorted(added) == [0, 0, 3]
+    assert calls == 3
+    assert await workers[0].size() == 3
+
+
+async def test_refill_lock_is_released_after_a_refill(db, monkeypatch):
+    await db.execute(delete(PooledCase))
+    await db.commit()
+
+    async def failing_generate_case():
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(case_pool_module, "agenerate_case", failing_generate_case)
+    pool = CasePool(target_size=2, low_water=1, concurrency=1)
+
+    assert await pool.refill() == 0
+    async with pool._refill_lock() as locked:
+        assert locked
@@ -0,0 +1,42 @@
+"""
+The list and comment queries must be able to use the indexes added for them
+
+Test tables are tiny, so sequential scans are disabled for the EXPLAIN to show
+which index the planner would take once the tables grow.
+"""
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.api.routers.consultation import consultation_summaries
+from app.models.consultation import Consultation, PeerComment
+
+
+async def plan(db, statement):
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    try:
+        return "\n".join((await db.execute(text(f"EXPLAIN {sql}"))).scalars())
+    finally:
+        await db.rollback()
+
+
+async def test_history_uses_the_user_index(db):
+    explain = await plan(db, consultation_summaries(Consultation.user_id == "some-user", limit=20))
+
+    assert "ix_consultations_user_id_created_at" in explain
+    assert "ix_peer_comments_consultation_id_created_at" in explain
+
+
+async def test_shared_feed_uses_the_partial_index(db):
+    explain = await plan(db, consultation_summaries(Consultation.is_shared, limit=20))
+
+    assert "ix_consultations_shared_created_at" in explain
+    assert "Sort" not in explain
+
+
+async def test_comments_use_the_consultation_index(db):
+    # The query selectinload(Consultation.peer_comments) issues for a consultation
+    statement = select(PeerComment).where(PeerComment.consultation_id.in_(["some-consultation"]))
+
+    assert "ix_peer_comments_consultation_id_created_at" in await plan(db, statement)
+
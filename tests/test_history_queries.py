@@ -0,0 +1,107 @@
+import contextlib
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.api.routers import consultation as consultation_router
+from app.models.case import Case
+from app.models.consultation import Consultation, PeerComment
+
+
+@contextlib.contextmanager
+def count_queries(db):
+    """Collect every statement sent to the database inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+async def add_consultations(db, user, count):
+    case = Case(case_number=f"Q-{uuid.uuid4().hex[:8]}", presenting_complaint="Cough")
+    db.add(case)
+    for i in range(count):
+        consultation = Consultation(
+            user_id=user.id,
+            case_id=case.id,
+            transcript="Doctor: hello",
+            overall_score=3.0,
+            domain_scores={},
+            feedback="Fine",
+            is_shared=True,
+        )
+        db.add(consultation)
+        db.add_all([
+            PeerComment(consultation_id=consultation.id, user_id=user.id, comment=f"Comment {j}")
+            for j in range(i)
+        ])
+    await db.commit()
+
+
+async def history_queries(db, user_id):
+    with count_queries(db) as statements:
+        result = await consultation_router.get_history(user_id, limit=50, cursor=None, db=db)
+    return len(statements), result["history"]
+
+
+async def test_history_query_count_does_not_grow_with_consultations(db, user):
+    await add_consultations(db, user, 1)
+    one, history = await history_queries(db, user.id)
+    assert len(history) == 1
+
+    await add_consultations(db, user, 6)
+    many, history = await history_queries(db, user.id)
+    assert len(history) == 7
+
+    assert many == one
+    assert sorted(entry["comment_count"] for entry in history) == [0, 0, 1, 2, 3, 4, 5]
+
+
+async def test_shared_feed_query_count_does_not_grow_with_consultations(db, user):
+    async def shared_queries():
+        with count_queries(db) as statements:
+            await consultation_router.get_shared_consultations(limit=50, cursor=None, db=db)
+        return len(statements)
+
+    await add_consultations(db, user, 1)
+    one = await shared_queries()
+    await add_consultations(db, user, 6)
+
+    assert await shared_queries() == one
+
+
+async def test_malformed_cursor_is_a_plain_400(db, user):
+    with pytest.raises(HTTPException) as history_error:
+        await consultation_router.get_history(user.id, limit=10, cursor="not-a-cursor", db=db)
+    with pytest.raises(HTTPException) as shared_error:
+        await consultation_router.get_shared_consultations(limit=10, cursor="not-a-cursor", db=db)
+
+    for error in (history_error.value, shared_error.value):
+        assert error.status_code == 400
+        assert error.detail == "Invalid cursor"
+
+
+async def test_lists_leave_domain_scores_and_feedback_to_the_detail_endpoint(db, user):
+    await add_consultations(db, user, 1)
+
+    statement = str(consultation_router.consultation_summaries(Consultation.user_id == user.id, limit=10))
+    assert "domain_scores" not in statement
+    assert "feedback" not in statement
+
+    result = await consultation_router.get_history(user.id, limit=10, cursor=None, db=db)
+    entry = result["history"][0]
+    assert entry["overall_score"] == 3.0
+    assert "scores" not in entry and "feedback" not in entry
+
+    detail = await consultation_router.get_consultation(entry["id"], db=db)
+    assert detail["scores"] == {}
+    assert detail["feedback"] == "Fine"
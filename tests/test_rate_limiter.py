@@ -0,0 +1,85 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import (
+    DatabaseRateLimitStore,
+    LLMRateLimitError,
+    MemoryRateLimitStore,
+    RateLimiter,
+)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Two requests per minute and no waiting, so the third call is refused at once"""
+    settings = rate_limiter_module.settings
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 2)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 1000)
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_MAX_WAIT_SECONDS", 0.0)
+
+
+def bucket():
+    return f"test:{uuid.uuid4().hex}"
+
+
+async def check_store(store):
+    name = bucket()
+    assert await store.try_acquire(name, 1, 400, 2, 1000) == 0
+    assert await store.try_acquire(name, 1, 400, 2, 1000) == 0
+    # Both buckets are short now; the request bucket needs ~30 s to refill one request
+    wait = await store.try_acquire(name, 1, 400, 2, 1000)
+    assert 25 < wait <= 30
+
+    # Returning unused tokens does not make room for another request
+    await store.adjust(name, 300, 1000)
+    assert await store.try_acquire(name, 1, 100, 2, 1000) > 25
+
+
+async def test_memory_store_meters_requests():
+    await check_store(MemoryRateLimitStore())
+
+
+async def test_database_store_meters_requests(database):
+    await check_store(DatabaseRateLimitStore())
+
+
+async def test_token_bucket_limits_large_calls(database):
+    store = DatabaseRateLimitStore()
+    name = bucket()
+    assert await store.try_acquire(name, 1, 900, 100, 1000) == 0
+    # 800 more tokens need ~42 s of refill at 1000 tokens per minute
+    assert 40 < await store.try_acquire(name, 1, 800, 100, 1000) <= 42.1
+    await store.adjust(name, 700, 1000)
+    assert await store.try_acquire(name, 1, 800, 100, 1000) == 0
+
+
+async def test_limiter_refuses_calls_over_the_limit(database, limits):
+    limiter = RateLimiter(DatabaseRateLimitStore())
+    name = bucket()
+    await limiter.acquire(name, 100)
+    await limiter.acquire(name, 100)
+    with pytest.raises(LLMRateLimitError) as error:
+        await limiter.acquire(name, 100)
+
+    assert error.value.retry_after > 0
+    assert limiter.store_errors == 0
+    assert limiter.exhausted == 1
+
+
+async def test_store_errors_let_calls_through_without_counting_them_throttled(limits):
+    class BrokenStore:
+        async def try_acquire(self, *args):
+            # A failing store is often a slow one, e.g. a connect timeout
+            await asyncio.sleep(0.01)
+            raise ConnectionError("database unavailable")
+
+    limiter = RateLimiter(BrokenStore())
+    for _ in range(3):
+        await limiter.acquire(bucket(), 100)
+
+    assert limiter.store_errors == 3
+    assert limiter.throttled_calls == 0
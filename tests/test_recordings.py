@@ -0,0 +1,165 @@
+import base64
+import contextlib
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.api.routers import recording as recording_router
+from app.db.load import async_load
+from app.models.case import Case
+from app.models.consultation import Consultation
+from app.services.recording_store import LocalRecordingBackend, parse_range, recording_store
+from tests.test_scoring_routes import idle_in_transaction
+
+
+
+class UploadRequest:
+    """The parts of a starlette Request the upload route reads"""
+
+    def __init__(self, chunks, on_chunk=None):
+        self.headers = {"content-type": "audio/webm"}
+        self.chunks = chunks
+        self.on_chunk = on_chunk
+
+    async def stream(self):
+        for chunk in self.chunks:
+            if self.on_chunk:
+                await self.on_chunk()
+            yield chunk
+
+
+class DownloadRequest:
+    def __init__(self, range_header=None):
+        self.headers = {"range": range_header} if range_header else {}
+
+
+@pytest.fixture
+def audio():
+    """Audio no earlier test stored, so uploads are not deduplicated against it"""
+    return bytes(range(256)) * 4 + uuid.uuid4().bytes
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(recording_store, "backend", LocalRecordingBackend(tmp_path))
+    return recording_store
+
+
+@pytest.fixture
+async def consultation(db, user):
+    case = Case(case_number=f"R-{uuid.uuid4().hex[:8]}", presenting_complaint="Cough")
+    consultation = Consultation(user_id=user.id, case_id=case.id, transcript="Doctor: hello")
+    db.add_all([case, consultation])
+    await db.commit()
+    return consultation
+
+
+# A session of its own per call, as FastAPI gives each request
+request_session = contextlib.asynccontextmanager(async_load)
+
+
+async def upload(consultation_id, request, duration_seconds=None):
+    async with request_session() as db:
+        return await recording_router.upload_recording(
+            consultation_id, request, duration_seconds=duration_seconds, db=db
+        )
+
+
+async def download(consultation_id, range_header=None):
+    async with request_session() as db:
+        return await recording_router.download_recording(consultation_id, DownloadRequest(range_header), db=db)
+
+
+async def body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=1000-", (1000, 1023)),
+    ("bytes=-24", (1000, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),
+    ("bytes=-5000", (0, 1023)),
+    ("bytes=0-1,5-6", None),
+    ("items=0-9", None),
+    ("bytes=9-0", None),
+    ("bytes=abc", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1024) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=2000-3000", "bytes=-0"])
+def test_parse_range_rejects_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1024)
+
+
+async def test_upload_streams_without_an_open_transaction(consultation, store, audio):
+    seen = []
+
+    async def check():
+        seen.append(await idle_in_transaction())
+
+    request = UploadRequest([audio[:512], audio[512:]], on_chunk=check)
+    result = await upload(consultation.id, request, duration_seconds=42)
+
+    assert seen == [0, 0]
+    assert result["size_bytes"] == len(audio)
+    assert result["duration_seconds"] == 42
+
+    again = await upload(consultation.id, UploadRequest([audio]))
+    assert again["deduplicated"] and again["recording_id"] == result["recording_id"]
+
+
+async def test_download_serves_ranges(consultation, store, audio):
+    await upload(consultation.id, UploadRequest([audio]))
+
+    full = await download(consultation.id)
+    assert full.status_code == 200
+    assert full.headers["content-length"] == str(len(audio))
+    assert await body(full) == audio
+
+    part = await download(consultation.id, "bytes=10-19")
+    assert part.status_code == 206
+    assert part.headers["content-range"] == f"bytes 10-19/{len(audio)}"
+    assert await body(part) == audio[10:20]
+
+    tail = await download(consultation.id, "bytes=-4")
+    assert await body(tail) == audio[-4:]
+
+    beyond = await download(consultation.id, "bytes=5000-")
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == f"bytes */{len(audio)}"
+
+
+async def test_backfill_moves_inline_audio_into_the_store(db, user, store, audio):
+    case = Case(case_number=f"R-{uuid.uuid4().hex[:8]}", presenting_complaint="Cough")
+    inline = Consultation(
+        user_id=user.id, case_id=case.id, transcript="Doctor: hello",
+        audio_recording="data:audio/wav;base64," + base64.b64encode(audio).decode(),
+    )
+    broken = Consultation(
+        user_id=user.id, case_id=case.id, transcript="Doctor: hello", audio_recording="not base64!",
+    )
+    db.add_all([case, inline, broken])
+    await db.commit()
+    inline_id, broken_id = inline.id, broken.id
+
+    moved, skipped = await recording_store.backfill_inline(db, batch_size=1)
+    assert moved >= 1 and skipped >= 1
+
+    rows = {
+        row.id: row for row in (await db.execute(
+            select(Consultation.id, Consultation.recording_id, Consultation.audio_recording)
+            .where(Consultation.id.in_([inline_id, broken_id]))
+        )).all()
+    }
+    assert rows[inline_id].recording_id and rows[inline_id].audio_recording is None
+    assert rows[broken_id].recording_id is None and rows[broken_id].audio_recording == "not base64!"
+
+    response = await download(inline_id)
+    assert response.media_type == "audio/wav"
+    assert await body(response) == audio
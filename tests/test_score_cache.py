@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.models.score_cache import ScoreCacheEntry
+from app.schema.case import CreateCaseRequest
+from app.services import score_cache as score_cache_module
+from app.services.score_cache import ScoreCache, scoring_cache_key
+
+
+def make_case(**overrides):
+    fields = {"case_number": "TEST-001", "patient_name": "Sam", "presenting_complaint": "Headache"}
+    fields.update(overrides)
+    return CreateCaseRequest(**fields)
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """A cache whose table tier is switched off"""
+    cache = ScoreCache(ttl_seconds=60, max_entries=8, max_table_entries=8)
+
+    async def no_table(*args):
+        return None
+
+    monkeypatch.setattr(cache, "_get_table", no_table)
+    monkeypatch.setattr(cache, "_set_table", no_table)
+    monkeypatch.setattr(score_cache_module.settings, "SCORE_CACHE_ENABLED", True)
+    return cache
+
+
+@pytest.fixture
+def scorer(monkeypatch):
+    """Replace the LLM scoring call with one that counts calls and waits for a release"""
+    state = {"calls": 0, "release": asyncio.Event(), "error": None}
+
+    async def fake_score(transcript, case_details):
+        state["calls"] += 1
+        await state["release"].wait()
+        if state["error"]:
+            raise state["error"]
+        return {"overall_score": 3.0, "feedback": transcript}
+
+    monkeypatch.setattr(score_cache_module, "score_consultation", fake_score)
+    return state
+
+
+def test_key_ignores_whitespace_and_unicode_form():
+    case = make_case()
+    assert scoring_cache_key("Doctor:  hello\n\nPatient: café ", case) == \
+        scoring_cache_key("Doctor: hello\nPatient: café", case)
+
+
+def test_key_changes_with_case_details():
+    assert scoring_cache_key("Doctor: hello", make_case()) != \
+        scoring_cache_key("Doctor: hello", make_case(notes="Diabetic"))
+
+
+async def test_concurrent_requests_share_one_call(memory_cache, scorer):
+    tasks = [asyncio.create_task(memory_cache.score("Doctor: hello", make_case())) for _ in range(5)]
+    await asyncio.sleep(0)
+    scorer["release"].set()
+    results = await asyncio.gather(*tasks)
+
+    assert scorer["calls"] == 1
+    assert all(result == {"overall_score": 3.0, "feedback": "Doctor: hello"} for result in results)
+    # Every caller gets its own copy
+    results[0]["overall_score"] = 1.0
+    assert results[1]["overall_score"] == 3.0
+
+    assert await memory_cache.score("Doctor: hello", make_case()) == results[1]
+    assert scorer["calls"] == 1
+    assert memory_cache.memory_hits == 1
+
+
+async def test_failed_call_reaches_waiters_and_is_not_cached(memory_cache, scorer):
+    scorer["error"] = RuntimeError("provider down")
+    tasks = [asyncio.create_task(memory_cache.score("Doctor: hello", make_case())) for _ in range(3)]
+    await asyncio.sleep(0)
+    scorer["release"].set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert scorer["calls"] == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    scorer["error"] = None
+    assert (await memory_cache.score("Doctor: hello", make_case()))["overall_score"] == 3.0
+    assert scorer["calls"] == 2
+
+
+async def test_cancelled_leader_hands_the_call_to_a_waiter(memory_cache, scorer):
+    leader = asyncio.create_task(memory_cache.score("Doctor: hello", make_case()))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(memory_cache.score("Doctor: hello", make_case()))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+    scorer["release"].set()
+    result = await asyncio.wait_for(follower, timeout=1)
+    assert result["overall_score"] == 3.0
+    assert scorer["calls"] == 2
+
+
+async def test_cancelled_waiter_leaves_the_call_running(memory_cache, scorer):
+    leader = asyncio.create_task(memory_cache.score("Doctor: hello", make_case()))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(memory_cache.score("Doctor: hello", make_case()))
+    await asyncio.sleep(0)
+
+    follower.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+
+    scorer["release"].set()
+    assert (await asyncio.wait_for(leader, timeout=1))["overall_score"] == 3.0
+    assert scorer["calls"] == 1
+
+
+async def test_table_tier_purges_expired_rows_and_keeps_the_cap(db):
+    await db.execute(delete(ScoreCacheEntry))
+    expired = ScoreCacheEntry(cache_key="e" * 64, result={}, expires_at=datetime.utcnow() - timedelta(seconds=1))
+    db.add(expired)
+    await db.commit()
+
+    cache = ScoreCache(ttl_seconds=60, max_entries=8, max_table_entries=3)
+    for i in range(5):
+        await cache._set_table(f"{i:064d}", {"overall_score": i})
+
+    keys = (await db.scalars(select(ScoreCacheEntry.cache_key))).all()
+    assert len(keys) == 3
+    assert "e" * 64 not in keys
+    assert await cache._get_table(f"{4:064d}") == {"overall_score": 4}
+    assert await db.scalar(select(func.count()).select_from(ScoreCacheEntry)) == 3
@@ -0,0 +1,56 @@
+import uuid
+
+from sqlalchemy import text
+
+from app.api.routers import consultation as consultation_router
+from app.db.async_db_storage import AsyncDBStorage
+from app.schema.case import CaseDetails
+from app.schema.consultation import ScoreRequest
+
+SCORES = {
+    "scores": {},
+    "overall_score": 3.0,
+    "feedback": "Good",
+    "coverage_analysis": {},
+    "prompt_version": "test",
+}
+
+
+async def idle_in_transaction():
+    """Connections to the test database sitting in an open transaction"""
+    probe = AsyncDBStorage()
+    probe.setup_db()
+    try:
+        return (await probe.execute(text(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND state = 'idle in transaction'"
+        ))).scalar()
+    finally:
+        await probe.close()
+
+
+async def test_scoring_holds_no_connection_during_the_llm_call(db, user, monkeypatch):
+    seen = []
+
+    async def fake_score(transcript, case):
+        seen.append(await idle_in_transaction())
+        return dict(SCORES)
+
+    monkeypatch.setattr(consultation_router.score_cache, "score", fake_score)
+    request = ScoreRequest(
+        transcript="Doctor: hello",
+        user_id=user.id,
+        case_details=CaseDetails(
+            id=str(uuid.uuid4()),
+            case_number=f"T-{uuid.uuid4().hex[:8]}",
+            presenting_complaint="Headache",
+        ),
+    )
+
+    # The first request creates the case, the second finds it
+    for _ in range(2):
+        result = await consultation_router.score_consultation_route(request, db)
+        assert result["overall_score"] == 3.0
+        assert result["consultation_id"]
+
+    assert seen == [0, 0]
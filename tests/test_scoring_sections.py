@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from app.schema.case import CaseDetails
+from app.services import consultation as consultation_service
+from app.services.consultation import complete_scoring_result
+from app.services.llm_provider import LLMResult
+
+CASE = CaseDetails(id="case-sections", case_number="C1", presenting_complaint="Cough")
+DOMAIN = {"score": 4, "examples": ["Asked about onset"], "areas_for_improvement": []}
+COVERAGE = {"ice_coverage": [], "information_coverage": [], "background_coverage": []}
+RESULT = {
+    "scores": {
+        "data_gathering": DOMAIN,
+        "clinical_management": {**DOMAIN, "score": 3},
+        "interpersonal_skills": {**DOMAIN, "score": 5},
+    },
+    "overall_score": 4.0,
+    "feedback": "Clear and thorough.",
+    "coverage_analysis": COVERAGE,
+}
+
+
+class ScriptedProvider:
+    """Answers each task with a fixed response and records the tasks asked for"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.tasks = []
+
+    async def acomplete(self, task, messages, json_response=True, max_tokens=None):
+        self.tasks.append(task)
+        return LLMResult(text=self.responses[task], model="scripted")
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = ScriptedProvider({
+        "score_domain": json.dumps({**DOMAIN, "score": 2}),
+        "coverage": json.dumps({"coverage_analysis": COVERAGE}),
+        "score_feedback": json.dumps({"feedback": "Re-requested feedback."}),
+    })
+    monkeypatch.setattr(consultation_service, "get_llm_provider", lambda: provider)
+    return provider
+
+
+async def test_valid_result_needs_no_follow_up_calls(provider):
+    result, missing = await complete_scoring_result(json.loads(json.dumps(RESULT)), "Doctor: Hello", CASE)
+
+    assert missing == []
+    assert provider.tasks == []
+    assert result["scores"]["clinical_management"]["score"] == 3
+    assert result["feedback"] == "Clear and thorough."
+
+
+async def test_only_the_invalid_domain_is_re_requested(provider):
+    partial = json.loads(json.dumps(RESULT))
+    partial["scores"]["clinical_management"]["score"] = 9
+
+    result, missing = await complete_scoring_result(partial, "Doctor: Hello", CASE)
+
+    assert missing == ["scores.clinical_management"]
+    assert provider.tasks == ["score_domain"]
+    assert result["scores"]["clinical_management"]["score"] == 2
+    assert result["scores"]["data_gathering"]["score"] == 4
+
+
+async def test_missing_sections_are_re_requested_with_feedback_last(provider):
+    partial = {"scores": {"data_gathering": DOMAIN}}
+
+    result, missing = await complete_scoring_result(partial, "Doctor: Hello", CASE)
+
+    assert set(missing) == {
+        "scores.clinical_management", "scores.interpersonal_skills", "feedback", "coverage_analysis",
+    }
+    assert sorted(provider.tasks[:-1]) == ["coverage", "score_domain", "score_domain"]
+    assert provider.tasks[-1] == "score_feedback"
+    assert result["feedback"] == "Re-requested feedback."
+    # Missing overall score is recomputed from the domains
+    assert result["overall_score"] == round((4 + 2 + 2) / 3, 2)
+
+
+async def test_section_still_invalid_after_follow_up_raises(provider):
+    provider.responses["coverage"] = "not json at all"
+    partial = json.loads(json.dumps(RESULT))
+    del partial["coverage_analysis"]
+
+    with pytest.raises(ValueError):
+        await complete_scoring_result(partial, "Doctor: Hello", CASE)
@@ -0,0 +1,38 @@
+from app.services.consultation import chunk_transcript, clean_transcript
+from app.utils.tokens import estimate_tokens
+
+
+def test_clean_keeps_meaningful_repeated_words():
+    assert clean_transcript("Patient: I had had a fall.") == "Patient: I had had a fall."
+    assert clean_transcript("Doctor: The theory is that that is it.") == "Doctor: The theory is that that is it."
+
+
+def test_clean_removes_fillers_and_stutters():
+    assert clean_transcript("Patient: Um, I- I I I think, uh, it wh- what hurts") == \
+        "Patient: I think it what hurts"
+
+
+def test_chunks_keep_whole_turns():
+    transcript = "\n".join(f"Doctor: Question number {i} about the pain." for i in range(20))
+    chunks = chunk_transcript(transcript, 40)
+
+    assert len(chunks) > 1
+    assert "\n".join(chunks) == transcript
+    assert all(estimate_tokens(chunk) <= 40 for chunk in chunks)
+
+
+def test_long_line_is_split_at_sentences():
+    transcript = " ".join(f"Doctor: Sentence {i} asks about the pain." for i in range(50))
+    chunks = chunk_transcript(transcript, 40)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 40 for chunk in chunks)
+    assert " ".join(chunk.replace("\n", " ") for chunk in chunks) == transcript
+
+
+def test_long_sentence_is_split_between_words():
+    transcript = " ".join(["word"] * 500)
+    chunks = chunk_transcript(transcript, 100)
+
+    assert len(chunks) == 5
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)